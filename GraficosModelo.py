@@ -1,58 +1,78 @@
 import argparse
+import inspect
+
+import cache_resultados
 import modelo
-from modelo import (
-    param_simulacion,
-    param_economicos,
-    param_estacion,
-    param_operacion,
-)
+import tiempos_intercambio
+import trafico
+from barrido import ejecutar_barrido, simular
+from modelo import param_estacion, param_simulacion
 from parametros import ParametrosBateria
+from sondas import Sondas
 
 ESTILO_MEJOR = "seaborn-v0_8"
 
 TIEMPO_REEMPLAZO = 4 / 60  # Tiempo de intercambio de la batería en horas
 
 
-def _simular_con_registro():
-    """Ejecuta la simulación registrando datos horarios."""
-    datos = {
-        "cargadas": [],
-        "descargadas": [],
-        "cargando": [],
-        "espera": [],
-    }
-
-    def registrar(env, estacion):
-        for _ in range(int(param_simulacion.duracion) + 1):
-            datos["cargadas"].append(len(estacion.baterias_reserva.items))
-            datos["descargadas"].append(len(estacion.baterias_descargadas.items))
-            datos["cargando"].append(estacion.baterias_cargando)
-            datos["espera"].append(estacion.tiempo_espera_total)
-            yield env.timeout(1)
+# Series que comparten los gráficos de inventario, cola y cargadores
+SERIES_HORARIAS = ("reserva", "descargadas", "cargadores_ocupados", "espera_acumulada")
 
-    anterior = modelo.VERBOSE
-    modelo.VERBOSE = False
-    estacion = modelo.ejecutar_simulacion(procesos_extra=[registrar])
-    modelo.VERBOSE = anterior
-    return estacion, datos
 
+def series_horarias(config=None, tiempo_ruta=37.2):
+    """Series horarias de :data:`SERIES_HORARIAS` para la configuración dada.
 
-def grafico_carga_bateria(block: bool = True):
-    """Grafica la curva de potencia de carga según el SoC."""
+    Devuelve un diccionario ``nombre -> (horas, valores)``. Las series se
+    obtienen de una sola simulación con sondas y se guardan en la caché de
+    resultados, de modo que los tres gráficos reutilizan la misma corrida.
+    """
+    config = config or modelo.configuracion_actual(verbose=False)
+    simulacion = config.simulacion
+    clave = "sondas-" + cache_resultados.clave_simulacion(
+        config, simulacion.max_autobuses, simulacion.duracion, tiempo_ruta, "simpy"
+    )
+    series = cache_resultados.cache.obtener(clave)
+    if series is None:
+        sondas = Sondas()
+        for nombre in SERIES_HORARIAS:
+            sondas.agregar(nombre)
+        modelo.ejecutar_simulacion(config=config, tiempo_ruta=tiempo_ruta, sondas=sondas)
+        series = sondas.como_dict()
+        cache_resultados.cache.guardar(clave, series)
+    return series
+
+
+def _importar_pyplot():
+    """Devuelve ``matplotlib.pyplot`` o ``None`` si no está instalado."""
     try:
         import matplotlib.pyplot as plt
     except Exception:
         print("Falta matplotlib. Ejecuta 'pip install -r requirements.txt'")
-        return
+        return None
+    return plt
+
 
-    bateria = ParametrosBateria()
+# Cada gráfico se divide en una función ``datos_*``, que simula y devuelve
+# un diccionario que puede calcularse fuera del hilo de la interfaz, y una
+# función ``dibujar_*`` que sólo usa matplotlib.
+
+
+def datos_carga_bateria(config=None):
+    """Potencia de carga para cada SoC de 0 a 90 %."""
+    bateria = config.bateria if config is not None else ParametrosBateria()
     soc_vals = list(range(0, 91))
-    potencias = [bateria.potencia_carga(s) for s in soc_vals]
+    return {"soc": soc_vals, "potencia": [bateria.potencia_carga(s) for s in soc_vals]}
+
+
+def dibujar_carga_bateria(datos, block: bool = True):
+    plt = _importar_pyplot()
+    if plt is None:
+        return
 
     plt.style.use(ESTILO_MEJOR)
 
     plt.figure(figsize=(8, 4))
-    plt.plot(soc_vals, potencias, marker="o")
+    plt.plot(datos["soc"], datos["potencia"], marker="o")
     plt.xlabel("Estado de carga (%)")
     plt.ylabel("Potencia de carga (kW)")
     plt.title("Curva de carga de la batería")
@@ -61,58 +81,89 @@ def grafico_carga_bateria(block: bool = True):
     plt.show(block=block)
 
 
-def _costos_para_autobuses(numero_autobuses, tiempo_ruta=37.2):
-    """Devuelve costos y consumos para la cantidad dada de autobuses."""
-    anterior = modelo.VERBOSE
-    modelo.VERBOSE = False
+def grafico_carga_bateria(block: bool = True):
+    """Grafica la curva de potencia de carga según el SoC."""
+    dibujar_carga_bateria(datos_carga_bateria(), block)
 
-    cap_ant = param_estacion.capacidad_estacion
-    tot_ant = param_estacion.total_baterias
-    ini_ant = param_estacion.baterias_iniciales
-    param_estacion.actualizar(
-        capacidad=max(numero_autobuses, cap_ant),
-        total=max(numero_autobuses * 2, tot_ant),
-        iniciales=max(numero_autobuses, ini_ant),
-    )
-    estacion = modelo.ejecutar_simulacion(max_autobuses=numero_autobuses)
-    param_estacion.actualizar(capacidad=cap_ant, total=tot_ant, iniciales=ini_ant)
 
-    modelo.VERBOSE = anterior
+def _punto_costos(numero_autobuses, estacion=None):
+    """Punto del barrido con cargadores y baterías suficientes para la flota."""
+    estacion = estacion or param_estacion
+    return {
+        "max_autobuses": numero_autobuses,
+        "capacidad_estacion": max(numero_autobuses, estacion.capacidad_estacion),
+        "total_baterias": max(numero_autobuses * 2, estacion.total_baterias),
+        "baterias_iniciales": max(numero_autobuses, estacion.baterias_iniciales),
+    }
+
 
-    factor = 720 / param_simulacion.duracion
+def _costos_de_estacion(estacion, numero_autobuses, tiempo_ruta=37.2, config=None):
+    """Costos y consumos mensuales a partir del resultado de una simulación."""
+    simulacion = config.simulacion if config is not None else param_simulacion
+    factor = 720 / simulacion.duracion
     costo_electrico = estacion.costo_total_electrico * factor
-    costo_gas = costo_gas_teorico(numero_autobuses, tiempo_ruta) * factor
+    costo_gas = costo_gas_teorico(numero_autobuses, tiempo_ruta, config) * factor
     energia_punta = estacion.energia_punta_electrica * factor
     energia_fuera = (estacion.energia_total_cargada - estacion.energia_punta_electrica) * factor
     return costo_electrico, costo_gas, energia_punta, energia_fuera
 
 
-def costo_gas_teorico(numero_autobuses, tiempo_ruta=37.2):
+def costo_gas_teorico(numero_autobuses, tiempo_ruta=37.2, config=None):
     """Calcula el costo de operar los autobuses con gas natural."""
-    duracion = tiempo_ruta / param_operacion.velocidad_promedio
-    ciclos = param_simulacion.duracion / duracion
+    config = config or modelo.configuracion_actual(verbose=False)
+    operacion = config.operacion
+    duracion = tiempo_ruta / operacion.velocidad_promedio
+    ciclos = config.simulacion.duracion / duracion
     volumen_total = (
         numero_autobuses
-        * param_operacion.consumo_gas_100km
+        * operacion.consumo_gas_100km
         * tiempo_ruta
         / 100
         * ciclos
     )
-    return volumen_total * param_economicos.costo_gas_m3
+    return volumen_total * config.economicos.costo_gas_m3
+
+
+def datos_costos(config=None, tiempo_ruta=37.2, jobs=None, progreso=None, cancelado=None):
+    """Costos mensuales por tamaño de flota y costo por hora de la actual.
+
+    Las flotas de 1 a ``max_autobuses`` se simulan en paralelo con ``jobs``
+    procesos (por defecto uno por núcleo).
+    """
+    config = config or modelo.configuracion_actual(verbose=False)
+    valores = list(range(1, config.simulacion.max_autobuses + 1))
+    resumenes = ejecutar_barrido(
+        [_punto_costos(n, config.estacion) for n in valores],
+        jobs=jobs,
+        tiempo_ruta=tiempo_ruta,
+        config=config,
+        progreso=progreso,
+        cancelado=cancelado,
+    )
+    resultados = [
+        _costos_de_estacion(r, n, tiempo_ruta, config)
+        for r, n in zip(resumenes, valores)
+    ]
+    costos_elec, costos_gas, energias_punta, energias_fuera = zip(*resultados)
+    estacion = simular(config=config, tiempo_ruta=tiempo_ruta)
+    duracion = config.simulacion.duracion
+    return {
+        "autobuses": valores,
+        "costo_electrico": list(costos_elec),
+        "costo_gas": list(costos_gas),
+        "energia_punta": list(energias_punta),
+        "energia_fuera": list(energias_fuera),
+        "costo_hora_electrico": estacion.costo_total_electrico / duracion,
+        "costo_hora_gas": estacion.costo_total_gas / duracion,
+    }
 
 
-def grafico_costos(block: bool = True):
-    """Genera los gráficos de costos y consumo eléctrico."""
-    try:
-        import matplotlib.pyplot as plt
-    except Exception:
-        print("Falta matplotlib. Ejecuta 'pip install -r requirements.txt'")
+def dibujar_costos(datos, block: bool = True):
+    plt = _importar_pyplot()
+    if plt is None:
         return
-
-    max_autos = param_simulacion.max_autobuses
-    valores = list(range(1, max_autos + 1))
-    resultados = [_costos_para_autobuses(n) for n in valores]
-    costos_elec, costos_gas, energias_punta, energias_fuera = zip(*resultados)
+    valores = datos["autobuses"]
+    costos_elec = datos["costo_electrico"]
 
     plt.style.use(ESTILO_MEJOR)
 
@@ -125,18 +176,11 @@ def grafico_costos(block: bool = True):
     plt.tight_layout()
     plt.show(block=block)
 
-    anterior = modelo.VERBOSE
-    modelo.VERBOSE = False
-    estacion = modelo.ejecutar_simulacion()
-    modelo.VERBOSE = anterior
-
     plt.style.use(ESTILO_MEJOR)
-    costo_e_hora = estacion.costo_total_electrico / param_simulacion.duracion
-    costo_g_hora = estacion.costo_total_gas / param_simulacion.duracion
 
     plt.figure(figsize=(6, 4))
     etiquetas = ["Electricidad/hora", "Gas natural/hora"]
-    valores_bar = [costo_e_hora, costo_g_hora]
+    valores_bar = [datos["costo_hora_electrico"], datos["costo_hora_gas"]]
     plt.bar(etiquetas, valores_bar, color=["tab:blue", "tab:orange"])
     plt.ylabel("Costo (S/./h)")
     plt.title("Costo promedio por hora de operación")
@@ -145,7 +189,7 @@ def grafico_costos(block: bool = True):
 
     plt.figure(figsize=(8, 4))
     plt.plot(valores, costos_elec, marker="o", label="Electricidad")
-    plt.plot(valores, costos_gas, marker="s", label="Gas natural")
+    plt.plot(valores, datos["costo_gas"], marker="s", label="Gas natural")
     plt.xlabel("Número de autobuses")
     plt.ylabel("Costo (S/.)")
     plt.title("Comparación de costos de operación")
@@ -155,8 +199,8 @@ def grafico_costos(block: bool = True):
     plt.show(block=block)
 
     plt.figure(figsize=(8, 4))
-    plt.plot(valores, energias_punta, marker="o", label="Hora punta")
-    plt.plot(valores, energias_fuera, marker="s", label="Fuera de punta")
+    plt.plot(valores, datos["energia_punta"], marker="o", label="Hora punta")
+    plt.plot(valores, datos["energia_fuera"], marker="s", label="Fuera de punta")
     plt.xlabel("Número de autobuses")
     plt.ylabel("Consumo eléctrico (kWh)")
     plt.title("Consumo en hora punta y fuera de punta")
@@ -166,30 +210,35 @@ def grafico_costos(block: bool = True):
     plt.show(block=block)
 
 
-def grafico_diarios(block: bool = True):
-    """Grafica intercambios y consumo diarios."""
-    try:
-        import matplotlib.pyplot as plt
-    except Exception:
-        print("Falta matplotlib. Ejecuta 'pip install -r requirements.txt'")
+def grafico_costos(block: bool = True, jobs=None):
+    """Genera los gráficos de costos y consumo eléctrico."""
+    if _importar_pyplot() is None:
         return
-    anterior = modelo.VERBOSE
-    modelo.VERBOSE = False
-    estacion = modelo.ejecutar_simulacion()
-    modelo.VERBOSE = anterior
+    dibujar_costos(datos_costos(jobs=jobs), block)
+
+
+def datos_diarios(config=None, tiempo_ruta=37.2):
+    """Intercambios y energía cargada por día."""
+    config = config or modelo.configuracion_actual(verbose=False)
+    estacion = simular(config=config, tiempo_ruta=tiempo_ruta)
+    dias = config.simulacion.dias
+    registro = estacion.registro_intercambios
+    return {
+        "dias": list(range(dias + 1)),
+        "intercambios": registro.serie_diaria(registro.intercambios_dia, dias + 1),
+        "energia": registro.serie_diaria(registro.energia_dia, dias + 1),
+    }
 
-    plt.style.use(ESTILO_MEJOR)
 
-    dias = param_simulacion.dias
-    intercambios = [0] * (dias + 1)
-    energia = [0.0] * (dias + 1)
-    for dia, _, energia_swap in estacion.registro_intercambios:
-        if dia <= dias:
-            intercambios[dia] += 1
-            energia[dia] += energia_swap
+def dibujar_diarios(datos, block: bool = True):
+    plt = _importar_pyplot()
+    if plt is None:
+        return
+
+    plt.style.use(ESTILO_MEJOR)
 
     plt.figure(figsize=(8, 4))
-    plt.plot(range(dias + 1), intercambios, marker="o")
+    plt.plot(datos["dias"], datos["intercambios"], marker="o")
     plt.xlabel("Día de operación")
     plt.ylabel("Intercambios de batería")
     plt.title("Intercambios diarios")
@@ -198,7 +247,7 @@ def grafico_diarios(block: bool = True):
     plt.show(block=block)
 
     plt.figure(figsize=(8, 4))
-    plt.plot(range(dias + 1), energia, marker="s", color="tab:orange")
+    plt.plot(datos["dias"], datos["energia"], marker="s", color="tab:orange")
     plt.xlabel("Día de operación")
     plt.ylabel("Energía cargada (kWh)")
     plt.title("Consumo diario de energía")
@@ -207,33 +256,31 @@ def grafico_diarios(block: bool = True):
     plt.show(block=block)
 
 
-def grafico_emisiones(block: bool = True):
-    """Muestra un gráfico comparando emisiones y el ahorro total de CO2."""
-    try:
-        import matplotlib.pyplot as plt
-    except Exception:
-        print("Falta matplotlib. Ejecuta 'pip install -r requirements.txt'")
+def grafico_diarios(block: bool = True):
+    """Grafica intercambios y consumo diarios."""
+    if _importar_pyplot() is None:
+        return
+    dibujar_diarios(datos_diarios(), block)
+
+
+def datos_emisiones(config=None, tiempo_ruta=37.2):
+    """Toneladas de CO2 con electricidad y con gas natural."""
+    config = config or modelo.configuracion_actual(verbose=False)
+    estacion = simular(config=config, tiempo_ruta=tiempo_ruta)
+    economicos = config.economicos
+    emis_elec = estacion.energia_total_cargada * economicos.factor_co2_elec / 1000
+    emis_gas = estacion.energia_total_gas * economicos.factor_co2_gas / 1000
+    return {"electricidad": emis_elec, "gas": emis_gas, "ahorro": emis_gas - emis_elec}
+
+
+def dibujar_emisiones(datos, block: bool = True):
+    plt = _importar_pyplot()
+    if plt is None:
         return
-    anterior = modelo.VERBOSE
-    modelo.VERBOSE = False
-    estacion = modelo.ejecutar_simulacion()
-    modelo.VERBOSE = anterior
-
-    emis_elec = (
-        estacion.energia_total_cargada
-        * param_economicos.factor_co2_elec
-        / 1000
-    )
-    emis_gas = (
-        estacion.energia_total_gas
-        * param_economicos.factor_co2_gas
-        / 1000
-    )
-    ahorro = emis_gas - emis_elec
 
     plt.figure(figsize=(6, 4))
     etiquetas = ["Electricidad", "Gas natural", "Ahorro de CO2"]
-    valores = [emis_elec, emis_gas, ahorro]
+    valores = [datos["electricidad"], datos["gas"], datos["ahorro"]]
     plt.bar(etiquetas, valores, color=["tab:blue", "tab:orange", "tab:green"])
     plt.ylabel("Toneladas de CO2")
     plt.title("Emisiones de CO2 durante la simulación")
@@ -242,21 +289,30 @@ def grafico_emisiones(block: bool = True):
     plt.show(block=block)
 
 
-def grafico_inventario(block: bool = True):
-    """Muestra el inventario de baterías a lo largo del tiempo."""
-    try:
-        import matplotlib.pyplot as plt
-    except Exception:
-        print("Falta matplotlib. Ejecuta 'pip install -r requirements.txt'")
+def grafico_emisiones(block: bool = True):
+    """Muestra un gráfico comparando emisiones y el ahorro total de CO2."""
+    if _importar_pyplot() is None:
+        return
+    dibujar_emisiones(datos_emisiones(), block)
+
+
+def datos_inventario(config=None, tiempo_ruta=37.2):
+    """Baterías cargadas y descargadas en cada hora."""
+    series = series_horarias(config, tiempo_ruta)
+    horas, cargadas = series["reserva"]
+    _, descargadas = series["descargadas"]
+    return {"dias": horas / 24, "cargadas": cargadas, "descargadas": descargadas}
+
+
+def dibujar_inventario(datos, block: bool = True):
+    plt = _importar_pyplot()
+    if plt is None:
         return
-    _, datos = _simular_con_registro()
-    horas = range(len(datos["cargadas"]))
-    dias = [h / 24 for h in horas]
 
     plt.style.use(ESTILO_MEJOR)
     plt.figure(figsize=(8, 4))
-    plt.plot(dias, datos["cargadas"], label="Cargadas")
-    plt.plot(dias, datos["descargadas"], label="Descargadas")
+    plt.plot(datos["dias"], datos["cargadas"], label="Cargadas")
+    plt.plot(datos["dias"], datos["descargadas"], label="Descargadas")
     plt.xlabel("Día de simulación")
     plt.ylabel("Número de baterías")
     plt.title("Inventario de baterías")
@@ -266,24 +322,31 @@ def grafico_inventario(block: bool = True):
     plt.show(block=block)
 
 
-def grafico_cola(block: bool = True):
-    """Grafica la evolución de la cola de autobuses."""
-    try:
-        import matplotlib.pyplot as plt
-    except Exception:
-        print("Falta matplotlib. Ejecuta 'pip install -r requirements.txt'")
+def grafico_inventario(block: bool = True):
+    """Muestra el inventario de baterías a lo largo del tiempo."""
+    if _importar_pyplot() is None:
+        return
+    dibujar_inventario(datos_inventario(), block)
+
+
+def datos_cola(config=None, tiempo_ruta=37.2):
+    """Minutos de espera nuevos en cada hora."""
+    horas, espera = series_horarias(config, tiempo_ruta)["espera_acumulada"]
+    # Minutos de espera agregados en cada hora
+    espera_h = [0.0] + [
+        (espera[i] - espera[i - 1]) * 60 for i in range(1, len(espera))
+    ]
+    return {"dias": horas / 24, "espera": espera_h}
+
+
+def dibujar_cola(datos, block: bool = True):
+    plt = _importar_pyplot()
+    if plt is None:
         return
-    _, datos = _simular_con_registro()
-    espera = datos["espera"]
-    espera_h = [0.0]
-    for i in range(1, len(espera)):
-        espera_h.append((espera[i] - espera[i - 1]) * 60)
-    horas = range(len(espera_h))
-    dias = [h / 24 for h in horas]
 
     plt.style.use(ESTILO_MEJOR)
     plt.figure(figsize=(8, 4))
-    plt.plot(dias, espera_h, marker="o")
+    plt.plot(datos["dias"], datos["espera"], marker="o")
     plt.xlabel("Día de simulación")
     plt.ylabel("Minutos de espera nuevos")
     plt.title("Evolución de la cola de autobuses")
@@ -292,37 +355,39 @@ def grafico_cola(block: bool = True):
     plt.show(block=block)
 
 
-def grafico_costos_dia(block: bool = True):
-    """Grafica el costo eléctrico por día de operación."""
-    try:
-        import matplotlib.pyplot as plt
-    except Exception:
-        print("Falta matplotlib. Ejecuta 'pip install -r requirements.txt'")
+def grafico_cola(block: bool = True):
+    """Grafica la evolución de la cola de autobuses."""
+    if _importar_pyplot() is None:
         return
-    anterior = modelo.VERBOSE
-    modelo.VERBOSE = False
-    estacion = modelo.ejecutar_simulacion()
-    modelo.VERBOSE = anterior
-
-    dias = param_simulacion.dias
-    costos = [0.0] * dias
-    for dia, hora_str, energia in estacion.registro_intercambios:
-        if dia < dias:
-            hora = int(hora_str.split()[2].split(":" )[0])
-            if param_economicos.horas_punta[0] <= hora < param_economicos.horas_punta[1]:
-                costo = energia * param_economicos.costo_punta
-            else:
-                costo = energia * param_economicos.costo_normal
-            costos[dia] += costo
+    dibujar_cola(datos_cola(), block)
+
+
+def datos_costos_dia(config=None, tiempo_ruta=37.2):
+    """Costo eléctrico de cada día y si cae en fin de semana."""
+    config = config or modelo.configuracion_actual(verbose=False)
+    estacion = simular(config=config, tiempo_ruta=tiempo_ruta)
+    dias = config.simulacion.dias
+    economicos = config.economicos
+    return {
+        "costos": estacion.registro_intercambios.costo_diario(
+            dias, economicos.costo_normal, economicos.costo_punta
+        ),
+        "fin_de_semana": [modelo.es_fin_de_semana(d * 24) for d in range(dias)],
+    }
+
 
+def dibujar_costos_dia(datos, block: bool = True):
+    plt = _importar_pyplot()
+    if plt is None:
+        return
     colores = [
-        "tab:orange" if modelo.es_fin_de_semana(d * 24) else "tab:blue"
-        for d in range(dias)
+        "tab:orange" if fin_de_semana else "tab:blue"
+        for fin_de_semana in datos["fin_de_semana"]
     ]
 
     plt.style.use(ESTILO_MEJOR)
     plt.figure(figsize=(8, 4))
-    plt.bar(range(dias), costos, color=colores)
+    plt.bar(range(len(datos["costos"])), datos["costos"], color=colores)
     plt.xlabel("Día de operación")
     plt.ylabel("Costo diario (S/.)")
     plt.title("Costo eléctrico por día")
@@ -330,23 +395,31 @@ def grafico_costos_dia(block: bool = True):
     plt.show(block=block)
 
 
-def grafico_uso_cargadores(block: bool = True):
-    """Muestra la utilización porcentual de los cargadores."""
-    try:
-        import matplotlib.pyplot as plt
-    except Exception:
-        print("Falta matplotlib. Ejecuta 'pip install -r requirements.txt'")
+def grafico_costos_dia(block: bool = True):
+    """Grafica el costo eléctrico por día de operación."""
+    if _importar_pyplot() is None:
+        return
+    dibujar_costos_dia(datos_costos_dia(), block)
+
+
+def datos_uso_cargadores(config=None, tiempo_ruta=37.2):
+    """Porcentaje de cargadores ocupados en cada hora."""
+    config = config or modelo.configuracion_actual(verbose=False)
+    horas, cargando = series_horarias(config, tiempo_ruta)["cargadores_ocupados"]
+    return {
+        "dias": horas / 24,
+        "uso": cargando / config.estacion.capacidad_estacion * 100,
+    }
+
+
+def dibujar_uso_cargadores(datos, block: bool = True):
+    plt = _importar_pyplot()
+    if plt is None:
         return
-    _, datos = _simular_con_registro()
-    horas = range(len(datos["cargando"]))
-    dias = [h / 24 for h in horas]
-    uso = [
-        c / param_estacion.capacidad_estacion * 100 for c in datos["cargando"]
-    ]
 
     plt.style.use(ESTILO_MEJOR)
     plt.figure(figsize=(8, 4))
-    plt.plot(dias, uso, marker="o")
+    plt.plot(datos["dias"], datos["uso"], marker="o")
     plt.xlabel("Día de simulación")
     plt.ylabel("Uso de cargadores (%)")
     plt.title("Utilización de cargadores")
@@ -356,6 +429,53 @@ def grafico_uso_cargadores(block: bool = True):
     plt.show(block=block)
 
 
+def grafico_uso_cargadores(block: bool = True):
+    """Muestra la utilización porcentual de los cargadores."""
+    if _importar_pyplot() is None:
+        return
+    dibujar_uso_cargadores(datos_uso_cargadores(), block)
+
+
+# Gráficos disponibles: nombre -> (cálculo de los datos, dibujo)
+GRAFICOS = {
+    "carga": (datos_carga_bateria, dibujar_carga_bateria),
+    "costos": (datos_costos, dibujar_costos),
+    "diarios": (datos_diarios, dibujar_diarios),
+    "emisiones": (datos_emisiones, dibujar_emisiones),
+    "inventario": (datos_inventario, dibujar_inventario),
+    "cola": (datos_cola, dibujar_cola),
+    "costosdia": (datos_costos_dia, dibujar_costos_dia),
+    "cargadores": (datos_uso_cargadores, dibujar_uso_cargadores),
+    "trafico": (trafico.datos_trafico, trafico.dibujar_trafico),
+    "intercambio": (
+        tiempos_intercambio.datos_tiempos_intercambio,
+        tiempos_intercambio.dibujar_tiempos_intercambio,
+    ),
+    "espera_baterias": (
+        tiempos_intercambio.datos_espera_baterias,
+        tiempos_intercambio.dibujar_espera_baterias,
+    ),
+}
+
+
+def calcular_datos(nombre, **opciones):
+    """Datos del gráfico ``nombre`` sin tocar matplotlib.
+
+    ``opciones`` puede incluir ``config``, ``tiempo_ruta``, ``jobs``,
+    ``progreso`` y ``cancelado``; cada función ``datos_*`` recibe sólo las
+    que acepta. Los gráficos de barridos lanzan
+    :class:`barrido.BarridoCancelado` si se cancelan.
+    """
+    datos, _ = GRAFICOS[nombre]
+    aceptadas = inspect.signature(datos).parameters
+    return datos(**{k: v for k, v in opciones.items() if k in aceptadas})
+
+
+def dibujar(nombre, datos, block: bool = True):
+    """Dibuja con matplotlib los ``datos`` calculados para ``nombre``."""
+    GRAFICOS[nombre][1](datos, block)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Genera distintos gráficos del modelo de simulación"
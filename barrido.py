@@ -0,0 +1,207 @@
+"""Ejecución de barridos de parámetros en varios procesos.
+
+Un barrido es una lista de puntos; cada punto es un diccionario con las
+claves ``max_autobuses``, ``capacidad_estacion``, ``total_baterias``,
+``baterias_iniciales`` y ``semilla``. Las claves que falten se toman de los
+parámetros globales de :mod:`modelo` en el momento de llamar a
+:func:`ejecutar_barrido`.
+
+``ejecutar_barrido`` puede informar el avance con ``progreso(hechos,
+total)`` e interrumpirse cuando ``cancelado()`` devuelve verdadero; en ese
+caso lanza :class:`BarridoCancelado` y los puntos ya simulados quedan en la
+caché. En paralelo la cancelación vuelve dentro de
+:data:`INTERVALO_CANCELACION` sin esperar a los puntos en curso, que
+terminan en segundo plano y se descartan.
+
+Cada punto se simula con su propia :class:`parametros.RunConfig`, de modo
+que los globales de ``modelo`` nunca se modifican, y los resultados se
+devuelven en el mismo orden que los puntos. Los resultados se guardan en
+:data:`cache_resultados.cache`, por lo que repetir un punto ya simulado no
+vuelve a ejecutar la simulación. La caché guarda su propia copia de cada
+resumen y entrega copias, así que modificar un resultado (por ejemplo sus
+estadísticas) no altera los que se devuelvan después.
+"""
+
+import copy
+import os
+from concurrent.futures import FIRST_COMPLETED, wait
+
+import cache_resultados
+import modelo
+
+CLAVES_PUNTO = (
+    "max_autobuses",
+    "capacidad_estacion",
+    "total_baterias",
+    "baterias_iniciales",
+    "semilla",
+)
+
+# Segundos entre revisiones de ``cancelado`` mientras trabajan los procesos
+INTERVALO_CANCELACION = 0.1
+
+
+class BarridoCancelado(Exception):
+    """El barrido se interrumpió a pedido de ``cancelado``."""
+
+
+class ResumenSimulacion:
+    """Métricas de una simulación que pueden enviarse entre procesos."""
+
+    METRICAS = (
+        "intercambios_realizados",
+        "tiempo_espera_total",
+        "energia_total_cargada",
+        "costo_total_electrico",
+        "costo_total_gas",
+        "energia_total_gas",
+        "energia_punta_autobuses",
+        "energia_fuera_punta_autobuses",
+        "energia_punta_electrica",
+    )
+
+    def __init__(self, estacion, punto):
+        self.punto = dict(punto)
+        for metrica in self.METRICAS:
+            setattr(self, metrica, getattr(estacion, metrica))
+        self.espera_baterias = estacion.espera_baterias
+        self.espera_autobuses = estacion.espera_autobuses
+        self.registro_intercambios = estacion.registro_intercambios
+
+
+def config_punto(base, punto):
+    """Configuración de ``base`` con los valores del punto aplicados."""
+    desconocidas = set(punto) - set(CLAVES_PUNTO)
+    if desconocidas:
+        raise ValueError(f"Claves desconocidas en el punto: {sorted(desconocidas)}")
+    estacion = copy.copy(base.estacion)
+    estacion.actualizar(
+        capacidad=punto.get("capacidad_estacion"),
+        total=punto.get("total_baterias"),
+        iniciales=punto.get("baterias_iniciales"),
+    )
+    simulacion = copy.copy(base.simulacion)
+    simulacion.actualizar(
+        max_autobuses=punto.get("max_autobuses"), semilla=punto.get("semilla")
+    )
+    return base.con(estacion=estacion, simulacion=simulacion, verbose=False)
+
+
+def _ejecutar_punto(tarea):
+    """Simula un punto del barrido; se ejecuta dentro de cada proceso."""
+    config, punto, duracion, tiempo_ruta, engine = tarea
+    estacion = modelo.ejecutar_simulacion(
+        duracion=duracion, tiempo_ruta=tiempo_ruta, engine=engine, config=config
+    )
+    return ResumenSimulacion(estacion, punto)
+
+
+def ejecutar_barrido(
+    puntos,
+    jobs=None,
+    duracion=None,
+    tiempo_ruta=37.2,
+    engine="simpy",
+    usar_cache=True,
+    config=None,
+    progreso=None,
+    cancelado=None,
+):
+    """Simula cada punto y devuelve sus :class:`ResumenSimulacion` en orden.
+
+    ``jobs`` es la cantidad de procesos a utilizar; por defecto uno por
+    núcleo. Con ``jobs=1`` o un único punto se simula en el proceso actual.
+    Sólo se simulan los puntos que no están en la caché, salvo que
+    ``usar_cache`` sea ``False``. ``config`` es la configuración base de los
+    puntos; por defecto, una instantánea de los parámetros globales.
+
+    ``progreso(hechos, total)`` se llama cada vez que termina un punto y
+    ``cancelado()`` se revisa entre puntos; si devuelve verdadero se
+    descartan los puntos pendientes y se lanza :class:`BarridoCancelado`.
+    """
+    base = config or modelo.configuracion_actual()
+    cache = cache_resultados.cache
+    resultados = []
+    pendientes = []
+    for punto in puntos:
+        punto = dict(punto)
+        config_de_punto = config_punto(base, punto)
+        simulacion = config_de_punto.simulacion
+        horas = simulacion.duracion if duracion is None else duracion
+        tarea = (config_de_punto, punto, horas, tiempo_ruta, engine)
+        clave = None
+        resumen = None
+        if usar_cache:
+            clave = cache_resultados.clave_simulacion(
+                config_de_punto, simulacion.max_autobuses, horas, tiempo_ruta, engine
+            )
+            resumen = cache.obtener(clave)
+        if resumen is None:
+            pendientes.append((len(resultados), clave, tarea))
+        else:
+            # El mismo resultado puede provenir de un punto escrito distinto
+            resumen = copy.deepcopy(resumen)
+            resumen.punto = punto
+        resultados.append(resumen)
+
+    total = len(resultados)
+    hechos = total - len(pendientes)
+
+    def registrar(pendiente, resumen):
+        nonlocal hechos
+        indice, clave, _ = pendiente
+        if clave is not None:
+            cache.guardar(clave, copy.deepcopy(resumen))
+        resultados[indice] = resumen
+        hechos += 1
+        if progreso is not None:
+            progreso(hechos, total)
+
+    def revisar_cancelacion():
+        if cancelado is not None and cancelado():
+            raise BarridoCancelado(f"Barrido cancelado con {hechos} de {total} puntos")
+
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(pendientes))
+    if jobs <= 1:
+        for pendiente in pendientes:
+            revisar_cancelacion()
+            registrar(pendiente, _ejecutar_punto(pendiente[2]))
+    else:
+        # Se importa aquí: cargar ``multiprocessing`` sólo hace falta en paralelo
+        from concurrent.futures import ProcessPoolExecutor
+
+        ejecutor = ProcessPoolExecutor(max_workers=jobs)
+        try:
+            futuros = {
+                ejecutor.submit(_ejecutar_punto, pendiente[2]): pendiente
+                for pendiente in pendientes
+            }
+            restantes = set(futuros)
+            while restantes:
+                revisar_cancelacion()
+                listos, restantes = wait(
+                    restantes,
+                    timeout=INTERVALO_CANCELACION,
+                    return_when=FIRST_COMPLETED,
+                )
+                for futuro in listos:
+                    registrar(futuros[futuro], futuro.result())
+        except BaseException:
+            # No se espera a los puntos en curso: la cancelación debe volver
+            # enseguida
+            ejecutor.shutdown(wait=False, cancel_futures=True)
+            raise
+        ejecutor.shutdown()
+    return resultados
+
+
+def simular(
+    punto=None, duracion=None, tiempo_ruta=37.2, engine="simpy", config=None
+):
+    """Simula un único punto (por defecto los parámetros actuales) con caché."""
+    return ejecutar_barrido(
+        [punto or {}], jobs=1, duracion=duracion, tiempo_ruta=tiempo_ruta,
+        engine=engine, config=config,
+    )[0]
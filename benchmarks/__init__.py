@@ -0,0 +1 @@
+"""Mediciones de rendimiento de la simulación (ver :mod:`benchmarks.suite`)."""
@@ -0,0 +1,384 @@
+"""Mediciones de rendimiento de la simulación.
+
+Mide ``modelo.ejecutar_simulacion`` en varios niveles de escala y algunas
+funciones llamadas en cada evento, guarda los resultados en JSON y los
+compara con una línea base. Se ejecuta desde la raíz del repositorio::
+
+    python -m benchmarks.suite
+    python -m benchmarks.suite --niveles base anual --engine rapido
+    python -m benchmarks.suite --salida resultados.json --umbral-tiempo 0.1
+    python -m benchmarks.suite --guardar-linea-base
+
+Para cada escenario se informa el tiempo de pared (el mejor de
+``--repeticiones`` corridas), los eventos por segundo y el pico de memoria
+medido con ``tracemalloc`` en una corrida aparte, para que el rastreo no
+altere los tiempos. Los microbenchmarks informan nanosegundos por llamada.
+Las mediciones de arranque importan cada módulo de :data:`ARRANQUE` en un
+intérprete nuevo y registran el tiempo de importación y los módulos de
+:data:`MODULOS_PESADOS` que quedaron cargados.
+Si alguna medición empeora más que el umbral respecto de la línea base, o si
+una importación de arranque carga un módulo pesado, el programa termina con
+código 1.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import timeit
+import tracemalloc
+
+import modelo
+import trafico
+from flujos_aleatorios import FlujoUniforme
+from parametros import ParametrosBateria, ParametrosEstacion, ParametrosSimulacion
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LINEA_BASE = os.path.join(os.path.dirname(__file__), "linea_base.json")
+UMBRAL_TIEMPO = 0.25
+UMBRAL_MEMORIA = 0.10
+
+# Niveles de escala: nombre -> (descripción, parámetros de simulación y estación)
+NIVELES = {
+    "base": (
+        "20 autobuses, 21 días (valores por defecto)",
+        dict(dias=21, max_autobuses=20),
+        dict(capacidad_estacion=21, total_baterias=41, baterias_iniciales=20),
+    ),
+    "anual": (
+        "200 autobuses, 365 días",
+        dict(dias=365, max_autobuses=200),
+        dict(capacidad_estacion=210, total_baterias=410, baterias_iniciales=200),
+    ),
+    "estres": (
+        "20 autobuses, 21 días, 6 cargadores y 24 baterías",
+        dict(dias=21, max_autobuses=20),
+        dict(capacidad_estacion=6, total_baterias=24, baterias_iniciales=8),
+    ),
+}
+NIVELES_POR_DEFECTO = ("base", "estres")
+
+
+def _micro_tiempo_carga():
+    bateria = ParametrosBateria()
+    socs = [i * 0.9 for i in range(100)]
+    return lambda: [bateria.tiempo_carga(soc) for soc in socs], len(socs)
+
+
+def _micro_factor_trafico():
+    horas = [h + 0.5 for h in range(24)]
+    return lambda: [trafico.factor_trafico(hora) for hora in horas], len(horas)
+
+
+def _micro_formato_hora():
+    valores = [i * 7.3 for i in range(100)]
+    return lambda: [modelo.formato_hora(valor) for valor in valores], len(valores)
+
+
+def _micro_duracion_y_consumo():
+    config = modelo.configuracion_actual(verbose=False)
+    consumo = FlujoUniforme(config.simulacion.semilla, 0, 0, 1.1, 1.3)
+    horas = list(range(24))
+    return (
+        lambda: [
+            modelo.duracion_y_consumo(37.2, hora, config, consumo())
+            for hora in horas
+        ],
+        len(horas),
+    )
+
+
+# Microbenchmarks: nombre -> función que devuelve ``(llamada, operaciones)``
+MICRO = {
+    "tiempo_carga": _micro_tiempo_carga,
+    "factor_trafico": _micro_factor_trafico,
+    "formato_hora": _micro_formato_hora,
+    "duracion_y_consumo": _micro_duracion_y_consumo,
+}
+
+
+# Módulos cuyo arranque se mide: la línea de comandos y el motor rápido
+ARRANQUE = ("cli", "modelo", "motor_rapido")
+# Dependencias que sólo deben cargarse cuando se usan
+MODULOS_PESADOS = ("simpy", "numpy", "matplotlib", "PyQt5")
+
+# Programa que se ejecuta en cada intérprete nuevo
+_PROGRAMA_ARRANQUE = """
+import json, sys, time
+inicio = time.perf_counter()
+import {modulo}
+tiempo = time.perf_counter() - inicio
+print(json.dumps([tiempo, [m for m in {pesados!r} if m in sys.modules]]))
+"""
+
+
+def config_nivel(nivel):
+    """:class:`parametros.RunConfig` del nivel de escala ``nivel``."""
+    _, simulacion, estacion = NIVELES[nivel]
+    return modelo.configuracion_actual(verbose=False).con(
+        simulacion=ParametrosSimulacion(**simulacion),
+        estacion=ParametrosEstacion(**estacion),
+    )
+
+
+def eventos_procesados(estacion):
+    """Eventos de la corrida: los del calendario propio o los de SimPy."""
+    if hasattr(estacion, "eventos_procesados"):
+        return estacion.eventos_procesados
+    # SimPy numera cada evento programado con ``Environment._eid``
+    return next(estacion.env._eid)
+
+
+def medir_escenario(nivel, engine="rapido", repeticiones=3):
+    """Tiempo, eventos por segundo y pico de memoria de un nivel."""
+    config = config_nivel(nivel)
+    tiempos = []
+    for _ in range(repeticiones):
+        gc.collect()
+        inicio = time.perf_counter()
+        estacion = modelo.ejecutar_simulacion(engine=engine, config=config)
+        tiempos.append(time.perf_counter() - inicio)
+    eventos = eventos_procesados(estacion)
+    del estacion
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        modelo.ejecutar_simulacion(engine=engine, config=config)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    tiempo = min(tiempos)
+    return {
+        "tiempo_s": tiempo,
+        "eventos": eventos,
+        "eventos_por_s": eventos / tiempo,
+        "memoria_pico_mb": pico / 2**20,
+    }
+
+
+def medir_micro(nombre, repeticiones=5, numero=None):
+    """Nanosegundos por llamada de un microbenchmark (el mejor de varios)."""
+    llamada, operaciones = MICRO[nombre]()
+    temporizador = timeit.Timer(llamada)
+    if numero is None:
+        numero, _ = temporizador.autorange()
+    mejor = min(temporizador.repeat(repeat=repeticiones, number=numero))
+    return {"ns_por_llamada": mejor / (numero * operaciones) * 1e9}
+
+
+def medir_arranque(modulo, repeticiones=10):
+    """Tiempo de ``import modulo`` en un intérprete nuevo (el mejor de varios).
+
+    Devuelve además los :data:`MODULOS_PESADOS` cargados por la importación.
+    """
+    programa = _PROGRAMA_ARRANQUE.format(modulo=modulo, pesados=MODULOS_PESADOS)
+    tiempos = []
+    for _ in range(repeticiones):
+        salida = subprocess.run(
+            [sys.executable, "-c", programa],
+            cwd=RAIZ,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        tiempo, pesados = json.loads(salida)
+        tiempos.append(tiempo)
+    return {"tiempo_s": min(tiempos), "modulos_pesados": pesados}
+
+
+def ejecutar(niveles=NIVELES_POR_DEFECTO, engines=modelo.MOTORES, repeticiones=3,
+             micro=True, arranque=True):
+    """Corre los escenarios y microbenchmarks pedidos y devuelve un diccionario."""
+    resultados = {
+        "entorno": {
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "procesadores": os.cpu_count(),
+            "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "escenarios": {},
+        "micro": {},
+        "arranque": {},
+    }
+    for nivel in niveles:
+        for engine in engines:
+            resultados["escenarios"][f"{nivel}/{engine}"] = medir_escenario(
+                nivel, engine, repeticiones
+            )
+    if micro:
+        for nombre in MICRO:
+            resultados["micro"][nombre] = medir_micro(nombre)
+    if arranque:
+        for modulo in ARRANQUE:
+            resultados["arranque"][modulo] = medir_arranque(modulo)
+    return resultados
+
+
+# Métricas comparadas con la línea base: (sección, métrica, umbral)
+_COMPARADAS = (
+    ("escenarios", "tiempo_s", "tiempo"),
+    ("escenarios", "memoria_pico_mb", "memoria"),
+    ("micro", "ns_por_llamada", "tiempo"),
+    ("arranque", "tiempo_s", "tiempo"),
+)
+
+
+def comparar(resultados, linea_base, umbral_tiempo=UMBRAL_TIEMPO,
+             umbral_memoria=UMBRAL_MEMORIA):
+    """Lista de ``(medición, base, actual, cambio)`` que superan el umbral.
+
+    ``cambio`` es el aumento relativo respecto de la línea base. Sólo se
+    comparan las mediciones presentes en ambos diccionarios.
+    """
+    umbrales = {"tiempo": umbral_tiempo, "memoria": umbral_memoria}
+    regresiones = []
+    for seccion, metrica, tipo in _COMPARADAS:
+        base_seccion = linea_base.get(seccion, {})
+        for nombre, valores in resultados.get(seccion, {}).items():
+            base = base_seccion.get(nombre, {}).get(metrica)
+            actual = valores.get(metrica)
+            if not base or actual is None:
+                continue
+            cambio = actual / base - 1
+            if cambio > umbrales[tipo]:
+                regresiones.append((f"{seccion}/{nombre}/{metrica}", base, actual, cambio))
+    return regresiones
+
+
+def pesados_en_arranque(resultados):
+    """Lista de ``(módulo, pesados)`` de las importaciones que cargan alguno."""
+    return [
+        (modulo, valores["modulos_pesados"])
+        for modulo, valores in resultados.get("arranque", {}).items()
+        if valores["modulos_pesados"]
+    ]
+
+
+def formatear(resultados, linea_base=None):
+    """Devuelve una lista con los textos de las mediciones."""
+    linea_base = linea_base or {}
+    lines = []
+
+    def cambio(seccion, nombre, metrica, valor):
+        base = linea_base.get(seccion, {}).get(nombre, {}).get(metrica)
+        return f" ({valor / base - 1:+.1%})" if base else ""
+
+    for nombre, valores in resultados["escenarios"].items():
+        lines.append(
+            f"{nombre}: {valores['tiempo_s']:.3f} s"
+            f"{cambio('escenarios', nombre, 'tiempo_s', valores['tiempo_s'])}, "
+            f"{valores['eventos_por_s']:,.0f} eventos/s, "
+            f"{valores['memoria_pico_mb']:.1f} MB"
+            f"{cambio('escenarios', nombre, 'memoria_pico_mb', valores['memoria_pico_mb'])}"
+        )
+    for nombre, valores in resultados["micro"].items():
+        ns = valores["ns_por_llamada"]
+        lines.append(
+            f"{nombre}: {ns:.0f} ns/llamada{cambio('micro', nombre, 'ns_por_llamada', ns)}"
+        )
+    for modulo, valores in resultados.get("arranque", {}).items():
+        tiempo = valores["tiempo_s"]
+        lines.append(
+            f"import {modulo}: {tiempo * 1e3:.1f} ms"
+            f"{cambio('arranque', modulo, 'tiempo_s', tiempo)}"
+        )
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Mide el rendimiento de la simulación"
+    )
+    parser.add_argument(
+        "--niveles",
+        nargs="+",
+        choices=tuple(NIVELES),
+        default=list(NIVELES_POR_DEFECTO),
+        help="Niveles de escala a medir (por defecto base y estres)",
+    )
+    parser.add_argument(
+        "--engine",
+        nargs="+",
+        choices=modelo.MOTORES,
+        default=list(modelo.MOTORES),
+        help="Motores a medir",
+    )
+    parser.add_argument(
+        "--repeticiones", type=int, default=3, help="Corridas por escenario"
+    )
+    parser.add_argument(
+        "--sin-micro", action="store_true", help="Omite los microbenchmarks"
+    )
+    parser.add_argument(
+        "--sin-arranque",
+        action="store_true",
+        help="Omite las mediciones de tiempo de importación",
+    )
+    parser.add_argument("--salida", help="Archivo JSON donde guardar los resultados")
+    parser.add_argument(
+        "--linea-base",
+        default=LINEA_BASE,
+        help="Archivo JSON con la línea base a comparar",
+    )
+    parser.add_argument(
+        "--guardar-linea-base",
+        action="store_true",
+        help="Reemplaza la línea base con estos resultados",
+    )
+    parser.add_argument(
+        "--umbral-tiempo",
+        type=float,
+        default=UMBRAL_TIEMPO,
+        help="Aumento relativo de tiempo tolerado (por defecto 0.25)",
+    )
+    parser.add_argument(
+        "--umbral-memoria",
+        type=float,
+        default=UMBRAL_MEMORIA,
+        help="Aumento relativo del pico de memoria tolerado (por defecto 0.10)",
+    )
+    args = parser.parse_args(argv)
+
+    resultados = ejecutar(
+        args.niveles,
+        args.engine,
+        args.repeticiones,
+        micro=not args.sin_micro,
+        arranque=not args.sin_arranque,
+    )
+    linea_base = None
+    if not args.guardar_linea_base and os.path.exists(args.linea_base):
+        with open(args.linea_base, encoding="utf-8") as archivo:
+            linea_base = json.load(archivo)
+    for line in formatear(resultados, linea_base):
+        print(line)
+
+    destinos = [args.salida] if args.salida else []
+    if args.guardar_linea_base:
+        destinos.append(args.linea_base)
+    for destino in destinos:
+        with open(destino, "w", encoding="utf-8") as archivo:
+            json.dump(resultados, archivo, indent=2)
+            archivo.write("\n")
+
+    pesados = pesados_en_arranque(resultados)
+    for modulo, cargados in pesados:
+        print(f"'import {modulo}' carga módulos pesados: {', '.join(cargados)}")
+    if linea_base is None:
+        return 1 if pesados else 0
+    regresiones = comparar(
+        resultados, linea_base, args.umbral_tiempo, args.umbral_memoria
+    )
+    for nombre, base, actual, cambio in regresiones:
+        print(f"Regresión en {nombre}: {base:.4g} -> {actual:.4g} ({cambio:+.1%})")
+    return 1 if regresiones or pesados else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
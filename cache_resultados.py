@@ -0,0 +1,170 @@
+"""Caché de resultados de simulación indexada por contenido.
+
+La clave de cada simulación es un hash SHA-256 de los cinco objetos de
+parámetros de su :class:`parametros.RunConfig` (incluida la semilla), la
+cantidad de autobuses, la duración, la distancia de la ruta, el motor y
+:data:`VERSION_MOTOR`. Dos simulaciones con la misma clave producen el mismo
+resultado, por lo que puede reutilizarse.
+
+Hay dos niveles: un LRU en memoria del proceso y un directorio en disco con
+un archivo ``pickle`` por clave. Cuando el directorio supera el tamaño
+máximo se eliminan los archivos usados hace más tiempo.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+
+from parametros.configuracion import CAMPOS_PARAMETROS
+
+# Incrementar cuando un cambio en el modelo altere los resultados para
+# invalidar lo guardado en disco.
+VERSION_MOTOR = 4
+
+DIRECTORIO_POR_DEFECTO = os.environ.get(
+    "SIMULACION_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "simulacion_baterias"),
+)
+
+
+def _estado(objeto):
+    """Atributos de un objeto de parámetros en un orden estable."""
+    return dict(sorted(vars(objeto).items()))
+
+
+def clave_simulacion(config, max_autobuses, duracion, tiempo_ruta, engine):
+    """Hash estable de todo lo que determina el resultado de una simulación.
+
+    ``config`` es la :class:`parametros.RunConfig` de la corrida; su campo
+    ``verbose`` no altera el resultado y no forma parte de la clave;
+    ``guardar_muestras`` sí, porque cambia lo que se guarda.
+    """
+    contenido = {
+        "parametros": {
+            campo: _estado(getattr(config, campo)) for campo in CAMPOS_PARAMETROS
+        },
+        "max_autobuses": max_autobuses,
+        "duracion": duracion,
+        "tiempo_ruta": tiempo_ruta,
+        "engine": engine,
+        "guardar_muestras": config.guardar_muestras,
+        "version": VERSION_MOTOR,
+    }
+    texto = json.dumps(contenido, sort_keys=True, default=repr)
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+class CacheResultados:
+    """Caché de dos niveles con contadores de aciertos y fallos.
+
+    ``capacidad`` es la cantidad de resultados que se guardan en memoria.
+    Con ``directorio=None`` no se usa el nivel en disco; ``limite_disco`` es
+    su tamaño máximo en bytes. El nivel en memoria puede usarse desde varios
+    hilos, como los de la interfaz gráfica.
+    """
+
+    def __init__(self, capacidad=32, directorio=None, limite_disco=256 * 2**20):
+        self.capacidad = capacidad
+        self.directorio = directorio
+        self.limite_disco = limite_disco
+        self._memoria = OrderedDict()
+        self._candado = threading.Lock()
+        self.aciertos_memoria = 0
+        self.aciertos_disco = 0
+        self.fallos = 0
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, clave + ".pkl")
+
+    def obtener(self, clave):
+        """Devuelve el resultado guardado para ``clave`` o ``None``."""
+        with self._candado:
+            if clave in self._memoria:
+                self._memoria.move_to_end(clave)
+                self.aciertos_memoria += 1
+                return self._memoria[clave]
+        if self.directorio is not None:
+            ruta = self._ruta(clave)
+            try:
+                with open(ruta, "rb") as archivo:
+                    valor = pickle.load(archivo)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                pass
+            else:
+                # Marcar el archivo como usado recientemente
+                os.utime(ruta)
+                self.aciertos_disco += 1
+                self._guardar_en_memoria(clave, valor)
+                return valor
+        self.fallos += 1
+        return None
+
+    def guardar(self, clave, valor):
+        """Guarda ``valor`` en ambos niveles."""
+        self._guardar_en_memoria(clave, valor)
+        if self.directorio is None:
+            return
+        os.makedirs(self.directorio, exist_ok=True)
+        # Escribir en un archivo temporal y renombrar para que otro proceso
+        # nunca lea un resultado a medio escribir.
+        descriptor, temporal = tempfile.mkstemp(dir=self.directorio, suffix=".tmp")
+        with os.fdopen(descriptor, "wb") as archivo:
+            pickle.dump(valor, archivo, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporal, self._ruta(clave))
+        self._recortar_disco()
+
+    def _guardar_en_memoria(self, clave, valor):
+        with self._candado:
+            self._memoria[clave] = valor
+            self._memoria.move_to_end(clave)
+            while len(self._memoria) > self.capacidad:
+                self._memoria.popitem(last=False)
+
+    def _recortar_disco(self):
+        """Elimina los archivos menos usados hasta respetar ``limite_disco``."""
+        archivos = []
+        for nombre in os.listdir(self.directorio):
+            if not nombre.endswith(".pkl"):
+                continue
+            ruta = os.path.join(self.directorio, nombre)
+            try:
+                info = os.stat(ruta)
+            except OSError:
+                continue
+            archivos.append((info.st_mtime, info.st_size, ruta))
+        total = sum(tamano for _, tamano, _ in archivos)
+        for _, tamano, ruta in sorted(archivos):
+            if total <= self.limite_disco:
+                break
+            try:
+                os.remove(ruta)
+            except OSError:
+                continue
+            total -= tamano
+
+    def limpiar(self):
+        """Vacía ambos niveles y reinicia los contadores."""
+        with self._candado:
+            self._memoria.clear()
+        if self.directorio is not None and os.path.isdir(self.directorio):
+            for nombre in os.listdir(self.directorio):
+                if nombre.endswith(".pkl"):
+                    os.remove(os.path.join(self.directorio, nombre))
+        self.aciertos_memoria = self.aciertos_disco = self.fallos = 0
+
+    def estadisticas(self):
+        """Contadores de aciertos y fallos."""
+        return {
+            "aciertos_memoria": self.aciertos_memoria,
+            "aciertos_disco": self.aciertos_disco,
+            "fallos": self.fallos,
+            "en_memoria": len(self._memoria),
+        }
+
+
+# Caché compartida por los gráficos y los barridos
+cache = CacheResultados(directorio=DIRECTORIO_POR_DEFECTO)
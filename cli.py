@@ -1,19 +1,124 @@
 import argparse
 
 import modelo
+import optimizador
+import trazas
 
+# Réplicas máximas cuando sólo se indica --precision
+REPLICAS_MAXIMAS = 50
 
-def main():
-    parser = argparse.ArgumentParser(
-        description="Ejecuta la simulación de intercambio de baterías"
+
+def _agregar_comunes(parser, suprimir=False):
+    """Opciones válidas antes y después del subcomando.
+
+    En el subcomando (``suprimir``) no tienen valor por defecto, para no
+    pisar las que se hayan escrito antes de su nombre.
+    """
+
+    def defecto(valor):
+        return argparse.SUPPRESS if suprimir else valor
+
+    parser.add_argument(
+        "--dias",
+        type=int,
+        default=defecto(None),
+        help="Duración de la simulación en días",
     )
     parser.add_argument(
-        "--dias", type=int, help="Duración de la simulación en días"
+        "--max-autobuses",
+        type=int,
+        default=defecto(None),
+        help="Cantidad de autobuses en la flota",
     )
     parser.add_argument(
-        "--max-autobuses", type=int, help="Cantidad de autobuses en la flota"
+        "--semilla", type=int, default=defecto(None), help="Semilla aleatoria"
+    )
+    parser.add_argument(
+        "--baterias-iniciales",
+        type=int,
+        default=defecto(None),
+        help="Baterías con las que inicia la estación",
+    )
+    parser.add_argument(
+        "--tiempo-ruta",
+        type=float,
+        default=defecto(37.2),
+        help="Distancia de la ruta en kilómetros",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=modelo.MOTORES,
+        default=defecto(None),
+        help="Motor de simulación a utilizar (por defecto simpy; rapido en "
+        "'optimizar')",
+    )
+
+
+def _agregar_optimizar(subparsers):
+    parser = subparsers.add_parser(
+        "optimizar",
+        help="Busca la estación más barata que cumple un nivel de servicio",
+        description="Busca la cantidad de cargadores y baterías de menor "
+        "costo con la que el percentil indicado de la espera de los autobuses "
+        "no supera el máximo en ninguna réplica",
+    )
+    _agregar_comunes(parser, suprimir=True)
+    parser.add_argument(
+        "--percentil",
+        type=float,
+        default=optimizador.PERCENTIL_SLA,
+        help="Percentil de la espera limitado por el SLA (0 a 1)",
+    )
+    parser.add_argument(
+        "--espera-maxima",
+        type=float,
+        default=optimizador.ESPERA_MAXIMA,
+        help="Espera máxima en minutos para ese percentil",
+    )
+    parser.add_argument(
+        "--replicas",
+        type=int,
+        default=argparse.SUPPRESS,
+        help="Réplicas por configuración "
+        f"(por defecto {optimizador.REPLICAS_POR_CANDIDATO})",
+    )
+    parser.add_argument(
+        "--costo-cargador",
+        type=float,
+        default=1.0,
+        help="Costo de cada cargador en el objetivo",
     )
-    parser.add_argument("--semilla", type=int, help="Semilla aleatoria")
+    parser.add_argument(
+        "--costo-bateria",
+        type=float,
+        default=1.0,
+        help="Costo de cada batería en el objetivo",
+    )
+    parser.add_argument(
+        "--incluir-operacion",
+        action="store_true",
+        help="Suma al objetivo el costo eléctrico medio de la simulación",
+    )
+    parser.add_argument(
+        "--max-cargadores",
+        type=int,
+        help="Máximo de cargadores a probar (por defecto dos por autobús)",
+    )
+    parser.add_argument(
+        "--max-baterias",
+        type=int,
+        help="Máximo de baterías a probar (por defecto cuatro por autobús)",
+    )
+    parser.add_argument(
+        "--jobs", type=int, help="Procesos a utilizar (por defecto uno por núcleo)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Ejecuta la simulación de intercambio de baterías"
+    )
+    _agregar_comunes(parser)
     parser.add_argument(
         "--capacidad-estacion",
         type=int,
@@ -25,17 +130,52 @@ def main():
         help="Número total de baterías de la estación",
     )
     parser.add_argument(
-        "--baterias-iniciales",
+        "--traza",
+        metavar="ARCHIVO",
+        help="Guarda los eventos de la simulación en un archivo columnar "
+        "(se muestran con 'python trazas.py ARCHIVO')",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="simulacion.pstats",
+        metavar="ARCHIVO",
+        help="Muestra eventos y tiempo por tipo de proceso y guarda el perfil "
+        "de cProfile en ARCHIVO (por defecto simulacion.pstats)",
+    )
+    parser.add_argument(
+        "--replicas",
         type=int,
-        help="Baterías con las que inicia la estación",
+        help="Simula N réplicas con semillas consecutivas e informa medias e "
+        "intervalos de confianza (con --precision es el máximo)",
     )
     parser.add_argument(
-        "--tiempo-ruta",
+        "--precision",
         type=float,
-        default=37.2,
-        help="Distancia de la ruta en kilómetros",
+        help="Semiancho relativo del intervalo al que detenerse, p. ej. 0.01 "
+        f"para ±1 %% (por defecto hasta {REPLICAS_MAXIMAS} réplicas)",
     )
+    _agregar_optimizar(parser.add_subparsers(dest="comando"))
     args = parser.parse_args()
+    if args.comando == "optimizar":
+        if args.traza or args.profile or args.precision is not None:
+            parser.error("optimizar no admite --traza, --profile ni --precision")
+        if args.replicas is not None and args.replicas < 1:
+            parser.error("--replicas debe ser al menos 1")
+        if not 0 < args.percentil <= 1:
+            parser.error("--percentil debe estar entre 0 y 1")
+    usar_replicas = args.replicas is not None or args.precision is not None
+    if usar_replicas and (args.traza or args.profile):
+        parser.error(
+            "--traza y --profile no pueden combinarse con --replicas ni "
+            "--precision"
+        )
+    if args.traza and args.engine == "rapido":
+        parser.error("--traza sólo está disponible con --engine simpy")
+    if args.replicas is not None and args.replicas < 1:
+        parser.error("--replicas debe ser al menos 1")
+    if args.precision is not None and args.precision <= 0:
+        parser.error("--precision debe ser positiva")
 
     if any(v is not None for v in [args.dias, args.max_autobuses, args.semilla]):
         modelo.param_simulacion.actualizar(
@@ -52,12 +192,67 @@ def main():
             iniciales=args.baterias_iniciales,
         )
 
-    estacion = modelo.ejecutar_simulacion(
-        max_autobuses=modelo.param_simulacion.max_autobuses,
-        duracion=modelo.param_simulacion.duracion,
-        tiempo_ruta=args.tiempo_ruta,
-    )
+    if args.comando == "optimizar":
+        resultado = optimizador.optimizar_estacion(
+            max_autobuses=modelo.param_simulacion.max_autobuses,
+            percentil=args.percentil,
+            espera_maxima=args.espera_maxima,
+            replicas=args.replicas or optimizador.REPLICAS_POR_CANDIDATO,
+            costo_cargador=args.costo_cargador,
+            costo_bateria=args.costo_bateria,
+            incluir_operacion=args.incluir_operacion,
+            max_cargadores=args.max_cargadores,
+            max_baterias=args.max_baterias,
+            jobs=args.jobs,
+            tiempo_ruta=args.tiempo_ruta,
+            engine=args.engine or "rapido",
+            config=modelo.configuracion_actual(verbose=False),
+        )
+        for line in optimizador.formatear_optimizacion(resultado):
+            print(line)
+        return
+
+    engine = args.engine or "simpy"
+    if usar_replicas:
+        import replicas
+
+        resultado = replicas.ejecutar_replicas(
+            replicas=args.replicas or REPLICAS_MAXIMAS,
+            precision=args.precision,
+            tiempo_ruta=args.tiempo_ruta,
+            engine=engine,
+            config=modelo.configuracion_actual(verbose=False),
+        )
+        for line in replicas.formatear_replicas(resultado):
+            print(line)
+        return
+
+    traza = trazas.SumideroColumnar(args.traza) if args.traza else None
+    perfil = None
+    if args.profile:
+        import perfilado
+
+        perfil = perfilado.Perfil(cprofile=True)
+    try:
+        estacion = modelo.ejecutar_simulacion(
+            max_autobuses=modelo.param_simulacion.max_autobuses,
+            duracion=modelo.param_simulacion.duracion,
+            tiempo_ruta=args.tiempo_ruta,
+            engine=engine,
+            traza=traza,
+            perfil=perfil,
+        )
+    finally:
+        if traza is not None:
+            traza.cerrar()
     modelo.imprimir_resultados(estacion)
+    if perfil is not None:
+        perfil.guardar_pstats(args.profile)
+        print()
+        for line in perfilado.formatear_perfil(perfil):
+            print(line)
+        print(f"Perfil de cProfile guardado en {args.profile} "
+              f"(se lee con 'python -m pstats {args.profile}')")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,49 @@
+"""Cola de baterías de SimPy usada por :class:`modelo.EstacionIntercambio`.
+
+Sólo se importa al crear una estación del motor de SimPy. No importa
+SimPy: trabaja con los eventos del entorno que recibe.
+"""
+
+from collections import deque
+
+
+class ColaBaterias:
+    """Cola FIFO de identificadores de batería respaldada por un ``deque``.
+
+    Ofrece ``put``, ``get``, ``items`` y ``get_queue`` como un
+    ``simpy.Store`` sin límite de capacidad, pero sólo con la interfaz
+    pública de los eventos de SimPy. Los pedidos se atienden en el mismo
+    orden que en el ``Store``: al crear el pedido o al procesarse un
+    depósito, y siempre el más antiguo primero.
+
+    Al depositar una batería se actualiza su ubicación y la hora de ingreso en
+    el registro, de modo que ambos datos no pueden desincronizarse.
+    """
+
+    def __init__(self, env, registro, items, estado):
+        self.env = env
+        self.registro = registro
+        self.items = items
+        self.estado = estado
+        # Pedidos sin atender, en orden de llegada
+        self.get_queue = deque()
+
+    def put(self, bateria):
+        """Deposita ``bateria``; el evento devuelto ya está disparado."""
+        self.registro.estado[bateria] = self.estado
+        self.registro.ingreso[bateria] = self.env.now
+        self.items.append(bateria)
+        evento = self.env.event()
+        evento.callbacks.append(self._atender)
+        return evento.succeed()
+
+    def get(self):
+        """Evento que entrega la primera batería cuando haya alguna."""
+        evento = self.env.event()
+        self.get_queue.append(evento)
+        self._atender()
+        return evento
+
+    def _atender(self, _deposito=None):
+        if self.get_queue and self.items:
+            self.get_queue.popleft().succeed(self.items.popleft())
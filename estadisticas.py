@@ -0,0 +1,231 @@
+"""Estadísticas en línea con memoria constante.
+
+:class:`EstadisticaEnLinea` acumula cantidad, suma, media y varianza
+(algoritmo de Welford), mínimo y máximo, y estima cuantiles con
+:class:`DigestoCuantiles`, un resumen al estilo *t-digest* que agrupa las
+observaciones en a lo sumo unos ``compresion`` centroides. Guardar las
+muestras completas es opcional.
+
+Se eligió un digesto y no el algoritmo P² porque los tiempos de espera de la
+simulación no llegan en orden aleatorio (el arranque de la jornada produce
+una rampa inicial) y P² queda atrapado en esas primeras observaciones.
+"""
+
+import math
+from array import array
+
+# Cuantiles incluidos en ``EstadisticaEnLinea.resumen``
+CUANTILES = (0.5, 0.9, 0.99)
+
+
+class DigestoCuantiles:
+    """Resumen de cuantiles con memoria acotada (t-digest con fusión).
+
+    Las observaciones se acumulan en un búfer de ``tamano_bufer`` valores y
+    luego se fusionan con los centroides existentes. La escala ``k1`` deja
+    centroides pequeños en las colas, por lo que los cuantiles extremos se
+    estiman con más precisión que los centrales.
+    """
+
+    def __init__(self, compresion=100, tamano_bufer=500):
+        self.compresion = compresion
+        self.tamano_bufer = tamano_bufer
+        self.total = 0
+        self.minimo = math.inf
+        self.maximo = -math.inf
+        self._medias = []
+        self._pesos = []
+        self._bufer = []
+
+    def agregar(self, x):
+        self._bufer.append(x)
+        self.total += 1
+        if x < self.minimo:
+            self.minimo = x
+        if x > self.maximo:
+            self.maximo = x
+        if len(self._bufer) >= self.tamano_bufer:
+            self._fusionar()
+
+    def agregar_varios(self, valores):
+        """Equivale a :meth:`agregar` con cada valor de ``valores``, en orden."""
+        while valores:
+            espacio = max(1, self.tamano_bufer - len(self._bufer))
+            parte, valores = valores[:espacio], valores[espacio:]
+            self._bufer.extend(parte)
+            self.total += len(parte)
+            self.minimo = min(self.minimo, min(parte))
+            self.maximo = max(self.maximo, max(parte))
+            if len(self._bufer) >= self.tamano_bufer:
+                self._fusionar()
+
+    def _limite(self, q):
+        """Fracción acumulada máxima del centroide que empieza en ``q``."""
+        delta = self.compresion
+        k = delta / (2 * math.pi) * math.asin(2 * q - 1) + 1
+        if k >= delta / 4:
+            return 1.0
+        return (1 + math.sin(2 * math.pi * k / delta)) / 2
+
+    def _fusionar(self):
+        if not self._bufer:
+            return
+        puntos = sorted(
+            list(zip(self._medias, self._pesos)) + [(x, 1) for x in self._bufer]
+        )
+        self._bufer = []
+        total = self.total
+        medias = []
+        pesos = []
+        media, peso = puntos[0]
+        acumulado = 0
+        limite = total * self._limite(0.0)
+        for siguiente, peso_siguiente in puntos[1:]:
+            if acumulado + peso + peso_siguiente <= limite:
+                peso += peso_siguiente
+                media += (siguiente - media) * peso_siguiente / peso
+            else:
+                medias.append(media)
+                pesos.append(peso)
+                acumulado += peso
+                limite = total * self._limite(acumulado / total)
+                media, peso = siguiente, peso_siguiente
+        medias.append(media)
+        pesos.append(peso)
+        self._medias = medias
+        self._pesos = pesos
+
+    def cuantil(self, p):
+        """Estimación del cuantil ``p`` (entre 0 y 1)."""
+        if not 0 <= p <= 1:
+            raise ValueError("El cuantil debe estar entre 0 y 1")
+        self._fusionar()
+        if not self.total:
+            return math.nan
+        medias, pesos = self._medias, self._pesos
+        objetivo = p * self.total
+        # Cada centroide representa su masa centrada en su media; entre
+        # centros consecutivos se interpola linealmente.
+        centro_anterior = 0.0
+        media_anterior = self.minimo
+        acumulado = 0
+        for media, peso in zip(medias, pesos):
+            centro = acumulado + peso / 2
+            if objetivo < centro:
+                if centro == centro_anterior:
+                    return media
+                fraccion = (objetivo - centro_anterior) / (centro - centro_anterior)
+                return media_anterior + (media - media_anterior) * fraccion
+            centro_anterior, media_anterior = centro, media
+            acumulado += peso
+        if self.total == centro_anterior:
+            return self.maximo
+        fraccion = (objetivo - centro_anterior) / (self.total - centro_anterior)
+        return media_anterior + (self.maximo - media_anterior) * fraccion
+
+    def __len__(self):
+        """Cantidad de centroides (tras fusionar el búfer)."""
+        self._fusionar()
+        return len(self._medias)
+
+
+class EstadisticaEnLinea:
+    """Resumen incremental de una serie de observaciones.
+
+    Con ``guardar_muestras=True`` se conservan además todas las
+    observaciones en :attr:`muestras` (un ``array`` de ``float``); en caso
+    contrario :attr:`muestras` es ``None`` y la memoria no crece con la
+    cantidad de datos.
+
+    Las observaciones se acumulan en un lote del tamaño del búfer del
+    digesto y se procesan juntas al llenarlo o al consultar la estadística;
+    el resultado es el mismo que procesarlas de a una.
+    """
+
+    def __init__(self, compresion=100, guardar_muestras=False):
+        self._n = 0
+        self._total = 0.0
+        self._media = 0.0
+        self._m2 = 0.0
+        self._digesto = DigestoCuantiles(compresion)
+        self._lote = []
+        self.muestras = array("d") if guardar_muestras else None
+
+    def __len__(self):
+        return self.n
+
+    def agregar(self, x):
+        lote = self._lote
+        lote.append(x)
+        if len(lote) >= self._digesto.tamano_bufer:
+            self._procesar_lote()
+        if self.muestras is not None:
+            self.muestras.append(x)
+
+    def _procesar_lote(self):
+        """Aplica el algoritmo de Welford y pasa al digesto el lote pendiente."""
+        lote = self._lote
+        if not lote:
+            return
+        self._lote = []
+        n, total, media, m2 = self._n, self._total, self._media, self._m2
+        for x in lote:
+            n += 1
+            total += x
+            delta = x - media
+            media += delta / n
+            m2 += delta * (x - media)
+        self._n, self._total, self._media, self._m2 = n, total, media, m2
+        self._digesto.agregar_varios(lote)
+
+    @property
+    def n(self):
+        self._procesar_lote()
+        return self._n
+
+    @property
+    def total(self):
+        self._procesar_lote()
+        return self._total
+
+    @property
+    def media(self):
+        self._procesar_lote()
+        return self._media
+
+    @property
+    def minimo(self):
+        return self._digesto.minimo if self.n else math.nan
+
+    @property
+    def maximo(self):
+        return self._digesto.maximo if self.n else math.nan
+
+    @property
+    def varianza(self):
+        """Varianza muestral (``nan`` con menos de dos observaciones)."""
+        if self.n < 2:
+            return math.nan
+        return self._m2 / (self._n - 1)
+
+    @property
+    def desviacion(self):
+        return math.sqrt(self.varianza)
+
+    def cuantil(self, p):
+        """Estimación del cuantil ``p`` (entre 0 y 1)."""
+        self._procesar_lote()
+        return self._digesto.cuantil(p)
+
+    def resumen(self):
+        """Diccionario con todas las estadísticas."""
+        datos = {
+            "n": self.n,
+            "media": self.media if self.n else math.nan,
+            "desviacion": self.desviacion,
+            "minimo": self.minimo,
+            "maximo": self.maximo,
+        }
+        for p in CUANTILES:
+            datos[f"p{p * 100:g}"] = self.cuantil(p)
+        return datos
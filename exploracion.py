@@ -0,0 +1,227 @@
+"""Recálculo en segundo plano mientras se editan los parámetros.
+
+:class:`ExploradorEnVivo` mantiene un grupo de procesos iniciado de antemano,
+con :mod:`motor_rapido` ya importado. Por cada conjunto de parámetros que
+recibe :meth:`ExploradorEnVivo.enviar` entrega dos resultados:
+
+1. una estimación con las primeras :data:`HORIZONTE_ESTIMACION` horas;
+2. la corrida completa.
+
+Ambos se simulan con el motor rápido, que produce las mismas métricas que
+SimPy. Cada envío abre una generación nueva. Las tareas de generaciones
+anteriores que no empezaron se cancelan, y las que están corriendo se
+detienen en el siguiente tramo de :class:`avance.EjecucionPorTramos`, porque
+todos los procesos leen la generación vigente de un valor compartido. Sólo
+se entregan resultados de la generación vigente. Las corridas completas
+quedan en :data:`cache_resultados.cache`, así que volver a parámetros ya
+vistos responde de inmediato.
+"""
+
+import copy
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import avance
+import cache_resultados
+import modelo
+from barrido import ResumenSimulacion
+
+# Horas simuladas para la estimación que se muestra antes del resultado final
+HORIZONTE_ESTIMACION = 72
+
+ESTIMACION = "estimacion"
+COMPLETA = "completa"
+
+# Generación vigente, compartida por todos los procesos del grupo
+_generacion_vigente = None
+
+
+def _iniciar_proceso(generacion):
+    global _generacion_vigente
+    _generacion_vigente = generacion
+    # Importar el motor al crear el proceso y no en la primera tarea
+    import motor_rapido  # noqa: F401
+
+
+def _calentar():
+    return os.getpid()
+
+
+class ResultadoEnVivo:
+    """Resultado de una etapa (:data:`ESTIMACION` o :data:`COMPLETA`)."""
+
+    def __init__(self, generacion, etapa, config, tiempo_ruta, resumen):
+        self.generacion = generacion
+        self.etapa = etapa
+        self.config = config
+        self.tiempo_ruta = tiempo_ruta
+        self.resumen = resumen
+
+    @property
+    def completa(self):
+        return self.etapa == COMPLETA
+
+    def lineas(self):
+        """Textos de :func:`modelo.formatear_resultados` para el resultado."""
+        return modelo.formatear_resultados(self.resumen, self.config)
+
+
+def _simular(tarea):
+    """Simula una etapa; devuelve ``None`` si su generación quedó vieja."""
+    generacion, etapa, config, tiempo_ruta = tarea
+
+    def cancelado():
+        return _generacion_vigente.value != generacion
+
+    if cancelado():
+        return None
+    import motor_rapido
+
+    estacion = motor_rapido.EstacionRapida(
+        config.simulacion.max_autobuses, tiempo_ruta, config
+    )
+    ejecucion = avance.EjecucionPorTramos(estacion, config.simulacion.duracion)
+    if not ejecucion.ejecutar(cancelado=cancelado):
+        return None
+    return ResultadoEnVivo(
+        generacion, etapa, config, tiempo_ruta, ResumenSimulacion(estacion, {})
+    )
+
+
+def config_estimacion(config, horas=HORIZONTE_ESTIMACION):
+    """Copia de ``config`` que simula sólo las primeras ``horas``."""
+    simulacion = copy.copy(config.simulacion)
+    simulacion.actualizar(dias=horas / 24)
+    return config.con(simulacion=simulacion)
+
+
+class ExploradorEnVivo:
+    """Grupo de procesos que recalcula al cambiar los parámetros.
+
+    ``al_resultado(resultado)`` recibe cada :class:`ResultadoEnVivo` de la
+    generación vigente y ``al_error(generacion, error)`` los errores de sus
+    tareas. Ambos se llaman desde un hilo del ejecutor, salvo cuando el
+    resultado completo ya está en la caché: entonces se llama dentro de
+    :meth:`enviar`. ``jobs`` es la cantidad de procesos; por defecto uno por
+    núcleo.
+    """
+
+    def __init__(
+        self,
+        al_resultado,
+        al_error=None,
+        jobs=None,
+        horizonte_estimacion=HORIZONTE_ESTIMACION,
+    ):
+        self._al_resultado = al_resultado
+        self._al_error = al_error
+        self.horizonte_estimacion = horizonte_estimacion
+        self._generacion = multiprocessing.Value("l", 0)
+        self._candado = threading.Lock()
+        self._futuros = {}
+        self._completa_entregada = False
+        jobs = jobs or os.cpu_count() or 1
+        self._ejecutor = ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=_iniciar_proceso,
+            initargs=(self._generacion,),
+        )
+        # Crear los procesos ahora para que la primera edición no espere
+        for _ in range(jobs):
+            self._ejecutor.submit(_calentar)
+
+    @property
+    def generacion(self):
+        """Generación vigente; aumenta en cada :meth:`enviar`."""
+        return self._generacion.value
+
+    def _nueva_generacion(self):
+        with self._candado:
+            with self._generacion.get_lock():
+                self._generacion.value += 1
+                generacion = self._generacion.value
+            viejos, self._futuros = self._futuros, {}
+            self._completa_entregada = False
+        # ``cancel`` llama a ``_al_terminar``, que toma el candado
+        for futuro in viejos:
+            futuro.cancel()
+        return generacion
+
+    def enviar(self, config, tiempo_ruta=37.2):
+        """Recalcula para ``config`` y devuelve el número de generación."""
+        generacion = self._nueva_generacion()
+        simulacion = config.simulacion
+        clave = cache_resultados.clave_simulacion(
+            config, simulacion.max_autobuses, simulacion.duracion, tiempo_ruta, "rapido"
+        )
+        resumen = cache_resultados.cache.obtener(clave)
+        if resumen is not None:
+            self._entregar(
+                ResultadoEnVivo(generacion, COMPLETA, config, tiempo_ruta, resumen)
+            )
+            return generacion
+
+        tareas = []
+        if simulacion.duracion > self.horizonte_estimacion:
+            tareas.append(
+                (
+                    generacion,
+                    ESTIMACION,
+                    config_estimacion(config, self.horizonte_estimacion),
+                    tiempo_ruta,
+                )
+            )
+        tareas.append((generacion, COMPLETA, config, tiempo_ruta))
+        futuros = [self._ejecutor.submit(_simular, tarea) for tarea in tareas]
+        with self._candado:
+            for futuro, tarea in zip(futuros, tareas):
+                self._futuros[futuro] = (tarea, clave)
+        # Fuera del candado: si la tarea ya terminó se llama en este hilo
+        for futuro in futuros:
+            futuro.add_done_callback(self._al_terminar)
+        return generacion
+
+    def cancelar(self):
+        """Descarta el trabajo en curso sin enviar parámetros nuevos."""
+        self._nueva_generacion()
+
+    def _al_terminar(self, futuro):
+        with self._candado:
+            tarea, clave = self._futuros.pop(futuro, (None, None))
+        if tarea is None or futuro.cancelled():
+            return
+        error = futuro.exception()
+        if error is not None:
+            if self._al_error is not None and tarea[0] == self.generacion:
+                self._al_error(tarea[0], error)
+            return
+        resultado = futuro.result()
+        if resultado is None:
+            return
+        if resultado.completa:
+            cache_resultados.cache.guardar(clave, resultado.resumen)
+        self._entregar(resultado)
+
+    def _entregar(self, resultado):
+        with self._candado:
+            if resultado.generacion != self.generacion:
+                return
+            # La estimación no reemplaza a un resultado completo ya entregado
+            if self._completa_entregada and not resultado.completa:
+                return
+            if resultado.completa:
+                self._completa_entregada = True
+        self._al_resultado(resultado)
+
+    def cerrar(self):
+        """Detiene las tareas en curso y termina los procesos."""
+        self.cancelar()
+        self._ejecutor.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
@@ -0,0 +1,100 @@
+"""Flujos aleatorios independientes derivados de la semilla maestra.
+
+Cada fuente de azar de la simulación tiene su propio generador, sembrado con
+``SeedSequence(semilla, spawn_key=(flujo, entidad))``:
+
+* ``SALIDAS``: variación del intervalo entre salidas iniciales (un valor por
+  autobús, en orden de salida).
+* ``RETRASOS``: retrasos de las salidas iniciales (dos valores por autobús:
+  si ocurre y su duración, se use o no).
+* ``CONSUMO``: consumo por kilómetro de cada ruta, un flujo por autobús.
+
+Así agregar un autobús no altera los consumos de los demás, un cambio en el
+orden de los eventos no baraja toda la corrida y dos escenarios con la misma
+semilla comparten los mismos números (escenarios pareados). Los valores se
+generan en bloques de :data:`TAMANO_BLOQUE` con NumPy; el tamaño del bloque
+no cambia la secuencia.
+"""
+
+# Identificadores de flujo (primer elemento de ``spawn_key``)
+SALIDAS = 0
+RETRASOS = 1
+CONSUMO = 2
+
+TAMANO_BLOQUE = 256
+
+
+def generador(semilla, flujo, entidad=0):
+    """Generador NumPy del flujo ``flujo`` de ``entidad`` para ``semilla``."""
+    import numpy as np
+
+    return np.random.default_rng(
+        np.random.SeedSequence(semilla, spawn_key=(flujo, entidad))
+    )
+
+
+class FlujoUniforme:
+    """Uniformes en ``[bajo, alto)`` de un flujo, generadas por bloques.
+
+    Se llama sin argumentos para obtener el siguiente valor. Admite
+    ``pickle`` y continúa la secuencia en el punto en que se copió.
+    """
+
+    def __init__(
+        self, semilla, flujo, entidad=0, bajo=0.0, alto=1.0, bloque=TAMANO_BLOQUE
+    ):
+        self.bajo = bajo
+        self.alto = alto
+        self.bloque = bloque
+        self._generador = generador(semilla, flujo, entidad)
+        self._siguiente = iter(()).__next__
+
+    def __call__(self):
+        try:
+            return self._siguiente()
+        except StopIteration:
+            valores = self._generador.uniform(self.bajo, self.alto, self.bloque)
+            self._siguiente = iter(valores.tolist()).__next__
+            return self._siguiente()
+
+
+class FlujosAleatorios:
+    """Generadores de una corrida, creados a partir de su ``RunConfig``."""
+
+    def __init__(self, config, bloque=TAMANO_BLOQUE):
+        simulacion = config.simulacion
+        self.semilla = simulacion.semilla
+        self.bloque = bloque
+        self._prob_retraso = simulacion.prob_retraso
+        self._retraso_minimo, retraso_maximo = simulacion.rango_retraso
+        self._retraso_ancho = retraso_maximo - self._retraso_minimo
+        self._consumo_kwh_km = config.operacion.consumo_kwh_km
+        self.variacion_salida = FlujoUniforme(
+            self.semilla,
+            SALIDAS,
+            bajo=-simulacion.variacion_llegadas,
+            alto=simulacion.variacion_llegadas,
+            bloque=bloque,
+        )
+        self._retrasos = FlujoUniforme(self.semilla, RETRASOS, bloque=bloque)
+        self._consumos = {}
+
+    def retraso_salida(self):
+        """Retraso de la próxima salida inicial (``0`` si no ocurre)."""
+        ocurre = self._retrasos() < self._prob_retraso
+        retraso = self._retraso_minimo + self._retraso_ancho * self._retrasos()
+        return retraso if ocurre else 0.0
+
+    def consumo(self, autobus_id):
+        """:class:`FlujoUniforme` con el consumo por km de cada ruta del autobús."""
+        flujo = self._consumos.get(autobus_id)
+        if flujo is None:
+            flujo = FlujoUniforme(
+                self.semilla,
+                CONSUMO,
+                autobus_id,
+                *self._consumo_kwh_km,
+                bloque=self.bloque,
+            )
+            self._consumos[autobus_id] = flujo
+        return flujo
@@ -1,15 +1,18 @@
 import sys
-import random
 
 from PyQt5 import QtWidgets, QtCore
 
-import GraficosModelo
-import trafico
-import tiempos_intercambio
-
-
-import simpy
+# Matplotlib, SimPy, GraficosModelo y el explorador en vivo se importan
+# cuando se usan por primera vez, para que la ventana aparezca sin esperarlos.
+import avance
+import cache_resultados
 import modelo
+from barrido import BarridoCancelado, ResumenSimulacion
+
+# Máximo de actualizaciones de progreso por segundo durante una corrida
+AVISOS_POR_SEGUNDO = 10
+# Milisegundos sin cambios en los parámetros antes de recalcular en vivo
+DEMORA_EN_VIVO_MS = 250
 
 
 class SimulacionWorker(QtCore.QObject):
@@ -17,12 +20,14 @@ class SimulacionWorker(QtCore.QObject):
 
     finished = QtCore.pyqtSignal(list)
     progress = QtCore.pyqtSignal(int)
+    partial = QtCore.pyqtSignal(dict)
 
-    def __init__(self, max_autobuses, duracion, tiempo_ruta):
+    def __init__(self, max_autobuses, duracion, tiempo_ruta, config):
         super().__init__()
         self._max_autobuses = max_autobuses
         self._duracion = duracion
         self._tiempo_ruta = tiempo_ruta
+        self._config = config
         self._cancel_requested = False
 
     def cancel(self):
@@ -30,12 +35,11 @@ class SimulacionWorker(QtCore.QObject):
 
     @QtCore.pyqtSlot()
     def run(self):
-        # Ejecutar la simulación paso a paso para poder emitir progreso y
-        # permitir la cancelación segura desde la interfaz.
-        random.seed(modelo.param_simulacion.semilla)
+        import simpy
+
         env = simpy.Environment()
         estacion = modelo.EstacionIntercambio(
-            env, modelo.param_estacion.capacidad_estacion
+            env, self._config.estacion.capacidad_estacion, config=self._config
         )
         env.process(
             modelo.llegada_autobuses(
@@ -46,31 +50,122 @@ class SimulacionWorker(QtCore.QObject):
             )
         )
 
-        last_percent = -1
-        while env.peek() <= self._duracion:
-            if self._cancel_requested:
-                break
-            env.step()
-            porcentaje = int(env.now / self._duracion * 100)
-            if porcentaje != last_percent:
-                self.progress.emit(porcentaje)
-                last_percent = porcentaje
-
-        if not self._cancel_requested and last_percent < 100:
-            self.progress.emit(100)
+        # Avanzar en tramos de ``env.run(until=...)`` dimensionados por
+        # tiempo de reloj: el bucle de eventos corre a la velocidad de una
+        # ejecución sin interfaz y la cancelación se revisa entre tramos.
+        ejecucion = avance.EjecucionPorTramos(
+            estacion, self._duracion, avisos_por_segundo=AVISOS_POR_SEGUNDO
+        )
+        completa = ejecucion.ejecutar(
+            cancelado=lambda: self._cancel_requested,
+            progreso=self.progress.emit,
+            parcial=self.partial.emit,
+        )
+        if completa:
+            # Dejar el resultado en la caché con la misma clave que usa
+            # ``barrido.simular`` para que los gráficos no vuelvan a simular.
+            clave = cache_resultados.clave_simulacion(
+                self._config,
+                self._max_autobuses,
+                self._duracion,
+                self._tiempo_ruta,
+                "simpy",
+            )
+            cache_resultados.cache.guardar(clave, ResumenSimulacion(estacion, {}))
 
         r = modelo.formatear_resultados(estacion)
         self.finished.emit(r)
 
 
+class GraficoWorker(QtCore.QObject):
+    """Calcula los datos de un gráfico fuera del hilo de la interfaz.
+
+    Los barridos se simulan en el grupo de procesos de
+    :func:`barrido.ejecutar_barrido`; la interfaz sólo dibuja el resultado.
+    ``nombre`` es el gráfico de ``GraficosModelo.GRAFICOS`` y ``vista`` la
+    vista del tablero que lo muestra, la que emite ``finished``.
+    """
+
+    finished = QtCore.pyqtSignal(str, object)
+    cancelled = QtCore.pyqtSignal()
+    failed = QtCore.pyqtSignal(str)
+    progress = QtCore.pyqtSignal(int)
+
+    def __init__(self, nombre, config, tiempo_ruta, jobs=None, vista=None):
+        super().__init__()
+        self.nombre = nombre
+        self.vista = vista or nombre
+        self._config = config
+        self._tiempo_ruta = tiempo_ruta
+        self._jobs = jobs
+        self._cancel_requested = False
+
+    def cancel(self):
+        self._cancel_requested = True
+
+    def _progreso(self, hechos, total):
+        self.progress.emit(int(hechos / total * 100))
+
+    @QtCore.pyqtSlot()
+    def run(self):
+        import GraficosModelo
+
+        try:
+            datos = GraficosModelo.calcular_datos(
+                self.nombre,
+                config=self._config,
+                tiempo_ruta=self._tiempo_ruta,
+                jobs=self._jobs,
+                progreso=self._progreso,
+                cancelado=lambda: self._cancel_requested,
+            )
+        except BarridoCancelado:
+            self.cancelled.emit()
+            return
+        except Exception as error:
+            self.failed.emit(str(error))
+            return
+        self.finished.emit(self.vista, datos)
+
+
+# Opción del menú de gráficos -> vista de ``tablero.VISTAS``
+GRAFICOS_MENU = {
+    "Carga": "carga",
+    "Costos": "costos",
+    "Costo por hora": "costos_hora",
+    "Consumo en punta": "costos_punta",
+    "Diarios": "diarios",
+    "Emisiones": "emisiones",
+    "Inventario": "inventario",
+    "Cola": "cola",
+    "Costos día": "costosdia",
+    "Cargadores": "cargadores",
+    "Tráfico": "trafico",
+    "Intercambio": "intercambio",
+    "Espera baterías": "espera_baterias",
+}
+
+
 class SimulacionWindow(QtWidgets.QWidget):
     """Interfaz principal para ejecutar la simulaci\u00f3n."""
 
+    # Resultados del modo en vivo; se emiten desde hilos del ejecutor
+    resultado_en_vivo = QtCore.pyqtSignal(object)
+    error_en_vivo = QtCore.pyqtSignal(int, str)
+
     def __init__(self):
         super().__init__()
         self._thread = None
         self._worker = None
+        self._grafico_thread = None
+        self._grafico_worker = None
+        self._grafico_pendiente = False
+        self._explorador = None
+        self._tablero = None
         self._init_ui()
+        # El panel de gráficos se crea al arrancar el bucle de eventos, con
+        # la ventana ya visible, o antes si se usa primero.
+        QtCore.QTimer.singleShot(0, self.panel_graficos)
 
     def _init_ui(self):
         layout = QtWidgets.QFormLayout()
@@ -123,33 +218,65 @@ class SimulacionWindow(QtWidgets.QWidget):
 
 
         self.combo_grafico = QtWidgets.QComboBox()
-        self.combo_grafico.addItems([
-            "Carga",
-            "Costos",
-            "Diarios",
-            "Emisiones",
-            "Inventario",
-            "Cola",
-            "Costos día",
-            "Cargadores",
-            "Tráfico",
-            "Intercambio",
-            "Espera baterías",
-
-        ])
+        self.combo_grafico.addItems(list(GRAFICOS_MENU))
+        self.combo_grafico.currentTextChanged.connect(self.mostrar_grafico)
         self.boton_grafico = QtWidgets.QPushButton("Mostrar gr\u00e1fico")
         self.boton_grafico.clicked.connect(self.mostrar_grafico)
 
+        # Modo en vivo: cada edición reinicia la demora y, al vencer, se
+        # envían los parámetros al grupo de procesos del explorador.
+        self.en_vivo = QtWidgets.QCheckBox("Recalcular al editar (modo en vivo)")
+        self.en_vivo.toggled.connect(self._on_en_vivo_toggled)
+        self._demora_en_vivo = QtCore.QTimer(self)
+        self._demora_en_vivo.setSingleShot(True)
+        self._demora_en_vivo.setInterval(DEMORA_EN_VIVO_MS)
+        self._demora_en_vivo.timeout.connect(self._recalcular_en_vivo)
+        for control in (
+            self.dias,
+            self.autobuses,
+            self.capacidad,
+            self.total_baterias,
+            self.baterias_iniciales,
+            self.tiempo_ruta,
+        ):
+            control.valueChanged.connect(self._on_parametro_editado)
+        self.resultado_en_vivo.connect(self._on_resultado_en_vivo)
+        self.error_en_vivo.connect(self._on_error_en_vivo)
+
+        layout.addRow(self.en_vivo)
         layout.addRow(self.boton)
         layout.addRow(self.cancelar)
         layout.addRow(self.combo_grafico, self.boton_grafico)
 
+        # Lugar del panel de gráficos; :meth:`panel_graficos` inserta el lienzo
+        self._panel = QtWidgets.QVBoxLayout()
+        self._panel.setContentsMargins(0, 0, 0, 0)
+
         layout.addRow(self.progreso)
+        layout.addRow(self._panel)
         layout.addRow(self.resultados)
 
         self.setLayout(layout)
         self.setWindowTitle("Simulaci\u00f3n de intercambio de bater\u00edas")
 
+    def panel_graficos(self):
+        """:class:`tablero.Tablero` embebido, creado en la primera llamada.
+
+        Es una sola figura que se actualiza en lugar de abrir ventanas nuevas.
+        """
+        if self._tablero is None:
+            from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
+            from matplotlib.figure import Figure
+
+            import tablero
+
+            self.lienzo = FigureCanvasQTAgg(
+                Figure(figsize=(7, 3.5), tight_layout=True)
+            )
+            self._panel.addWidget(self.lienzo)
+            self._tablero = tablero.Tablero(self.lienzo)
+        return self._tablero
+
     def _update_params(self):
         modelo.param_simulacion.actualizar(
             dias=self.dias.value(),
@@ -162,31 +289,119 @@ class SimulacionWindow(QtWidgets.QWidget):
         )
 
     def mostrar_grafico(self):
+        """Calcula en segundo plano los datos del gráfico elegido.
+
+        Si ya se está calculando otro gráfico se cancela y el nuevo se
+        inicia cuando el anterior termina.
+        """
+        import tablero
+
+        self._update_params()
+        vista = GRAFICOS_MENU[self.combo_grafico.currentText()]
+        if self._grafico_worker is not None:
+            self._grafico_pendiente = True
+            self._grafico_worker.cancel()
+            return
+
+        self.boton_grafico.setEnabled(False)
+        self.cancelar.setEnabled(True)
+        self.progreso.setValue(0)
+
+        self._grafico_thread = QtCore.QThread()
+        self._grafico_worker = GraficoWorker(
+            tablero.grafico_de(vista),
+            modelo.configuracion_actual(verbose=False),
+            self.tiempo_ruta.value(),
+            vista=vista,
+        )
+        self._grafico_worker.moveToThread(self._grafico_thread)
+        self._grafico_thread.started.connect(self._grafico_worker.run)
+        self._grafico_worker.progress.connect(self.progreso.setValue)
+        self._grafico_worker.finished.connect(self._on_grafico_finished)
+        self._grafico_worker.cancelled.connect(self._on_grafico_cancelled)
+        self._grafico_worker.failed.connect(self._on_grafico_failed)
+        for senal in (
+            self._grafico_worker.finished,
+            self._grafico_worker.cancelled,
+            self._grafico_worker.failed,
+        ):
+            senal.connect(self._grafico_thread.quit)
+        self._grafico_thread.finished.connect(self._on_grafico_thread_finished)
+        self._grafico_thread.start()
+
+    def _on_grafico_finished(self, vista, datos):
+        self.progreso.setValue(100)
+        if not self._grafico_pendiente:
+            # Sólo el dibujo con matplotlib ocurre en el hilo de la interfaz
+            self.panel_graficos().mostrar(vista, datos)
+
+    def _on_grafico_cancelled(self):
+        self.progreso.setValue(0)
+
+    def _on_grafico_failed(self, mensaje):
+        self.progreso.setValue(0)
+        self.resultados.append(f"No se pudo calcular el gráfico: {mensaje}")
+
+    def _on_grafico_thread_finished(self):
+        self._grafico_worker.deleteLater()
+        self._grafico_thread.deleteLater()
+        self._grafico_worker = None
+        self._grafico_thread = None
+        self.boton_grafico.setEnabled(True)
+        self.cancelar.setEnabled(self._worker is not None)
+        if self._grafico_pendiente:
+            self._grafico_pendiente = False
+            self.mostrar_grafico()
+
+    def _on_en_vivo_toggled(self, activo):
+        if activo:
+            if self._explorador is None:
+                import exploracion
+
+                # Crear el grupo de procesos ya, antes de la primera edición
+                self._explorador = exploracion.ExploradorEnVivo(
+                    self.resultado_en_vivo.emit,
+                    lambda generacion, error: self.error_en_vivo.emit(
+                        generacion, str(error)
+                    ),
+                )
+            self._recalcular_en_vivo()
+        else:
+            self._demora_en_vivo.stop()
+            if self._explorador is not None:
+                self._explorador.cancelar()
+
+    def _on_parametro_editado(self, _valor):
+        if self.en_vivo.isChecked():
+            self._demora_en_vivo.start()
+
+    def _recalcular_en_vivo(self):
         self._update_params()
-        opcion = self.combo_grafico.currentText()
-        if opcion == "Carga":
-            GraficosModelo.grafico_carga_bateria(block=False)
-        elif opcion == "Costos":
-            GraficosModelo.grafico_costos(block=False)
-        elif opcion == "Diarios":
-            GraficosModelo.grafico_diarios(block=False)
-        elif opcion == "Emisiones":
-            GraficosModelo.grafico_emisiones(block=False)
-        elif opcion == "Inventario":
-            GraficosModelo.grafico_inventario(block=False)
-        elif opcion == "Cola":
-            GraficosModelo.grafico_cola(block=False)
-        elif opcion == "Costos día":
-            GraficosModelo.grafico_costos_dia(block=False)
-        elif opcion == "Cargadores":
-            GraficosModelo.grafico_uso_cargadores(block=False)
-        elif opcion == "Tráfico":
-            trafico.graficar_trafico(block=False)
-        elif opcion == "Intercambio":
-            tiempos_intercambio.graficar_tiempos_intercambio(block=False)
-        elif opcion == "Espera baterías":
-            tiempos_intercambio.graficar_espera_baterias(block=False)
+        self._explorador.enviar(
+            modelo.configuracion_actual(verbose=False), self.tiempo_ruta.value()
+        )
+
+    def _on_resultado_en_vivo(self, resultado):
+        # La señal llega encolada: descartar lo que quedó viejo mientras tanto
+        if resultado.generacion != self._explorador.generacion:
+            return
+        lineas = resultado.lineas()
+        if not resultado.completa:
+            horas = resultado.config.simulacion.duracion
+            lineas.insert(
+                0, f"Estimación con las primeras {horas:.0f} h; calculando el resto..."
+            )
+        self.resultados.setPlainText("\n".join(lineas))
+
+    def _on_error_en_vivo(self, generacion, mensaje):
+        if generacion == self._explorador.generacion:
+            self.resultados.setPlainText(f"No se pudo recalcular: {mensaje}")
 
+    def closeEvent(self, evento):
+        if self._explorador is not None:
+            self._explorador.cerrar()
+            self._explorador = None
+        super().closeEvent(evento)
 
     def run_simulation(self):
         self._update_params()
@@ -195,17 +410,21 @@ class SimulacionWindow(QtWidgets.QWidget):
         self.cancelar.setEnabled(True)
         self.progreso.setValue(0)
         self.resultados.clear()
+        self.panel_graficos().iniciar_corrida(modelo.param_simulacion.duracion)
 
         self._thread = QtCore.QThread()
         self._worker = SimulacionWorker(
             modelo.param_simulacion.max_autobuses,
             modelo.param_simulacion.duracion,
             self.tiempo_ruta.value(),
+            modelo.configuracion_actual(),
         )
         self._worker.moveToThread(self._thread)
         self._thread.started.connect(self._worker.run)
         self._worker.finished.connect(self._on_simulation_finished)
         self._worker.progress.connect(self.progreso.setValue)
+        self._worker.partial.connect(self._on_partial)
+        self._worker.partial.connect(self.panel_graficos().agregar)
         self._worker.finished.connect(self._thread.quit)
         self._thread.finished.connect(self._on_thread_finished)
         self._thread.start()
@@ -219,6 +438,24 @@ class SimulacionWindow(QtWidgets.QWidget):
     def cancelar_simulacion(self):
         if self._worker is not None:
             self._worker.cancel()
+        if self._grafico_worker is not None:
+            self._grafico_pendiente = False
+            self._grafico_worker.cancel()
+
+    def _on_partial(self, metricas):
+        """Muestra las métricas acumuladas mientras corre la simulación."""
+        self.resultados.setPlainText(
+            "\n".join([
+                f"Tiempo simulado: {modelo.formato_hora(metricas['tiempo'])}",
+                f"Intercambios realizados: {metricas['intercambios_realizados']}",
+                "Tiempo de espera total: "
+                f"{metricas['tiempo_espera_total']:.2f} h",
+                "Energía cargada: "
+                f"{metricas['energia_total_cargada']:.2f} kWh",
+                "Costo eléctrico: "
+                f"S/. {metricas['costo_total_electrico']:.2f}",
+            ])
+        )
 
     def _on_simulation_finished(self, lines):
         self.resultados.setPlainText("\n".join(lines))
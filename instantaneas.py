@@ -0,0 +1,129 @@
+"""Instantáneas de una simulación en marcha para ramificar escenarios.
+
+La estación arranca vacía de colas y con la reserva llena, de modo que los
+primeros días no representan la operación estable. :func:`calentar` simula
+ese período una sola vez con el motor rápido y guarda una
+:class:`Instantanea` con todo su estado: SoC y ubicación de cada batería,
+cargas en curso, SoC y posición de cada autobús en su ciclo, el calendario de
+eventos, los generadores aleatorios y las métricas acumuladas. Cada rama
+parte de una copia de esa instantánea, opcionalmente con más cargadores, más
+baterías u otras tarifas, y continúa hasta el horizonte pedido.
+
+Sólo el motor rápido admite instantáneas: los procesos de SimPy son
+generadores y no pueden copiarse. Las sondas tampoco se guardan; una rama
+que las necesite debe instalarlas después de :meth:`Instantanea.restaurar`.
+
+Ejemplo::
+
+    base = calentar(horas=72)
+    economicos = ParametrosEconomicos(costo_punta=0.30)
+    resumenes = ejecutar_ramas(base, [
+        {},
+        {"capacidad_estacion": 25},
+        {"total_baterias": 50},
+        {"economicos": economicos},
+    ])
+"""
+
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import modelo
+from barrido import ResumenSimulacion
+from motor_rapido import EstacionRapida
+
+# Horas simuladas por defecto antes de tomar la instantánea
+HORAS_CALENTAMIENTO = 72
+
+
+class Instantanea:
+    """Estado congelado de una :class:`motor_rapido.EstacionRapida`."""
+
+    def __init__(self, estacion):
+        if not isinstance(estacion, EstacionRapida):
+            raise TypeError("Sólo se pueden copiar estaciones del motor rápido")
+        self.tiempo = estacion.now
+        self.config = estacion.config
+        self._datos = pickle.dumps(estacion, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def restaurar(self):
+        """Nueva estación idéntica a la copiada, lista para ``ejecutar``."""
+        return pickle.loads(self._datos)
+
+    def ramificar(self, reiniciar_metricas=False, **cambios):
+        """Estación restaurada con ``cambios`` aplicados.
+
+        ``cambios`` son los argumentos de
+        :meth:`motor_rapido.EstacionRapida.aplicar_cambios`. Con
+        ``reiniciar_metricas`` las métricas de la rama cuentan sólo desde la
+        instantánea.
+        """
+        estacion = self.restaurar()
+        if cambios:
+            estacion.aplicar_cambios(**cambios)
+        if reiniciar_metricas:
+            estacion.reiniciar_metricas()
+        return estacion
+
+    def guardar(self, ruta):
+        """Escribe la instantánea en ``ruta``."""
+        with open(ruta, "wb") as archivo:
+            pickle.dump(self, archivo, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def cargar(cls, ruta):
+        """Lee una instantánea escrita con :meth:`guardar`."""
+        with open(ruta, "rb") as archivo:
+            instantanea = pickle.load(archivo)
+        if not isinstance(instantanea, cls):
+            raise TypeError(f"{ruta} no contiene una instantánea")
+        return instantanea
+
+
+def calentar(
+    horas=HORAS_CALENTAMIENTO, max_autobuses=None, tiempo_ruta=37.2, config=None
+):
+    """Simula ``horas`` con el motor rápido y devuelve la :class:`Instantanea`."""
+    config = config or modelo.configuracion_actual(verbose=False)
+    if max_autobuses is None:
+        max_autobuses = config.simulacion.max_autobuses
+    estacion = EstacionRapida(max_autobuses, tiempo_ruta, config)
+    estacion.ejecutar(horas)
+    return Instantanea(estacion)
+
+
+def _ejecutar_rama(tarea):
+    """Continúa una rama hasta ``hasta``; se ejecuta dentro de cada proceso."""
+    instantanea, rama, hasta, reiniciar_metricas = tarea
+    estacion = instantanea.ramificar(reiniciar_metricas, **rama)
+    estacion.ejecutar(hasta)
+    return ResumenSimulacion(estacion, rama)
+
+
+def ejecutar_ramas(
+    instantanea, ramas, hasta=None, jobs=None, reiniciar_metricas=True
+):
+    """Simula cada rama desde ``instantanea`` y devuelve sus resúmenes en orden.
+
+    Cada rama es un diccionario con argumentos de
+    :meth:`motor_rapido.EstacionRapida.aplicar_cambios` (``{}`` continúa sin
+    cambios). ``hasta`` es la hora final, por defecto la duración de la
+    configuración de la instantánea. Por defecto las métricas se reinician
+    al ramificar para que sólo cuenten el período posterior al
+    calentamiento. ``jobs`` funciona como en :func:`barrido.ejecutar_barrido`.
+    """
+    if hasta is None:
+        hasta = instantanea.config.simulacion.duracion
+    if hasta < instantanea.tiempo:
+        raise ValueError("La rama debe terminar después de la instantánea")
+    tareas = [
+        (instantanea, dict(rama), hasta, reiniciar_metricas) for rama in ramas
+    ]
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(tareas))
+    if jobs <= 1:
+        return [_ejecutar_rama(tarea) for tarea in tareas]
+    with ProcessPoolExecutor(max_workers=jobs) as ejecutor:
+        return list(ejecutor.map(_ejecutar_rama, tareas))
@@ -1,7 +1,20 @@
-import simpy
+import bisect
+import itertools
+import math
 import random
 
 import trafico
+import trazas
+from registro_baterias import (
+    RegistroBaterias,
+    EN_RESERVA,
+    DESCARGADA,
+    EN_CARGA,
+    EN_AUTOBUS,
+)
+from estadisticas import EstadisticaEnLinea
+from flujos_aleatorios import FlujosAleatorios
+from registro_intercambios import RegistroIntercambios
 
 from parametros import (
     ParametrosBateria,
@@ -9,6 +22,7 @@ from parametros import (
     ParametrosOperacionBus,
     ParametrosEconomicos,
     ParametrosSimulacion,
+    RunConfig,
 )
 
 
@@ -21,6 +35,54 @@ param_simulacion = ParametrosSimulacion()
 # Controla la verbosidad de la simulación
 VERBOSE = True
 
+# Motores disponibles para ``ejecutar_simulacion``
+MOTORES = ("simpy", "rapido")
+
+
+def _simpy():
+    """Módulo ``simpy``, importado la primera vez que se necesita.
+
+    Importar :mod:`modelo` no carga SimPy, así que las corridas con el motor
+    rápido no pagan su importación.
+    """
+    global simpy
+    try:
+        return simpy
+    except NameError:
+        import simpy
+
+        return simpy
+
+
+def __getattr__(nombre):
+    # ``modelo.simpy`` y ``modelo.ColaBaterias`` se mantienen, pero se
+    # importan al pedirlos
+    if nombre == "simpy":
+        return _simpy()
+    if nombre == "ColaBaterias":
+        from cola_baterias import ColaBaterias
+
+        return ColaBaterias
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+
+
+def configuracion_actual(verbose=None):
+    """Instantánea :class:`RunConfig` de los parámetros globales del módulo.
+
+    Los ``param_*`` globales y ``VERBOSE`` sólo sirven como valores por
+    defecto editables desde la interfaz y la línea de comandos; cada
+    simulación trabaja con su propia instantánea.
+    """
+    return RunConfig(
+        bateria=param_bateria,
+        estacion=param_estacion,
+        operacion=param_operacion,
+        economicos=param_economicos,
+        simulacion=param_simulacion,
+        verbose=VERBOSE if verbose is None else verbose,
+    )
+
+
 # Función para formatear horas decimales incluyendo el día de simulación
 def formato_hora(horas_decimales):
     """Devuelve un string "Día DD hh:mm" para la hora dada."""
@@ -45,65 +107,133 @@ def factor_demanda(tiempo):
     return 1.0
 
 
-def duracion_y_consumo(distancia_km, hora_actual):
-    """Devuelve la duración y consumo para la distancia dada."""
+def duracion_y_consumo(distancia_km, hora_actual, config=None, consumo_km=None):
+    """Devuelve la duración y consumo para la distancia dada.
+
+    ``consumo_km`` es el consumo por kilómetro ya sorteado (en la simulación,
+    del flujo de consumo del autobús); si se omite se sortea con ``random``.
+    """
+    operacion = (config or configuracion_actual()).operacion
+    if consumo_km is None:
+        consumo_km = random.uniform(*operacion.consumo_kwh_km)
     factor = trafico.factor_trafico(hora_actual)
     ajuste = 1 + 0.2 * (factor - 1)
-    duracion = distancia_km / param_operacion.velocidad_promedio * ajuste
-    consumo = (
-        random.uniform(*param_operacion.consumo_kwh_km)
-        * distancia_km
-        * ajuste
-    )
+    duracion = distancia_km / operacion.velocidad_promedio * ajuste
+    consumo = consumo_km * distancia_km * ajuste
     return duracion, consumo
 
 
-def soc_estimado_despues(soc_actual, distancia_km, hora_actual):
+def soc_estimado_despues(soc_actual, distancia_km, hora_actual, config=None):
     """Calcula el SoC estimado tras la siguiente vuelta sin cambiar la batería."""
+    config = config or configuracion_actual()
     factor = trafico.factor_trafico(hora_actual)
     ajuste = 1 + 0.2 * (factor - 1)
-    consumo_promedio = sum(param_operacion.consumo_kwh_km) / 2
+    consumo_promedio = sum(config.operacion.consumo_kwh_km) / 2
     consumo = consumo_promedio * distancia_km * ajuste
-    return soc_actual - consumo / param_bateria.capacidad * 100
+    return soc_actual - consumo / config.bateria.capacidad * 100
 
 
 def inventario_suficiente_hasta_fin_punta(estacion, hora_actual):
     """Devuelve ``True`` si no es necesario cargar de inmediato."""
-    inicio, fin = param_economicos.horas_punta
+    config = getattr(estacion, "config", None) or configuracion_actual()
+    inicio, fin = config.economicos.horas_punta
     if hora_actual < inicio or hora_actual >= fin:
         return True
-    return len(estacion.baterias_reserva.items) > param_simulacion.max_autobuses
+    return len(estacion.baterias_reserva.items) > config.simulacion.max_autobuses
+
+class CargadoresInactivos:
+    """Cargadores sin trabajo ordenados por la fase de su revisión por minuto.
+
+    Un cargador que quedó libre en ``inicio`` habría revisado la cola en
+    ``inicio + k / 60``. El que revisa primero después de ``ahora`` es el de
+    menor fase posterior a la fase de ``ahora`` (de forma circular), por lo
+    que basta una búsqueda binaria en lugar de recorrer todos los cargadores.
+    """
+
+    PERIODO = 1 / 60
+
+    def __init__(self):
+        self._cargadores = []
+        self._secuencia = itertools.count()
+
+    def __getstate__(self):
+        # ``itertools.count`` no se serializa en todas las versiones de
+        # Python; se guarda el siguiente valor (saltear uno no altera el orden).
+        return {"_cargadores": self._cargadores, "_secuencia": next(self._secuencia)}
+
+    def __setstate__(self, estado):
+        self._cargadores = estado["_cargadores"]
+        self._secuencia = itertools.count(estado["_secuencia"])
+
+    def __len__(self):
+        return len(self._cargadores)
+
+    def agregar(self, inicio, cargador):
+        bisect.insort(
+            self._cargadores,
+            (inicio % self.PERIODO, next(self._secuencia), inicio, cargador),
+        )
+
+    def tomar(self, ahora):
+        """Retira el cargador que revisaría primero y su hora de revisión."""
+        fase = ahora % self.PERIODO
+        indice = bisect.bisect_right(self._cargadores, (fase, math.inf))
+        if indice == len(self._cargadores):
+            indice = 0
+        _, _, inicio, cargador = self._cargadores.pop(indice)
+        revision = inicio + (math.floor((ahora - inicio) * 60) + 1) / 60
+        return revision, cargador
+
 
 class EstacionIntercambio:
-    def __init__(self, env, capacidad_estacion):
+    def __init__(self, env, capacidad_estacion, config=None, traza=None):
+        from cola_baterias import ColaBaterias
+
         self.env = env
+        # Configuración de la corrida y flujos aleatorios propios, de modo
+        # que varias simulaciones puedan ejecutarse a la vez sin compartir
+        # estado global.
+        self.config = config or configuracion_actual()
+        self.flujos = FlujosAleatorios(self.config)
+        # Sumidero de eventos (ver ``trazas``). ``None`` desactiva la traza;
+        # con ``verbose`` los eventos se imprimen a medida que ocurren.
+        if traza is None and self.config.verbose:
+            traza = trazas.SumideroImpresion()
+        self.traza = traza
+        param_estacion = self.config.estacion
         # "estaciones" representa los puntos donde los autobuses realizan el
         # cambio de batería. Cada cargador se gestiona mediante un proceso
         # independiente, por lo que no se requiere un recurso adicional.
-        self.estaciones = simpy.Resource(env, capacity=capacidad_estacion)
+        self.estaciones = _simpy().Resource(env, capacity=capacidad_estacion)
 
-        # Inventario de baterías cargadas disponible para los autobuses.
-        # Se almacenan como el porcentaje de SoC que tienen, 100% significa
-        # una batería completamente cargada.
-        self.baterias_reserva = simpy.Store(
-            env,
-            capacity=param_estacion.total_baterias,
+        # Registro de baterías: las iniciales empiezan cargadas al 100 % y el
+        # resto descargadas al 30 %. El registro guarda además la hora en que
+        # cada batería entra en reserva para medir cuánto espera hasta usarse.
+        self.registro = RegistroBaterias(
+            param_estacion.total_baterias, param_estacion.baterias_iniciales
         )
 
-        # Baterías descargadas a la espera de ser cargadas nuevamente.
-        self.baterias_descargadas = simpy.Store(
-            env,
-            capacity=param_estacion.total_baterias,
+        # Inventario de baterías cargadas disponible para los autobuses y
+        # baterías descargadas a la espera de ser cargadas nuevamente. Ambas
+        # colas contienen identificadores del registro.
+        self.baterias_reserva = ColaBaterias(
+            env, self.registro, self.registro.reserva, EN_RESERVA
+        )
+        self.baterias_descargadas = ColaBaterias(
+            env, self.registro, self.registro.descargadas, DESCARGADA
+        )
+        # Estadísticas en línea de cuánto espera cada batería cargada en la
+        # reserva y cada autobús hasta iniciar el intercambio.
+        self.espera_baterias = EstadisticaEnLinea(
+            guardar_muestras=self.config.guardar_muestras
+        )
+        self.espera_autobuses = EstadisticaEnLinea(
+            guardar_muestras=self.config.guardar_muestras
         )
-
-        # Inicializar los inventarios.
-        self.baterias_reserva.items = [100 for _ in range(param_estacion.baterias_iniciales)]
-        self.baterias_descargadas.items = [30 for _ in range(param_estacion.total_baterias - param_estacion.baterias_iniciales)]
-        # Registrar el momento en que cada batería entra en reserva para medir el
-        # tiempo que permanece en espera hasta ser utilizada.
-        self._ingreso_reserva = [0.0 for _ in range(param_estacion.baterias_iniciales)]
-        self.tiempos_espera_baterias = []
         self.baterias_cargando = 0  # Cantidad de baterías actualmente en carga
+        # Cargadores sin trabajo con el evento que los despierta. El
+        # despachador elige cuál atiende cada batería.
+        self._cargadores_inactivos = CargadoresInactivos()
         self.tiempo_espera_total = 0  # Tiempo total de espera acumulado
         self.energia_total_cargada = 0  # Energía total consumida para cargar baterías
         self.costo_total_electrico = 0  # Costo total de carga eléctrica
@@ -113,8 +243,11 @@ class EstacionIntercambio:
         self.energia_fuera_punta_autobuses = 0  # Energía consumida fuera de hora punta por autobuses
         self.energia_punta_electrica = 0  # Energía consumida en hora punta de electricidad
         self.intercambios_realizados = 0  # Cantidad de reemplazos efectuados
-        # Historial de intercambios (día, hora, energía)
-        self.registro_intercambios = []
+        # Historial de intercambios con totales por día, hora y tarifa
+        self.registro_intercambios = RegistroIntercambios(
+            self.config.economicos.horas_punta,
+            guardar_filas=self.config.guardar_muestras,
+        )
 
         # Costo de cargar las baterías iniciales
         self.cargar_baterias_iniciales()
@@ -124,7 +257,9 @@ class EstacionIntercambio:
             self.env.process(self.cargar_bateria())
 
     def cargar_baterias_iniciales(self):
-        for _ in range(param_estacion.baterias_iniciales):
+        param_bateria = self.config.bateria
+        param_economicos = self.config.economicos
+        for _ in range(self.config.estacion.baterias_iniciales):
             hora_actual = 0  # Asumimos que se cargaron antes del inicio de la simulación
             capacidad_carga = param_bateria.capacidad
             if param_economicos.horas_punta[0] <= hora_actual < param_economicos.horas_punta[1]:  # Hora punta eléctrica
@@ -135,28 +270,37 @@ class EstacionIntercambio:
             self.energia_total_cargada += capacidad_carga
             self.costo_total_electrico += costo_carga
 
-    def reemplazar_bateria(self, autobuses_id, soc_inicial, hora_actual):
-        """Realiza el intercambio asumiendo que hay batería disponible."""
+    def autobuses_en_cola(self):
+        """Autobuses esperando una batería o un punto de intercambio."""
+        return len(self.baterias_reserva.get_queue) + len(self.estaciones.queue)
+
+    def retirar_de_reserva(self, bateria):
+        """Registra que ``bateria`` sale de la reserva hacia un autobús."""
+        self.registro.estado[bateria] = EN_AUTOBUS
+        self.espera_baterias.agregar(self.env.now - self.registro.ingreso[bateria])
+
+    def reemplazar_bateria(self, autobuses_id, bateria_usada, soc_inicial, hora_actual):
+        """Realiza el intercambio asumiendo que hay batería disponible.
+
+        Devuelve el identificador de la batería entregada al autobús.
+        """
         # Tomar una batería cargada de la reserva y depositar la usada
         # ``soc_inicial`` corresponde al nivel de carga de la batería usada
         # cuando el autobús llega a la estación.
-        _ = yield self.baterias_reserva.get()
-        ingreso = self._ingreso_reserva.pop(0)
-        self.tiempos_espera_baterias.append(self.env.now - ingreso)
-        yield self.baterias_descargadas.put(soc_inicial)
+        param_bateria = self.config.bateria
+        param_economicos = self.config.economicos
+        bateria = yield self.baterias_reserva.get()
+        self.retirar_de_reserva(bateria)
+        yield self.depositar_descargada(bateria_usada, soc_inicial)
         capacidad_requerida = (param_bateria.soc_objetivo - soc_inicial) / 100 * param_bateria.capacidad
         tiempo_reemplazo = 4 / 60  # 4 minutos en horas
-        hora_final = self.env.now + tiempo_reemplazo  # Hora después del intercambio
-        if VERBOSE:
-            print(
-                f"Autobús {autobuses_id} reemplaza su batería en {formato_hora(self.env.now)} "
-                f"(SoC inicial: {soc_inicial:.2f}%). Hora final: {formato_hora(hora_final)}"
-            )
+        if self.traza is not None:
+            self.traza.registrar(trazas.INTERCAMBIO, self.env.now, autobuses_id, 0.0)
         yield self.env.timeout(tiempo_reemplazo)
         self.intercambios_realizados += 1
-        dia_actual = int(self.env.now // 24)
-        hora_registro = formato_hora(self.env.now)
-        self.registro_intercambios.append((dia_actual, hora_registro, capacidad_requerida))
+        self.registro_intercambios.agregar(
+            self.env.now, autobuses_id, soc_inicial, capacidad_requerida
+        )
 
         # Clasificar consumo de energía según hora punta de autobuses
         if 7 <= hora_actual < 9 or 18 <= hora_actual < 20:
@@ -169,13 +313,41 @@ class EstacionIntercambio:
             self.energia_punta_electrica += capacidad_requerida
 
         # La estimación de consumo de gas se calcula tras la ruta del autobús
+        return bateria
+
+    def depositar_descargada(self, bateria, soc):
+        """Deja una batería usada en la estación y avisa a un cargador libre."""
+        self.registro.soc[bateria] = soc
+        evento = self.baterias_descargadas.put(bateria)
+        self._despachar_cargador()
+        return evento
+
+    def _despachar_cargador(self):
+        """Despierta al cargador inactivo que antes revisaría la cola.
+
+        Los cargadores ya no consultan la cola cada minuto. Para conservar los
+        resultados del modelo anterior, el cargador elegido es el que habría
+        hecho primero su siguiente revisión y se activa justo en ese minuto.
+        """
+        if not self._cargadores_inactivos:
+            return
+        ahora = self.env.now
+        revision, evento = self._cargadores_inactivos.tomar(ahora)
+        evento.succeed(revision - ahora)
 
     def cargar_bateria(self):
         """Proceso individual de un cargador."""
+        param_bateria = self.config.bateria
+        param_economicos = self.config.economicos
+        traza = self.traza
         while True:
-            # Comprobar cada minuto si hay baterías por cargar
+            # Sin baterías por cargar el cargador queda inactivo hasta que
+            # ``depositar_descargada`` lo despierte.
             if len(self.baterias_descargadas.items) == 0:
-                yield self.env.timeout(1 / 60)
+                despertar = self.env.event()
+                self._cargadores_inactivos.agregar(self.env.now, despertar)
+                espera = yield despertar
+                yield self.env.timeout(espera)
                 continue
 
             hora_actual = self.env.now % 24
@@ -188,14 +360,18 @@ class EstacionIntercambio:
                 espera = param_economicos.horas_punta[1] - hora_actual
                 if espera < 0:
                     espera += 24
-                if VERBOSE:
-                    print(
-                        f"Retrasando carga hasta {formato_hora(self.env.now + espera)}"
+                if traza is not None:
+                    traza.registrar(
+                        trazas.CARGA_DIFERIDA, self.env.now, -1, self.env.now + espera
                     )
                 yield self.env.timeout(espera)
                 continue
 
-            soc_actual = yield self.baterias_descargadas.get()
+            bateria = yield self.baterias_descargadas.get()
+            self.registro.estado[bateria] = EN_CARGA
+            self.registro.ingreso[bateria] = self.env.now
+            self.registro.cargando.add(bateria)
+            soc_actual = self.registro.soc[bateria]
             self.baterias_cargando += 1
 
             hora_actual = int(self.env.now % 24)
@@ -206,34 +382,37 @@ class EstacionIntercambio:
 
             if param_economicos.horas_punta[0] <= hora_actual < param_economicos.horas_punta[1]:
                 costo_carga = capacidad_carga * param_economicos.costo_punta
-                if VERBOSE:
-                    print(
-                        f"Se está cargando una batería en hora punta (Hora actual: {hora_actual})"
-                    )
             else:
                 costo_carga = capacidad_carga * param_economicos.costo_normal
-                if VERBOSE:
-                    print(
-                        f"Se está cargando una batería fuera de hora punta (Hora actual: {hora_actual})"
-                    )
+            if traza is not None:
+                traza.registrar(trazas.INICIO_CARGA, self.env.now, bateria, soc_actual)
 
             yield self.env.timeout(tiempo_carga)
 
             self.baterias_cargando -= 1
-            yield self.baterias_reserva.put(param_bateria.soc_objetivo)
-            self._ingreso_reserva.append(self.env.now)
+            self.registro.cargando.discard(bateria)
+            self.registro.soc[bateria] = param_bateria.soc_objetivo
+            if traza is not None:
+                traza.registrar(
+                    trazas.FIN_CARGA, self.env.now, bateria, param_bateria.soc_objetivo
+                )
+            self.registro.ciclos[bateria] += 1
+            yield self.baterias_reserva.put(bateria)
             self.energia_total_cargada += capacidad_carga
             self.costo_total_electrico += costo_carga
 # Procesos para simular la salida inicial de autobuses
-def llegada_autobuses(env, estacion, max_autobuses, tiempo_ruta=37.2):
+def llegada_autobuses(env, estacion, max_autobuses, tiempo_ruta=37.2, config=None):
     """Genera la salida inicial de autobuses y crea procesos cíclicos.
 
-    ``tiempo_ruta`` indica la distancia de la ruta en kilómetros.
+    ``tiempo_ruta`` indica la distancia de la ruta en kilómetros y ``config``
+    la configuración de la corrida (por defecto la de ``estacion``).
     Durante horas pico (7:00-9:00 y 16:00-18:00) la frecuencia base de
     salida es de 3.5 minutos y en el resto del día de 10 minutos. Se
     introduce una variación aleatoria y posibles retrasos para reflejar la
     incertidumbre en la demanda de energía.
     """
+    config = config or estacion.config
+    flujos = estacion.flujos
     yield env.timeout(5)  # Los autobuses comienzan a salir a las 5:00 AM
     for autobuses_id in range(1, max_autobuses + 1):
         hora_actual = env.now % 24
@@ -242,20 +421,13 @@ def llegada_autobuses(env, estacion, max_autobuses, tiempo_ruta=37.2):
         else:
             intervalo_base = 10 / 60  # 10 minutos
         intervalo_base /= factor_demanda(env.now)
-        variacion = random.uniform(
-            -param_simulacion.variacion_llegadas,
-            param_simulacion.variacion_llegadas,
-        )
-        intervalo = max(0, intervalo_base + variacion)
-        if random.random() < param_simulacion.prob_retraso:
-            intervalo += random.uniform(*param_simulacion.rango_retraso)
+        variacion = flujos.variacion_salida()
+        intervalo = max(0, intervalo_base + variacion) + flujos.retraso_salida()
 
         yield env.timeout(intervalo)
         hora_actual = int(env.now % 24)
-        if VERBOSE:
-            print(
-                f"Autobús {autobuses_id} sale de la estación en {formato_hora(env.now)}"
-            )
+        if estacion.traza is not None:
+            estacion.traza.registrar(trazas.SALIDA, env.now, autobuses_id)
         env.process(
             proceso_autobus(
                 env,
@@ -263,62 +435,58 @@ def llegada_autobuses(env, estacion, max_autobuses, tiempo_ruta=37.2):
                 autobuses_id,
                 tiempo_ruta,
                 primera_salida=True,
+                config=config,
             )
         )
 # Proceso para simular el flujo del autobús
-def proceso_autobus(env, estacion, autobuses_id, tiempo_ruta, primera_salida=False):
+def proceso_autobus(
+    env, estacion, autobuses_id, tiempo_ruta, primera_salida=False, config=None
+):
     """Simula un autobús realizando rutas cíclicas."""
+    config = config or estacion.config
+    param_bateria = config.bateria
+    param_operacion = config.operacion
+    param_economicos = config.economicos
+    traza = estacion.traza
+    consumo_km = estacion.flujos.consumo(autobuses_id)
     soc_actual = param_bateria.soc_objetivo
+    bateria = None
     while True:
         hora_actual = int(env.now % 24)
-        estimado = soc_estimado_despues(soc_actual, tiempo_ruta, hora_actual)
+        estimado = soc_estimado_despues(soc_actual, tiempo_ruta, hora_actual, config)
         if primera_salida or estimado < 20:
             llegada = env.now
-            ultimo_aviso = env.now
-            while len(estacion.baterias_reserva.items) <= 0:
-                if VERBOSE and env.now - ultimo_aviso >= 10 / 60:
-                    print(
-                        f"Autobús {autobuses_id} espera batería desde {formato_hora(llegada)}"
-                    )
-                    ultimo_aviso = env.now
-                yield env.timeout(1 / 60)
+            # Reservar la siguiente batería cargada en orden de llegada. Si la
+            # reserva está vacía el autobús queda bloqueado hasta que un
+            # cargador deposite una batería.
+            reserva = estacion.baterias_reserva.get()
+            if traza is not None and not reserva.triggered:
+                traza.registrar(trazas.INICIO_COLA, llegada, autobuses_id)
+            nueva = yield reserva
+            estacion.retirar_de_reserva(nueva)
 
             with estacion.estaciones.request() as req:
                 yield req
                 tiempo_espera = env.now - llegada
                 estacion.tiempo_espera_total += tiempo_espera
-                if VERBOSE:
-                    if primera_salida:
-                        mensaje = "toma batería inicial"
-                    else:
-                        mensaje = "entra a la estación"
-                    print(
-                        f"Autobús {autobuses_id} {mensaje} en {formato_hora(env.now)} "
-                        f"tras esperar {formato_hora(tiempo_espera)}"
+                estacion.espera_autobuses.agregar(tiempo_espera)
+                if traza is not None:
+                    traza.registrar(
+                        trazas.INTERCAMBIO, env.now, autobuses_id, tiempo_espera
                     )
-                _ = yield estacion.baterias_reserva.get()
-                ingreso = estacion._ingreso_reserva.pop(0)
-                estacion.tiempos_espera_baterias.append(env.now - ingreso)
                 if not primera_salida:
-                    yield estacion.baterias_descargadas.put(soc_actual)
+                    yield estacion.depositar_descargada(bateria, soc_actual)
                     capacidad_requerida = (
                         param_bateria.soc_objetivo - soc_actual
                     ) / 100 * param_bateria.capacidad
                 else:
                     capacidad_requerida = 0
                 tiempo_reemplazo = 4 / 60
-                hora_final = env.now + tiempo_reemplazo
-                if VERBOSE and not primera_salida:
-                    print(
-                        f"(SoC inicial: {soc_actual:.2f}%). Hora final: {formato_hora(hora_final)}"
-                    )
                 yield env.timeout(tiempo_reemplazo)
                 estacion.intercambios_realizados += 1
                 if not primera_salida:
-                    dia_actual = int(env.now // 24)
-                    hora_registro = formato_hora(env.now)
-                    estacion.registro_intercambios.append(
-                        (dia_actual, hora_registro, capacidad_requerida)
+                    estacion.registro_intercambios.agregar(
+                        env.now, autobuses_id, soc_actual, capacidad_requerida
                     )
                     if 7 <= hora_actual < 9 or 18 <= hora_actual < 20:
                         estacion.energia_punta_autobuses += capacidad_requerida
@@ -330,12 +498,15 @@ def proceso_autobus(env, estacion, autobuses_id, tiempo_ruta, primera_salida=Fal
                         < param_economicos.horas_punta[1]
                     ):
                         estacion.energia_punta_electrica += capacidad_requerida
+                bateria = nueva
                 soc_actual = param_bateria.soc_objetivo
                 primera_salida = False
 
         # El autobús sale a su ruta
         hora_inicio_ruta = int(env.now % 24)
-        duracion_ruta, consumo = duracion_y_consumo(tiempo_ruta, hora_inicio_ruta)
+        duracion_ruta, consumo = duracion_y_consumo(
+            tiempo_ruta, hora_inicio_ruta, config, consumo_km()
+        )
         yield env.timeout(duracion_ruta)
         energia_gas = (
             param_operacion.consumo_gas_hora
@@ -347,29 +518,65 @@ def proceso_autobus(env, estacion, autobuses_id, tiempo_ruta, primera_salida=Fal
         estacion.costo_total_gas += volumen_gas * param_economicos.costo_gas_m3
         soc_actual = max(0, soc_actual - consumo / param_bateria.capacidad * 100)
         hora_actual = int(env.now % 24)
-        if VERBOSE:
-            print(
-                f"Autobús {autobuses_id} regresa a la estación en {formato_hora(env.now)} "
-                f"con SoC {soc_actual:.2f}%"
-            )
+        if traza is not None:
+            traza.registrar(trazas.LLEGADA, env.now, autobuses_id, soc_actual)
 
 
 # Configuración de la simulación
 def ejecutar_simulacion(
-    max_autobuses=param_simulacion.max_autobuses,
-    duracion=param_simulacion.duracion,
+    max_autobuses=None,
+    duracion=None,
     tiempo_ruta=37.2,
     procesos_extra=None,
+    engine="simpy",
+    config=None,
+    traza=None,
+    sondas=None,
+    perfil=None,
 ):
     """Ejecuta la simulación y devuelve la estación resultante.
 
+    ``config`` es la :class:`RunConfig` de la corrida; por defecto se toma
+    una instantánea de los parámetros globales al momento de la llamada.
+    ``max_autobuses`` y ``duracion`` (en horas) se toman de ella si no se
+    indican. ``traza`` es un sumidero de :mod:`trazas` que recibe los eventos
+    de la corrida y ``sondas`` un :class:`sondas.Sondas` cuyas series se
+    muestrean durante ella. Con un :class:`perfilado.Perfil` en ``perfil``
+    se cuentan los eventos y el tiempo de cada tipo de proceso.
+
     ``tiempo_ruta`` representa la distancia en kilómetros de la ruta de cada
     autobús antes de regresar a la estación. El tiempo real se calcula a partir
     de esta distancia y de la velocidad promedio ajustada por el tráfico.
+
+    ``engine`` elige el motor: ``"simpy"`` (por defecto) o ``"rapido"``, el
+    calendario de eventos propio de :mod:`motor_rapido`, que produce las
+    mismas métricas sin trazas ni ``procesos_extra``.
     """
-    random.seed(param_simulacion.semilla)
-    env = simpy.Environment()
-    estacion = EstacionIntercambio(env, param_estacion.capacidad_estacion)
+    if engine not in MOTORES:
+        raise ValueError(f"Motor desconocido: {engine!r}")
+    config = config or configuracion_actual()
+    if max_autobuses is None:
+        max_autobuses = config.simulacion.max_autobuses
+    if duracion is None:
+        duracion = config.simulacion.duracion
+    if engine == "rapido":
+        if procesos_extra or traza is not None:
+            raise ValueError("El motor rápido no admite procesos_extra ni trazas")
+        import motor_rapido
+
+        return motor_rapido.ejecutar_simulacion(
+            max_autobuses,
+            duracion,
+            tiempo_ruta,
+            config=config,
+            sondas=sondas,
+            perfil=perfil,
+        )
+
+    env = perfil.entorno_simpy() if perfil is not None else _simpy().Environment()
+    estacion = EstacionIntercambio(
+        env, config.estacion.capacidad_estacion, config=config, traza=traza
+    )
 
     env.process(
         llegada_autobuses(
@@ -382,13 +589,24 @@ def ejecutar_simulacion(
     if procesos_extra:
         for proc in procesos_extra:
             env.process(proc(env, estacion))
-    env.run(until=duracion)
+    if sondas is not None:
+        sondas.instalar(estacion, duracion)
+    if perfil is not None:
+        perfil.ejecutar_simpy(env, duracion)
+    else:
+        env.run(until=duracion)
     return estacion
 
 
-def formatear_resultados(estacion):
-    """Devuelve una lista con los textos de los resultados."""
-    dias = param_simulacion.dias
+def formatear_resultados(estacion, config=None):
+    """Devuelve una lista con los textos de los resultados.
+
+    ``config`` indica la configuración de la corrida cuando ``estacion`` no
+    la incluye, como en un :class:`barrido.ResumenSimulacion`.
+    """
+    config = config or getattr(estacion, "config", None) or configuracion_actual()
+    param_economicos = config.economicos
+    dias = config.simulacion.dias
     lines = [
         f"Resultados para {dias:.1f} d\u00edas de operaci\u00f3n",
         f"Consumo total de energ\u00eda en hora punta de autobuses: {estacion.energia_punta_autobuses:.2f} kWh",
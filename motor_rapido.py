@@ -0,0 +1,664 @@
+"""Motor de eventos discretos específico para la estación de intercambio.
+
+Reproduce las mismas reglas que ``modelo.proceso_autobus``,
+``modelo.llegada_autobuses`` y ``EstacionIntercambio.cargar_bateria`` pero sin
+simpy: el calendario es un ``heapq`` de tuplas ``(tiempo, secuencia, función,
+argumentos)`` y cada evento es una llamada directa a un método. Está pensado
+para barridos y réplicas sin salida por pantalla; con la misma semilla
+produce las mismas métricas que el motor de simpy.
+"""
+
+import copy
+import gc
+import heapq
+import itertools
+from collections import deque
+from operator import attrgetter
+
+import modelo
+from registro_baterias import (
+    RegistroBaterias,
+    EN_RESERVA,
+    DESCARGADA,
+    EN_CARGA,
+    EN_AUTOBUS,
+)
+from estadisticas import EstadisticaEnLinea
+from flujos_aleatorios import FlujosAleatorios
+from registro_intercambios import RegistroIntercambios
+
+TIEMPO_REEMPLAZO = 4 / 60  # Duración del intercambio en horas
+# Vueltas pendientes de sumar al gas antes de sumar las ya terminadas
+VUELTAS_GAS_MINIMAS = 4096
+
+
+class _Cola:
+    """Vista mínima compatible con ``simpy.Store.items``."""
+
+    __slots__ = ("items",)
+
+    def __init__(self, items):
+        self.items = items
+
+
+class _Autobus:
+    __slots__ = (
+        "id",
+        "soc",
+        "bateria",
+        "nueva",
+        "primera_salida",
+        "llegada",
+        "hora",
+        "consumo_km",
+        "ruta",
+    )
+
+    def __init__(self, autobus_id, soc, consumo_km, ruta):
+        self.id = autobus_id
+        self.soc = soc
+        self.bateria = None
+        self.nueva = None
+        self.primera_salida = True
+        self.llegada = 0.0
+        # Hora entera de llegada, usada para clasificar la energía
+        self.hora = 0
+        # Flujo con el consumo por km de cada ruta del autobús
+        self.consumo_km = consumo_km
+        # Tablas de la ruta que recorre (``_Ruta``). Mientras el autobús está
+        # en ruta ``soc`` ya es el de su regreso a la estación.
+        self.ruta = ruta
+
+
+class _Ruta:
+    """Términos por hora de ``duracion_y_consumo`` para una distancia."""
+
+    __slots__ = (
+        "distancia",
+        "indice",
+        "duracion",
+        "energia_gas",
+        "consumo_estimado",
+        "costo_gas",
+    )
+
+    def __init__(self, distancia, indice):
+        self.distancia = distancia
+        # Posición de la ruta en las tablas de gas de ``_sumar_gas``
+        self.indice = indice
+
+
+class EstacionRapida:
+    """Estación simulada con el calendario de eventos propio.
+
+    Expone los mismos contadores que :class:`modelo.EstacionIntercambio`
+    para que ``modelo.formatear_resultados`` y los gráficos la acepten.
+    ``rutas`` es una secuencia opcional de pares ``(distancia_km,
+    autobuses)`` que reparte la flota entre rutas de distinto largo, en
+    orden de salida; por defecto todos los autobuses recorren
+    ``tiempo_ruta``.
+    """
+
+    def __init__(self, max_autobuses, tiempo_ruta=37.2, config=None, rutas=None):
+        self.config = config or modelo.configuracion_actual()
+        self.flujos = FlujosAleatorios(self.config)
+        self.now = 0.0
+        self._calendario = []
+        self._secuencia = itertools.count()
+        self.eventos_procesados = 0
+
+        self.max_autobuses = max_autobuses
+        self.tiempo_ruta = tiempo_ruta
+        self.capacidad_estacion = self.config.estacion.capacidad_estacion
+        if rutas is None:
+            rutas = [(tiempo_ruta, max_autobuses)]
+        if sum(autobuses for _, autobuses in rutas) != max_autobuses:
+            raise ValueError("Las rutas deben sumar max_autobuses autobuses")
+        self._rutas = {}
+        # Tablas de la ruta de cada autobús, indexadas por su número
+        self._ruta_autobus = [None]
+        for distancia, autobuses in rutas:
+            if distancia not in self._rutas:
+                self._rutas[distancia] = _Ruta(distancia, len(self._rutas))
+            ruta = self._rutas[distancia]
+            self._ruta_autobus.extend([ruta] * autobuses)
+        self.baterias_enviadas = 0
+        self.baterias_recibidas = 0
+
+        self.registro = RegistroBaterias(
+            self.config.estacion.total_baterias,
+            self.config.estacion.baterias_iniciales,
+        )
+        self.baterias_reserva = _Cola(self.registro.reserva)
+        self.baterias_descargadas = _Cola(self.registro.descargadas)
+        self.baterias_cargando = 0
+        # Autobuses esperando batería y esperando un punto de intercambio
+        self._esperando_bateria = deque()
+        self._esperando_bahia = deque()
+        # Vueltas planificadas cuyo gas aún no se sumó, en el orden en que se
+        # planificaron: hora de término y ``24 * ruta.indice + hora de salida``
+        self._fines_gas = []
+        self._claves_gas = []
+        self._limite_vueltas_gas = VUELTAS_GAS_MINIMAS
+        self.reiniciar_metricas()
+
+        self._bahias_libres = self.capacidad_estacion
+        self._cargadores_inactivos = modelo.CargadoresInactivos()
+
+        self._preparar_tablas()
+        self._cargar_baterias_iniciales()
+        for cargador in range(self.capacidad_estacion):
+            self._programar(0, self._revisar_cargador, cargador)
+        self._programar(5, self._salida_autobus, 1)
+
+    # Calendario -----------------------------------------------------------
+    def _programar(self, retraso, funcion, *args):
+        heapq.heappush(
+            self._calendario,
+            (self.now + retraso, next(self._secuencia), funcion, args),
+        )
+
+    def programar_en(self, tiempo, funcion, *args):
+        """Programa ``funcion(*args)`` en la hora absoluta ``tiempo``."""
+        self._programar(tiempo - self.now, funcion, *args)
+
+    def __getstate__(self):
+        estado = self.__dict__.copy()
+        # Igual que en ``modelo.CargadoresInactivos``: se guarda el siguiente
+        # número de secuencia en lugar del ``itertools.count``.
+        estado["_secuencia"] = next(self._secuencia)
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._secuencia = itertools.count(estado["_secuencia"])
+
+    def ejecutar(self, hasta):
+        """Procesa los eventos anteriores a ``hasta`` (en horas).
+
+        Los eventos no crean ciclos de referencias, así que el recolector
+        cíclico se pausa mientras tanto: sólo revisaría el calendario y los
+        autobuses en cada ronda.
+        """
+        calendario = self._calendario
+        pop = heapq.heappop
+        procesados = 0
+        recolector = gc.isenabled()
+        gc.disable()
+        try:
+            while calendario and calendario[0][0] < hasta:
+                self.now, _, funcion, args = pop(calendario)
+                funcion(*args)
+                procesados += 1
+        finally:
+            if recolector:
+                gc.enable()
+        self.eventos_procesados += procesados
+        self.now = hasta
+
+    def _preparar_tablas(self):
+        """Precalcula por hora los términos de ``duracion_y_consumo``.
+
+        Las operaciones se hacen en el mismo orden que en ``modelo`` para que
+        los resultados coincidan bit a bit con el motor de simpy.
+        """
+        param_operacion = self.config.operacion
+        param_bateria = self.config.bateria
+        consumo_promedio = sum(param_operacion.consumo_kwh_km) / 2
+        factores = [modelo.trafico.factor_trafico(hora) for hora in range(24)]
+        self._ajuste = [1 + 0.2 * (factor - 1) for factor in factores]
+        # Las tablas de cada ruta se actualizan en el lugar porque los
+        # autobuses guardan una referencia a ellas.
+        for ruta in self._rutas.values():
+            distancia = ruta.distancia
+            ruta.duracion = []
+            ruta.energia_gas = []
+            ruta.consumo_estimado = []
+            for factor, ajuste in zip(factores, self._ajuste):
+                duracion = distancia / param_operacion.velocidad_promedio * ajuste
+                consumo = consumo_promedio * distancia * ajuste
+                ruta.duracion.append(duracion)
+                ruta.energia_gas.append(
+                    param_operacion.consumo_gas_hora * duracion * factor
+                )
+                ruta.consumo_estimado.append(consumo / param_bateria.capacidad * 100)
+            volumen_gas = param_operacion.consumo_gas_100km * distancia / 100
+            ruta.costo_gas = volumen_gas * self.config.economicos.costo_gas_m3
+        self._capacidad = param_bateria.capacidad
+        self._soc_objetivo = param_bateria.soc_objetivo
+        self._bateria = param_bateria
+        self._economicos = self.config.economicos
+
+    # Estación -------------------------------------------------------------
+    def autobuses_en_cola(self):
+        """Autobuses esperando una batería o un punto de intercambio."""
+        return len(self._esperando_bateria) + len(self._esperando_bahia)
+
+    def _cargar_baterias_iniciales(self, cantidad=None):
+        param_bateria = self.config.bateria
+        param_economicos = self.config.economicos
+        if cantidad is None:
+            cantidad = self.config.estacion.baterias_iniciales
+        for _ in range(cantidad):
+            capacidad_carga = param_bateria.capacidad
+            if param_economicos.horas_punta[0] <= 0 < param_economicos.horas_punta[1]:
+                costo_carga = capacidad_carga * param_economicos.costo_punta
+            else:
+                costo_carga = capacidad_carga * param_economicos.costo_normal
+            self.energia_total_cargada += capacidad_carga
+            self.costo_total_electrico += costo_carga
+
+    def _despachar_cargador(self):
+        if not self._cargadores_inactivos:
+            return
+        ahora = self.now
+        revision, cargador = self._cargadores_inactivos.tomar(ahora)
+        heapq.heappush(
+            self._calendario,
+            (
+                ahora + (revision - ahora),
+                next(self._secuencia),
+                self._revisar_cargador,
+                (cargador,),
+            ),
+        )
+
+    def _revisar_cargador(self, cargador):
+        registro = self.registro
+        if not registro.descargadas:
+            self._cargadores_inactivos.agregar(self.now, cargador)
+            return
+
+        param_economicos = self._economicos
+        inicio_punta, fin_punta = param_economicos.horas_punta
+        ahora = self.now
+        hora_actual = ahora % 24
+        en_punta = inicio_punta <= hora_actual < fin_punta
+        if en_punta and modelo.inventario_suficiente_hasta_fin_punta(
+            self, hora_actual
+        ):
+            espera = fin_punta - hora_actual
+            if espera < 0:
+                espera += 24
+            self._programar(espera, self._revisar_cargador, cargador)
+            return
+
+        bateria = registro.descargadas.popleft()
+        registro.estado[bateria] = EN_CARGA
+        registro.ingreso[bateria] = ahora
+        registro.cargando.add(bateria)
+        soc_actual = registro.soc[bateria]
+        self.baterias_cargando += 1
+        capacidad_carga = (self._soc_objetivo - soc_actual) / 100 * self._capacidad
+        # La tarifa se decide con la hora entera, igual que en ``modelo``
+        if inicio_punta <= int(hora_actual) < fin_punta:
+            costo_carga = capacidad_carga * param_economicos.costo_punta
+        else:
+            costo_carga = capacidad_carga * param_economicos.costo_normal
+        heapq.heappush(
+            self._calendario,
+            (
+                ahora + self._bateria.tiempo_carga(soc_actual),
+                next(self._secuencia),
+                self._fin_carga,
+                (cargador, bateria, capacidad_carga, costo_carga),
+            ),
+        )
+
+    def _fin_carga(self, cargador, bateria, capacidad_carga, costo_carga):
+        registro = self.registro
+        self.baterias_cargando -= 1
+        registro.cargando.discard(bateria)
+        registro.soc[bateria] = self._soc_objetivo
+        registro.ciclos[bateria] += 1
+        registro.estado[bateria] = EN_RESERVA
+        registro.ingreso[bateria] = self.now
+        registro.reserva.append(bateria)
+        if self._esperando_bateria:
+            self._programar(
+                0,
+                self._con_bateria,
+                self._esperando_bateria.popleft(),
+                registro.reserva.popleft(),
+            )
+        self.energia_total_cargada += capacidad_carga
+        self.costo_total_electrico += costo_carga
+        if registro.descargadas:
+            self._revisar_cargador(cargador)
+        else:
+            self._cargadores_inactivos.agregar(self.now, cargador)
+
+    # Ramificación ---------------------------------------------------------
+    def aplicar_cambios(
+        self, economicos=None, capacidad_estacion=None, total_baterias=None
+    ):
+        """Modifica la estación en marcha para continuar con otro escenario.
+
+        ``economicos`` reemplaza las tarifas; las cargas en curso conservan
+        el costo con que empezaron. ``capacidad_estacion`` y
+        ``total_baterias`` sólo pueden aumentar: los cargadores nuevos
+        empiezan libres y las baterías nuevas entran cargadas a la reserva,
+        contabilizadas como las baterías iniciales.
+        """
+        estacion = copy.copy(self.config.estacion)
+        if capacidad_estacion is not None:
+            if capacidad_estacion < self.capacidad_estacion:
+                raise ValueError(
+                    "No se pueden quitar cargadores a una estación en marcha"
+                )
+            for cargador in range(self.capacidad_estacion, capacidad_estacion):
+                self._programar(0, self._revisar_cargador, cargador)
+            self._bahias_libres += capacidad_estacion - self.capacidad_estacion
+            while self._esperando_bahia and self._bahias_libres > 0:
+                self._bahias_libres -= 1
+                self._programar(0, self._en_bahia, self._esperando_bahia.popleft())
+            self.capacidad_estacion = capacidad_estacion
+            estacion.capacidad_estacion = capacidad_estacion
+        if total_baterias is not None:
+            registro = self.registro
+            extra = total_baterias - registro.total
+            if extra < 0:
+                raise ValueError(
+                    "No se pueden quitar baterías a una estación en marcha"
+                )
+            for bateria in registro.agregar_cargadas(extra):
+                registro.ingreso[bateria] = self.now
+            self._cargar_baterias_iniciales(extra)
+            self._atender_esperando_bateria()
+            estacion.total_baterias = total_baterias
+        cambios = {"estacion": estacion}
+        if economicos is not None:
+            # Las vueltas ya terminadas conservan el precio del gas anterior
+            self._sumar_gas(self.now)
+            cambios["economicos"] = economicos
+            self.registro_intercambios.horas_punta = tuple(economicos.horas_punta)
+        self.config = self.config.con(**cambios)
+        self._preparar_tablas()
+
+    def _atender_esperando_bateria(self):
+        """Entrega baterías de la reserva a los autobuses que las esperan."""
+        reserva = self.registro.reserva
+        while self._esperando_bateria and reserva:
+            self._programar(
+                0,
+                self._con_bateria,
+                self._esperando_bateria.popleft(),
+                reserva.popleft(),
+            )
+
+    def reiniciar_metricas(self):
+        """Pone en cero las métricas acumuladas, p. ej. tras el calentamiento.
+
+        Las esperas en curso cuentan desde el reinicio: los autobuses que
+        esperan en la estación y las baterías de la reserva toman ``now``
+        como hora de llegada.
+        """
+        self.tiempo_espera_total = 0
+        self.energia_total_cargada = 0
+        self.costo_total_electrico = 0
+        # Las vueltas terminadas antes del reinicio no se cuentan
+        self._sumar_gas(self.now)
+        self._energia_gas = 0
+        self._costo_gas = 0
+        self.energia_punta_autobuses = 0
+        self.energia_fuera_punta_autobuses = 0
+        self.energia_punta_electrica = 0
+        self.intercambios_realizados = 0
+        self.registro_intercambios = RegistroIntercambios(
+            self.config.economicos.horas_punta,
+            guardar_filas=self.config.guardar_muestras,
+        )
+        self.espera_baterias = EstadisticaEnLinea(
+            guardar_muestras=self.config.guardar_muestras
+        )
+        self.espera_autobuses = EstadisticaEnLinea(
+            guardar_muestras=self.config.guardar_muestras
+        )
+
+        for autobus in self._autobuses_en_estacion():
+            autobus.llegada = self.now
+        for bateria in self.registro.reserva:
+            self.registro.ingreso[bateria] = self.now
+
+    def _autobuses_en_estacion(self):
+        """Autobuses que llegaron y aún no empiezan el intercambio."""
+        yield from self._esperando_bateria
+        yield from self._esperando_bahia
+        # Atendidos en este instante por un evento aún sin procesar
+        for _, _, funcion, args in self._calendario:
+            if funcion == self._con_bateria or funcion == self._en_bahia:
+                yield args[0]
+
+    # Gas de las vueltas ----------------------------------------------------
+    def _sumar_gas(self, hasta):
+        """Suma el gas de las vueltas planificadas que terminan antes de ``hasta``.
+
+        Se suman en el orden en que terminan, el mismo en que las suma el
+        motor de SimPy, y con las tablas vigentes de su ruta. Las vueltas se
+        guardan sin ordenar y se ordenan sólo las terminadas al sumarlas;
+        ``cumsum`` suma en orden, igual que la suma de a una.
+        """
+        import numpy as np
+
+        fines = np.array(self._fines_gas, dtype=float)
+        terminadas = fines < hasta
+        if terminadas.any():
+            claves = np.array(self._claves_gas, dtype=np.intp)
+            orden = np.argsort(fines[terminadas], kind="stable")
+            sumadas = claves[terminadas][orden]
+            rutas = sorted(self._rutas.values(), key=attrgetter("indice"))
+            energia = np.array([valor for ruta in rutas for valor in ruta.energia_gas])
+            costo = np.array([ruta.costo_gas for ruta in rutas])
+            self._energia_gas = float(
+                np.cumsum(np.append(self._energia_gas, energia[sumadas]))[-1]
+            )
+            self._costo_gas = float(
+                np.cumsum(np.append(self._costo_gas, costo[sumadas // 24]))[-1]
+            )
+            pendientes = ~terminadas
+            self._fines_gas = fines[pendientes].tolist()
+            self._claves_gas = claves[pendientes].tolist()
+        # Con muchas vueltas en curso se espera a acumular otras tantas
+        self._limite_vueltas_gas = max(VUELTAS_GAS_MINIMAS, 2 * len(self._fines_gas))
+
+    @property
+    def energia_total_gas(self):
+        self._sumar_gas(self.now)
+        return self._energia_gas
+
+    @property
+    def costo_total_gas(self):
+        self._sumar_gas(self.now)
+        return self._costo_gas
+
+    # Traslados entre estaciones -------------------------------------------
+    def enviar_baterias(self, cantidad):
+        """Saca hasta ``cantidad`` baterías cargadas de la reserva.
+
+        Devuelve la lista de sus SoC para entregarlas a otra estación con
+        :meth:`recibir_baterias`. La energía ya se contabilizó aquí.
+        """
+        socs = self.registro.trasladar(cantidad)
+        self.baterias_enviadas += len(socs)
+        return socs
+
+    def recibir_baterias(self, socs, llegada):
+        """Programa la llegada de baterías cargadas en la hora ``llegada``."""
+        if socs:
+            self.programar_en(max(llegada, self.now), self._llegada_baterias, socs)
+
+    def _llegada_baterias(self, socs):
+        registro = self.registro
+        for bateria, soc in zip(
+            registro.agregar_cargadas(len(socs)), socs
+        ):
+            registro.soc[bateria] = soc
+            registro.ingreso[bateria] = self.now
+        self.baterias_recibidas += len(socs)
+        self._atender_esperando_bateria()
+
+    # Autobuses ------------------------------------------------------------
+    def _salida_autobus(self, autobus_id):
+        """Programa la salida inicial de ``autobus_id`` (``llegada_autobuses``)."""
+        hora_actual = self.now % 24
+        if 7 <= hora_actual < 9 or 16 <= hora_actual < 18:
+            intervalo_base = 3.5 / 60
+        else:
+            intervalo_base = 10 / 60
+        intervalo_base /= modelo.factor_demanda(self.now)
+        flujos = self.flujos
+        variacion = flujos.variacion_salida()
+        intervalo = max(0, intervalo_base + variacion) + flujos.retraso_salida()
+        self._programar(intervalo, self._iniciar_autobus, autobus_id)
+
+    def _iniciar_autobus(self, autobus_id):
+        if autobus_id < self.max_autobuses:
+            self._salida_autobus(autobus_id + 1)
+        autobus = _Autobus(
+            autobus_id,
+            self.config.bateria.soc_objetivo,
+            self.flujos.consumo(autobus_id),
+            self._ruta_autobus[autobus_id],
+        )
+        self._revisar_autobus(autobus)
+
+    def _revisar_autobus(self, autobus):
+        hora_actual = int(self.now % 24)
+        if not autobus.primera_salida and (
+            autobus.soc - autobus.ruta.consumo_estimado[hora_actual] >= 20
+        ):
+            self._iniciar_ruta(autobus)
+            return
+        self._llegada_estacion(autobus, hora_actual)
+
+    def _llegada_estacion(self, autobus, hora_actual):
+        autobus.hora = hora_actual
+        autobus.llegada = self.now
+        reserva = self.registro.reserva
+        if reserva and not self._esperando_bateria:
+            self._con_bateria(autobus, reserva.popleft())
+        else:
+            self._esperando_bateria.append(autobus)
+
+    def _con_bateria(self, autobus, bateria):
+        registro = self.registro
+        registro.estado[bateria] = EN_AUTOBUS
+        self.espera_baterias.agregar(self.now - registro.ingreso[bateria])
+        autobus.nueva = bateria
+        if self._bahias_libres > 0:
+            self._bahias_libres -= 1
+            self._en_bahia(autobus)
+        else:
+            self._esperando_bahia.append(autobus)
+
+    def _en_bahia(self, autobus):
+        espera = self.now - autobus.llegada
+        self.tiempo_espera_total += espera
+        self.espera_autobuses.agregar(espera)
+        if not autobus.primera_salida:
+            registro = self.registro
+            bateria = autobus.bateria
+            registro.soc[bateria] = autobus.soc
+            registro.estado[bateria] = DESCARGADA
+            registro.ingreso[bateria] = self.now
+            registro.descargadas.append(bateria)
+            self._despachar_cargador()
+        heapq.heappush(
+            self._calendario,
+            (
+                self.now + TIEMPO_REEMPLAZO,
+                next(self._secuencia),
+                self._fin_intercambio,
+                (autobus,),
+            ),
+        )
+
+    def _fin_intercambio(self, autobus):
+        soc_objetivo = self._soc_objetivo
+        hora_actual = autobus.hora
+        self.intercambios_realizados += 1
+        if not autobus.primera_salida:
+            capacidad_requerida = (soc_objetivo - autobus.soc) / 100 * self._capacidad
+            self.registro_intercambios.agregar(
+                self.now, autobus.id, autobus.soc, capacidad_requerida
+            )
+            if 7 <= hora_actual < 9 or 18 <= hora_actual < 20:
+                self.energia_punta_autobuses += capacidad_requerida
+            else:
+                self.energia_fuera_punta_autobuses += capacidad_requerida
+            horas_punta = self._economicos.horas_punta
+            if horas_punta[0] <= hora_actual < horas_punta[1]:
+                self.energia_punta_electrica += capacidad_requerida
+        autobus.bateria = autobus.nueva
+        autobus.soc = soc_objetivo
+        autobus.primera_salida = False
+
+        # Liberar el punto de intercambio
+        if self._esperando_bahia:
+            self._programar(0, self._en_bahia, self._esperando_bahia.popleft())
+        else:
+            self._bahias_libres += 1
+        self._iniciar_ruta(autobus)
+
+    def _iniciar_ruta(self, autobus):
+        # Mismo cálculo que ``modelo.duracion_y_consumo`` con las partes
+        # que sólo dependen de la hora tomadas de las tablas precalculadas.
+        # Las vueltas seguidas que alcanza la batería se planifican aquí de
+        # una vez y sólo el regreso a la estación es un evento. El consumo de
+        # cada vuelta sale del flujo propio del autobús, así que sacarlo por
+        # adelantado no cambia los valores; los horarios se suman en el mismo
+        # orden que con un evento por vuelta. El gas de cada vuelta se suma
+        # cuando termina (``_sumar_gas``).
+        ruta = autobus.ruta
+        duracion = ruta.duracion
+        consumo_estimado = ruta.consumo_estimado
+        agregar_fin = self._fines_gas.append
+        agregar_clave = self._claves_gas.append
+        clave_ruta = 24 * ruta.indice
+        distancia = ruta.distancia
+        ajuste = self._ajuste
+        capacidad = self._capacidad
+        # El método ligado se llama más rápido que la instancia
+        consumo_km = autobus.consumo_km.__call__
+        tiempo = self.now
+        soc = autobus.soc
+        hora = int(tiempo % 24)
+        while True:
+            soc -= consumo_km() * distancia * ajuste[hora] / capacidad * 100
+            agregar_clave(clave_ruta + hora)
+            tiempo += duracion[hora]
+            agregar_fin(tiempo)
+            hora = int(tiempo % 24)
+            # Con menos carga que la próxima vuelta estimada más el 20 % de
+            # reserva, el autobús vuelve a la estación (siempre, si la batería
+            # quedó en negativo)
+            if soc - consumo_estimado[hora] < 20:
+                break
+        if soc < 0:
+            soc = 0
+        autobus.soc = soc
+        heapq.heappush(
+            self._calendario,
+            (tiempo, next(self._secuencia), self._fin_ruta, (autobus,)),
+        )
+
+    def _fin_ruta(self, autobus):
+        # ``_iniciar_ruta`` ya comprobó que la batería no alcanza otra vuelta.
+        # Sumar aquí el gas de tanto en tanto acota las vueltas guardadas.
+        if len(self._fines_gas) > self._limite_vueltas_gas:
+            self._sumar_gas(self.now)
+        self._llegada_estacion(autobus, int(self.now % 24))
+
+
+def ejecutar_simulacion(
+    max_autobuses, duracion, tiempo_ruta=37.2, config=None, sondas=None, perfil=None
+):
+    """Equivalente de ``modelo.ejecutar_simulacion`` con el motor propio."""
+    estacion = EstacionRapida(max_autobuses, tiempo_ruta, config)
+    if sondas is not None:
+        sondas.instalar(estacion, duracion)
+    if perfil is not None:
+        perfil.ejecutar_rapido(estacion, duracion)
+    else:
+        estacion.ejecutar(duracion)
+    return estacion
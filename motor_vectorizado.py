@@ -0,0 +1,503 @@
+"""Motor que avanza miles de réplicas de la estación a la vez.
+
+Cada réplica (combinación de autobuses, cargadores, baterías y semilla) es
+una fila de arreglos NumPy: SoC y estado de la flota, baterías en reserva,
+cola de baterías descargadas y ocupación de los cargadores. Todas las filas
+avanzan juntas aplicando las mismas reglas que ``modelo.proceso_autobus`` y
+``EstacionIntercambio.cargar_bateria``, pero cada réplica lleva su propio
+reloj: en cada vuelta del ciclo salta a su siguiente evento, la llegada de
+un autobús a la estación o el fin de la carga o de la espera de un cargador.
+Los eventos que no pueden cambiar nada hasta el siguiente del otro tipo se
+resuelven juntos, cada uno en su hora: los de los cargadores mientras no
+hay autobuses esperando y las llegadas mientras no hay baterías cargadas.
+
+Como en :mod:`motor_rapido`, las vueltas seguidas de una ruta se planifican
+de una vez al salir el autobús y el intercambio queda resuelto al atenderlo.
+Las diferencias con el motor por eventos son dos: los autobuses que ya
+tienen batería y esperan un punto de intercambio siguen contando como en
+espera de batería, y el cargador que despierta una batería nueva decide al
+momento del depósito aunque empiece a cargar en su siguiente revisión por
+minuto. Con ``paso`` las decisiones se toman en múltiplos de esa duración y
+las esperas tienen esa resolución. Está pensado para explorar rápidamente
+muchos escenarios; para cifras finales conviene confirmar los candidatos con
+``modelo.ejecutar_simulacion``.
+
+El azar sale de los mismos flujos de :mod:`flujos_aleatorios` que usan los
+motores por eventos, derivados de la semilla de cada réplica: las salidas
+iniciales, sus retrasos y el consumo de cada autobús. Así el resultado de una
+réplica depende sólo de su escenario y no de las demás réplicas del lote.
+"""
+
+import numpy as np
+
+import modelo
+from flujos_aleatorios import CONSUMO, RETRASOS, SALIDAS, generador
+
+TIEMPO_REEMPLAZO = 4 / 60  # Duración del intercambio en horas
+
+# Consumos que se sacan de una vez del flujo de cada autobús; el tamaño no
+# cambia la secuencia
+BLOQUE_CONSUMO = 128
+# Vueltas que se planifican juntas como máximo en cada tanda
+VUELTAS_POR_TANDA = 16
+
+
+class ResumenReplica:
+    """Métricas de una réplica con los nombres de ``EstacionIntercambio``."""
+
+    def __init__(self, **metricas):
+        self.__dict__.update(metricas)
+
+
+def _escenarios_completos(escenarios, config):
+    """Completa cada escenario con los parámetros de ``config``."""
+    base = {
+        "max_autobuses": config.simulacion.max_autobuses,
+        "capacidad_estacion": config.estacion.capacidad_estacion,
+        "total_baterias": config.estacion.total_baterias,
+        "baterias_iniciales": config.estacion.baterias_iniciales,
+        "semilla": config.simulacion.semilla,
+    }
+    return [{**base, **escenario} for escenario in escenarios]
+
+
+def _salidas_iniciales(semillas, autobuses, max_b, param_simulacion):
+    """Horas de la primera salida de cada autobús según ``llegada_autobuses``."""
+    replicas = len(autobuses)
+    # Variación y retraso de cada salida, de los flujos de cada réplica con
+    # el mismo orden que ``FlujosAleatorios``: dos valores de retraso por
+    # autobús, si ocurre y su duración.
+    variacion = param_simulacion.variacion_llegadas
+    retraso_minimo, retraso_maximo = param_simulacion.rango_retraso
+    variaciones = np.zeros((replicas, max_b))
+    retrasos = np.zeros((replicas, max_b))
+    for r, (semilla, n) in enumerate(zip(semillas, autobuses)):
+        variaciones[r, :n] = generador(semilla, SALIDAS).uniform(
+            -variacion, variacion, n
+        )
+        u = generador(semilla, RETRASOS).uniform(0.0, 1.0, 2 * n)
+        retrasos[r, :n] = np.where(
+            u[0::2] < param_simulacion.prob_retraso,
+            retraso_minimo + (retraso_maximo - retraso_minimo) * u[1::2],
+            0.0,
+        )
+
+    salidas = np.full((replicas, max_b), np.inf)
+    ahora = np.full(replicas, 5.0)
+    for b in range(max_b):
+        hora = ahora % 24
+        punta = ((hora >= 7) & (hora < 9)) | ((hora >= 16) & (hora < 18))
+        base = np.where(punta, 3.5 / 60, 10 / 60)
+        dia_semana = (ahora // 24).astype(int) % 7
+        base = base / np.select([dia_semana == 5, dia_semana == 6], [0.7, 0.5], 1.0)
+        intervalo = np.maximum(0, base + variaciones[:, b]) + retrasos[:, b]
+        ahora = ahora + intervalo
+        salidas[:, b] = np.where(b < autobuses, ahora, np.inf)
+    return salidas
+
+
+def simular_replicas(
+    escenarios, duracion=None, tiempo_ruta=37.2, paso=None, config=None
+):
+    """Simula todos los ``escenarios`` a la vez y devuelve un resumen por cada uno.
+
+    ``escenarios`` es una lista de diccionarios con cualquiera de las claves
+    ``max_autobuses``, ``capacidad_estacion``, ``total_baterias``,
+    ``baterias_iniciales`` y ``semilla``; las que falten se toman de los
+    parámetros de ``config`` (por defecto, los globales de ``modelo``).
+    ``duracion`` y ``paso`` se expresan en horas; sin ``paso`` cada réplica
+    avanza a la hora exacta de su siguiente evento.
+    Los resúmenes pueden pasarse a ``modelo.formatear_resultados``.
+    """
+    config = config or modelo.configuracion_actual()
+    param_bateria = config.bateria
+    param_operacion = config.operacion
+    param_economicos = config.economicos
+    if duracion is None:
+        duracion = config.simulacion.duracion
+    escenarios = _escenarios_completos(escenarios, config)
+    replicas = len(escenarios)
+    if replicas == 0:
+        return []
+
+    autobuses = np.array([e["max_autobuses"] for e in escenarios])
+    cargadores = np.array([e["capacidad_estacion"] for e in escenarios])
+    total = np.array([e["total_baterias"] for e in escenarios])
+    iniciales = np.minimum(
+        np.array([e["baterias_iniciales"] for e in escenarios]), total
+    )
+    semillas = [e["semilla"] for e in escenarios]
+    max_b = int(autobuses.max())
+    max_c = int(cargadores.max())
+    max_q = int(total.max())
+
+    # Tablas horarias equivalentes a ``duracion_y_consumo``
+    factores = np.array([modelo.trafico.factor_trafico(h) for h in range(24)])
+    ajuste = 1 + 0.2 * (factores - 1)
+    duracion_ruta = tiempo_ruta / param_operacion.velocidad_promedio * ajuste
+    consumo_promedio = sum(param_operacion.consumo_kwh_km) / 2
+    consumo_estimado = consumo_promedio * tiempo_ruta * ajuste / param_bateria.capacidad * 100
+    energia_gas = param_operacion.consumo_gas_hora * duracion_ruta * factores
+    volumen_gas = param_operacion.consumo_gas_100km * tiempo_ruta / 100
+    costo_gas_ruta = volumen_gas * param_economicos.costo_gas_m3
+    consumo_min, consumo_max = param_operacion.consumo_kwh_km
+    inicio_punta, fin_punta = param_economicos.horas_punta
+    umbral_inventario = config.simulacion.max_autobuses
+    soc_objetivo = param_bateria.soc_objetivo
+    capacidad = param_bateria.capacidad
+    periodo_revision = modelo.CargadoresInactivos.PERIODO
+
+    # Autobuses: arreglos planos de ``replicas * max_b`` elementos. ``fin``
+    # guarda la hora de la próxima llegada a la estación de cada autobús
+    # (salida inicial o regreso de la ruta) e ``inf`` mientras está en la
+    # estación; en ruta ``soc`` ya es el de su regreso. ``llegada`` es la
+    # hora de llegada de los que esperan en la cola e ``inf`` para el resto.
+    # ``*_filas`` son vistas ``(replicas, max_b)`` de los mismos datos.
+    replica_bus = np.repeat(np.arange(replicas), max_b)
+    fin = _salidas_iniciales(semillas, autobuses, max_b, config.simulacion).ravel()
+    soc = np.full(replicas * max_b, float(soc_objetivo))
+    llegada = np.full(replicas * max_b, np.inf)
+    primera = np.ones(replicas * max_b, dtype=bool)
+    # Hora en que termina el último intercambio: hasta entonces el autobús
+    # ocupa un punto de intercambio
+    fin_intercambio = np.full(replicas * max_b, -np.inf)
+    fin_filas = fin.reshape(replicas, max_b)
+    llegada_filas = llegada.reshape(replicas, max_b)
+    fin_intercambio_filas = fin_intercambio.reshape(replicas, max_b)
+    # Autobuses en la cola de cada réplica
+    esperando = np.zeros(replicas, dtype=np.int64)
+
+    # Consumo por km: bloques del flujo de cada autobús, que se crea la
+    # primera vez que sale a una ruta (``FlujosAleatorios.consumo``)
+    generadores_consumo = [None] * (replicas * max_b)
+    bloques_consumo = np.empty((replicas * max_b, BLOQUE_CONSUMO))
+    usados_consumo = np.full(replicas * max_b, BLOQUE_CONSUMO)
+    columnas_bloque = np.arange(BLOQUE_CONSUMO)
+    # Vueltas por tanda: una más de las que permite la batería llena con el
+    # consumo medio; los pocos autobuses que siguen calculan otra tanda
+    vuelta_media = consumo_promedio * tiempo_ruta * ajuste.mean() / capacidad * 100
+    vueltas_tanda = VUELTAS_POR_TANDA
+    if vuelta_media > 0:
+        alcance = (soc_objetivo - 20 - consumo_estimado.mean()) / vuelta_media + 1
+        vueltas_tanda = int(min(max(alcance + 1, 1), VUELTAS_POR_TANDA))
+    columnas_vuelta = np.arange(vueltas_tanda)
+
+    # Estación
+    reserva = iniciales.copy()
+    cola = np.zeros((replicas, max(max_q, 1)))
+    cola_inicio = np.zeros(replicas, dtype=np.int64)
+    cola_largo = total - iniciales
+    for r in range(replicas):
+        cola[r, : cola_largo[r]] = 30
+    cola_total = np.maximum(total, 1)
+    # Cargadores: ``cargador_fin`` es la hora en que termina su carga o su
+    # espera hasta el fin de la hora punta, e ``inf`` si está inactivo o no
+    # existe en esa réplica. Al comenzar todos revisan la cola.
+    replica_cargador = np.repeat(np.arange(replicas), max_c)
+    existe = (np.arange(max_c)[None, :] < cargadores[:, None]).ravel()
+    cargador_fin = np.where(existe, 0.0, np.inf)
+    cargando = np.zeros(replicas * max_c, dtype=bool)
+    inactivo_desde = np.zeros(replicas * max_c)
+    cargador_energia = np.zeros(replicas * max_c)
+    cargador_costo = np.zeros(replicas * max_c)
+    existe_filas = existe.reshape(replicas, max_c)
+    cargador_fin_filas = cargador_fin.reshape(replicas, max_c)
+    inactivo_desde_filas = inactivo_desde.reshape(replicas, max_c)
+
+    # Métricas
+    costo_inicial = (
+        param_economicos.costo_punta
+        if inicio_punta <= 0 < fin_punta
+        else param_economicos.costo_normal
+    )
+    energia_total_cargada = iniciales * float(capacidad)
+    costo_total_electrico = energia_total_cargada * costo_inicial
+    costo_total_gas = np.zeros(replicas)
+    energia_total_gas = np.zeros(replicas)
+    energia_punta_autobuses = np.zeros(replicas)
+    energia_fuera_punta_autobuses = np.zeros(replicas)
+    energia_punta_electrica = np.zeros(replicas)
+    tiempo_espera_total = np.zeros(replicas)
+    intercambios = np.zeros(replicas, dtype=np.int64)
+
+    def por_replica(indices_replica, pesos=None):
+        return np.bincount(indices_replica, pesos, minlength=replicas)
+
+    def proximos_consumos(indices):
+        # Los ``vueltas_tanda`` consumos siguientes del flujo de cada autobús,
+        # sin darlos por usados
+        cortos = indices[usados_consumo[indices] > BLOQUE_CONSUMO - vueltas_tanda]
+        for i in cortos.tolist():
+            flujo = generadores_consumo[i]
+            if flujo is None:
+                replica, columna = divmod(i, max_b)
+                flujo = generador(semillas[replica], CONSUMO, columna + 1)
+                generadores_consumo[i] = flujo
+            usados = usados_consumo[i]
+            restantes = bloques_consumo[i, usados:].copy()
+            bloques_consumo[i, : restantes.size] = restantes
+            bloques_consumo[i, restantes.size :] = flujo.uniform(
+                consumo_min, consumo_max, usados
+            )
+            usados_consumo[i] = 0
+        return bloques_consumo[
+            indices[:, None], usados_consumo[indices][:, None] + columnas_vuelta
+        ]
+
+    def iniciar_rutas(indices, inicio):
+        # Vueltas seguidas mientras la batería alcance la siguiente vuelta
+        # estimada más el 20 % de reserva, como en ``proceso_autobus``. Se
+        # calculan por tandas de vueltas y cada autobús usa un consumo de su
+        # flujo por vuelta hecha. El gas de cada vuelta cuenta si termina
+        # dentro de la simulación.
+        nonlocal energia_total_gas, costo_total_gas
+        tiempo = inicio.copy()
+        carga = soc[indices]
+        siguen = np.arange(indices.size)
+        while siguen.size:
+            ids = indices[siguen]
+            consumos = proximos_consumos(ids)
+            # Los horarios no dependen del consumo: primero las horas de
+            # inicio y fin de cada vuelta y luego la carga, restando los
+            # consumos en orden como en ``proceso_autobus``
+            t = tiempo[siguen]
+            horas = []
+            fines = []
+            for _ in range(vueltas_tanda):
+                h = (t % 24).astype(np.int64)
+                t = t + duracion_ruta[h]
+                horas.append(h)
+                fines.append(t)
+            horas = np.column_stack(horas)
+            fines = np.column_stack(fines)
+            gastos = consumos * tiempo_ruta * ajuste[horas] / capacidad * 100
+            cargas = np.subtract.accumulate(
+                np.column_stack((carga[siguen], gastos)), axis=1
+            )[:, 1:]
+            regresa = cargas - consumo_estimado[(fines % 24).astype(np.int64)] < 20
+            vuelve = regresa.any(axis=1)
+            hechas = np.where(vuelve, regresa.argmax(axis=1) + 1, vueltas_tanda)
+            usados_consumo[ids] += hechas
+            cuentan = (columnas_vuelta < hechas[:, None]) & (fines < duracion)
+            r = replica_bus[ids][np.nonzero(cuentan)[0]]
+            energia_total_gas += por_replica(r, energia_gas[horas[cuentan]])
+            costo_total_gas += por_replica(r) * costo_gas_ruta
+            filas = np.arange(ids.size)
+            tiempo[siguen] = fines[filas, hechas - 1]
+            carga[siguen] = cargas[filas, hechas - 1]
+            siguen = siguen[~vuelve]
+        soc[indices] = np.maximum(0, carga)
+        fin[indices] = tiempo
+
+    def revisar_cargadores(indices, inicio, reserva_vista):
+        # Cada cargador de ``indices`` revisa la cola en ``inicio``, como el
+        # ciclo de ``cargar_bateria``, viendo ``reserva_vista`` baterías en
+        # la reserva. Llegan ordenados por réplica y, dentro de cada una, en
+        # el orden en que revisan.
+        nonlocal cola_inicio, cola_largo
+        r = replica_cargador[indices]
+        hora = inicio % 24
+        # Con inventario suficiente se espera el fin de la hora punta
+        # eléctrica (``inventario_suficiente_hasta_fin_punta``)
+        difiere = (
+            (inicio_punta <= hora) & (hora < fin_punta) & (reserva_vista > umbral_inventario)
+        )
+        revisan = ~difiere
+        # Lugar en la cola que le toca a cada cargador que no espera
+        acumulado = np.cumsum(revisan)
+        primeros = np.searchsorted(r, r)
+        lugar = acumulado - 1 - (acumulado - revisan)[primeros]
+        toma = revisan & (lugar < cola_largo[r])
+        duerme = difiere & (cola_largo[r] > 0)
+        inactivo = ~(toma | duerme)
+        cargando[indices] = toma
+        cargador_fin[indices[inactivo]] = np.inf
+        inactivo_desde[indices[inactivo]] = inicio[inactivo]
+        cargador_fin[indices[duerme]] = inicio[duerme] + fin_punta - hora[duerme]
+        if toma.any():
+            indices, inicio, r = indices[toma], inicio[toma], r[toma]
+            posicion = (cola_inicio[r] + lugar[toma]) % cola_total[r]
+            socs = cola[r, posicion]
+            cargador_fin[indices] = inicio + param_bateria.tiempos_carga(socs)
+            energia = (soc_objetivo - socs) / 100 * capacidad
+            # La tarifa se decide con la hora entera, igual que en ``modelo``
+            hora = hora[toma].astype(np.int64)
+            tarifa = np.where(
+                (inicio_punta <= hora) & (hora < fin_punta),
+                param_economicos.costo_punta,
+                param_economicos.costo_normal,
+            )
+            cargador_energia[indices] = energia
+            cargador_costo[indices] = energia * tarifa
+            tomadas = por_replica(r)
+            cola_inicio = (cola_inicio + tomadas) % cola_total
+            cola_largo = cola_largo - tomadas
+
+    # Próxima liberación de un punto de intercambio en las réplicas con
+    # autobuses que sólo esperan uno
+    proxima_bahia = np.full(replicas, np.inf)
+    while True:
+        # Siguiente evento de cada réplica. Sin autobuses esperando, las
+        # cargas y esperas de los cargadores hasta la siguiente llegada se
+        # resuelven junto con ella, cada una en su hora; con la reserva
+        # vacía, los autobuses que llegan antes del siguiente evento de un
+        # cargador sólo entran a la cola. Las réplicas sin eventos antes de
+        # ``duracion`` quedan con ``-inf`` y ya no cambian.
+        proximo_bus = np.minimum(fin_filas.min(axis=1), proxima_bahia)
+        proximo_cargador = cargador_fin_filas.min(axis=1)
+        ahora = np.where(
+            reserva == 0,
+            proximo_cargador,
+            np.where(
+                (esperando > 0) | (proximo_bus >= duracion),
+                np.minimum(proximo_bus, proximo_cargador),
+                proximo_bus,
+            ),
+        )
+        if paso is not None:
+            ahora = np.ceil(ahora / paso) * paso
+        activas = ahora < duracion
+        if not activas.any():
+            break
+        ahora = np.where(activas, ahora, -np.inf)
+        hasta = ahora[:, None]
+
+        # Cargadores que terminan una carga o una espera hasta ``ahora``, en
+        # orden dentro de cada réplica: la batería cargada pasa a la reserva
+        # y el cargador revisa la cola. Si alguno vuelve a terminar antes de
+        # ``ahora`` se repite.
+        terminan = np.flatnonzero(cargador_fin_filas <= hasta)
+        while terminan.size:
+            inicios = cargador_fin[terminan]
+            r = replica_cargador[terminan]
+            orden = np.lexsort((inicios, r))
+            terminan, inicios, r = terminan[orden], inicios[orden], r[orden]
+            cargas = cargando[terminan]
+            # Baterías en la reserva al revisar cada cargador
+            acumuladas = np.cumsum(cargas)
+            reserva_vista = (
+                reserva[r] + acumuladas - (acumuladas - cargas)[np.searchsorted(r, r)]
+            )
+            if cargas.any():
+                terminadas = terminan[cargas]
+                rc = r[cargas]
+                reserva += por_replica(rc)
+                energia_total_cargada += por_replica(rc, cargador_energia[terminadas])
+                costo_total_electrico += por_replica(rc, cargador_costo[terminadas])
+            revisar_cargadores(terminan, inicios, reserva_vista)
+            terminan = terminan[cargador_fin[terminan] <= ahora[r]]
+
+        # Salidas iniciales y regresos: el autobús entra a la cola
+        vencidos = np.flatnonzero(fin_filas <= hasta)
+        if vencidos.size:
+            esperando += por_replica(replica_bus[vencidos])
+            llegada[vencidos] = fin[vencidos]
+            fin[vencidos] = np.inf
+
+        # Atender la cola en orden de llegada mientras haya baterías y puntos
+        # de intercambio libres, un autobús por réplica en cada vuelta. Sólo
+        # se miran las filas de las réplicas con autobuses esperando.
+        depositadas = np.zeros(replicas, dtype=np.int64)
+        cupo = np.minimum(reserva, esperando)
+        activas = np.flatnonzero(cupo > 0)
+        if activas.size:
+            ocupados = np.count_nonzero(
+                fin_intercambio_filas[activas] > hasta[activas], axis=1
+            )
+            n = np.minimum(cupo[activas], cargadores[activas] - ocupados)
+            activas, n = activas[n > 0], n[n > 0]
+        while activas.size:
+            atendidos = activas * max_b + llegada_filas[activas].argmin(axis=1)
+            servicio = ahora[activas]
+            tiempo_espera_total[activas] += servicio - llegada[atendidos]
+            reserva[activas] -= 1
+            esperando[activas] -= 1
+            termina = servicio + TIEMPO_REEMPLAZO
+            fin_intercambio[atendidos] = termina
+            # Sólo cuentan los intercambios que terminan dentro de la simulación
+            cuentan = termina < duracion
+            intercambios[activas[cuentan]] += 1
+            deposita = ~primera[atendidos]
+            usados = deposita & cuentan
+            if usados.any():
+                ru = activas[usados]
+                energia = (soc_objetivo - soc[atendidos[usados]]) / 100 * capacidad
+                hora = (llegada[atendidos[usados]] % 24).astype(np.int64)
+                punta_bus = ((hora >= 7) & (hora < 9)) | ((hora >= 18) & (hora < 20))
+                punta_elec = (hora >= inicio_punta) & (hora < fin_punta)
+                energia_punta_autobuses[ru] += energia * punta_bus
+                energia_fuera_punta_autobuses[ru] += energia * ~punta_bus
+                energia_punta_electrica[ru] += energia * punta_elec
+            # La batería usada pasa a la cola de descarga
+            rd = activas[deposita]
+            posicion = (cola_inicio[rd] + cola_largo[rd]) % cola_total[rd]
+            cola[rd, posicion] = soc[atendidos[deposita]]
+            cola_largo[rd] += 1
+            depositadas[rd] += 1
+            llegada[atendidos] = np.inf
+            soc[atendidos] = soc_objetivo
+            primera[atendidos] = False
+            iniciar_rutas(atendidos, termina)
+            n -= 1
+            activas, n = activas[n > 0], n[n > 0]
+
+        # Con baterías en la reserva, los autobuses que siguen esperando sólo
+        # aguardan a que se libere un punto de intercambio
+        proxima_bahia[:] = np.inf
+        bloqueadas = np.flatnonzero((esperando > 0) & (reserva > 0))
+        if bloqueadas.size:
+            liberan = fin_intercambio_filas[bloqueadas]
+            proxima_bahia[bloqueadas] = np.where(
+                liberan > hasta[bloqueadas], liberan, np.inf
+            ).min(axis=1)
+
+        # Cada batería depositada despierta al cargador inactivo que haría
+        # antes su revisión por minuto (``_despachar_cargador``), que revisa
+        # la cola en ese minuto
+        filas_deposito = np.flatnonzero(depositadas)
+        if filas_deposito.size:
+            inactivos = existe_filas[filas_deposito] & (
+                cargador_fin_filas[filas_deposito] == np.inf
+            )
+            desde = inactivo_desde_filas[filas_deposito]
+            minutos = np.floor((hasta[filas_deposito] - desde) / periodo_revision)
+            revision = np.where(
+                inactivos, desde + (minutos + 1) * periodo_revision, np.inf
+            )
+            despiertan = np.minimum(
+                depositadas[filas_deposito], np.count_nonzero(inactivos, axis=1)
+            )
+            filas = np.flatnonzero(despiertan)
+            despertados = []
+            revisiones = []
+            while filas.size:
+                columnas = revision[filas].argmin(axis=1)
+                despertados.append(filas_deposito[filas] * max_c + columnas)
+                revisiones.append(revision[filas, columnas])
+                revision[filas, columnas] = np.inf
+                despiertan[filas] -= 1
+                filas = filas[despiertan[filas] > 0]
+            if despertados:
+                revisan = np.concatenate(despertados)
+                inicios = np.concatenate(revisiones)
+                r = replica_cargador[revisan]
+                orden = np.lexsort((inicios, r))
+                revisan, inicios, r = revisan[orden], inicios[orden], r[orden]
+                revisar_cargadores(revisan, inicios, reserva[r])
+
+    return [
+        ResumenReplica(
+            escenario=escenarios[r],
+            intercambios_realizados=int(intercambios[r]),
+            tiempo_espera_total=float(tiempo_espera_total[r]),
+            energia_total_cargada=float(energia_total_cargada[r]),
+            costo_total_electrico=float(costo_total_electrico[r]),
+            costo_total_gas=float(costo_total_gas[r]),
+            energia_total_gas=float(energia_total_gas[r]),
+            energia_punta_autobuses=float(energia_punta_autobuses[r]),
+            energia_fuera_punta_autobuses=float(energia_fuera_punta_autobuses[r]),
+            energia_punta_electrica=float(energia_punta_electrica[r]),
+            baterias_reserva=int(reserva[r]),
+        )
+        for r in range(replicas)
+    ]
@@ -0,0 +1,293 @@
+"""Búsqueda de la estación más barata que cumple un nivel de servicio.
+
+El nivel de servicio (SLA) limita un percentil de la espera de los autobuses
+antes del intercambio, por ejemplo que el 95 % espere menos de 5 minutos.
+:func:`optimizar_estacion` busca la combinación de cargadores
+(``capacidad_estacion``) y baterías (``total_baterias``) de menor costo que
+lo cumple para una flota dada.
+
+La espera no aumenta al agregar cargadores o baterías, de modo que las
+configuraciones factibles forman una escalera: para cada cantidad de
+cargadores basta con encontrar, por bisección, la menor cantidad de baterías
+que cumple el SLA, y esa cantidad no crece al sumar cargadores. La búsqueda
+recorre la escalera desde la menor cantidad de cargadores factible y se
+detiene cuando ninguna configuración restante puede ser más barata que la
+mejor encontrada. Cada bisección prueba varios puntos a la vez, repartidos
+entre procesos por :func:`barrido.ejecutar_barrido`, y cada configuración se
+simula con unas pocas réplicas que usan las mismas semillas en todos los
+candidatos. Los resultados quedan en :data:`cache_resultados.cache` y en la
+memoria del optimizador, por lo que ninguna configuración se simula dos
+veces.
+
+La monotonía es aproximada: con pocas réplicas dos configuraciones vecinas
+pueden invertir su orden por unas décimas de minuto. Por eso un candidato
+sólo se acepta si sus réplicas cumplen el SLA, nunca por deducción.
+"""
+
+import os
+
+import modelo
+
+PERCENTIL_SLA = 0.95
+ESPERA_MAXIMA = 5.0  # Minutos
+REPLICAS_POR_CANDIDATO = 3
+
+
+class Evaluacion:
+    """Resultado de simular una configuración con varias réplicas."""
+
+    def __init__(self, capacidad_estacion, total_baterias, resumenes, percentil):
+        self.capacidad_estacion = capacidad_estacion
+        self.total_baterias = total_baterias
+        # Percentil de la espera de cada réplica, en minutos
+        self.esperas = [
+            resumen.espera_autobuses.cuantil(percentil) * 60
+            for resumen in resumenes
+        ]
+        self.costo_operacion = sum(
+            resumen.costo_total_electrico for resumen in resumenes
+        ) / len(resumenes)
+
+    @property
+    def espera(self):
+        """Peor percentil de espera entre las réplicas (minutos)."""
+        return max(self.esperas)
+
+
+class ResultadoOptimizacion:
+    """Mejor configuración encontrada y las evaluaciones realizadas."""
+
+    def __init__(self, optimizador, mejor, tamano_grilla):
+        self.percentil = optimizador.percentil
+        self.espera_maxima = optimizador.espera_maxima
+        self.replicas = optimizador.replicas
+        self.mejor = mejor
+        self.costo = None if mejor is None else optimizador.costo(mejor)
+        self.evaluaciones = list(optimizador.evaluaciones.values())
+        self.tamano_grilla = tamano_grilla
+
+    @property
+    def simulaciones(self):
+        return len(self.evaluaciones) * self.replicas
+
+
+class _Optimizador:
+    """Evalúa candidatos con memoria y los agrupa en tandas paralelas."""
+
+    def __init__(
+        self,
+        config,
+        max_autobuses,
+        percentil,
+        espera_maxima,
+        replicas,
+        costo_cargador,
+        costo_bateria,
+        incluir_operacion,
+        jobs,
+        duracion,
+        tiempo_ruta,
+        engine,
+    ):
+        self.config = config
+        self.max_autobuses = max_autobuses
+        self.percentil = percentil
+        self.espera_maxima = espera_maxima
+        self.replicas = replicas
+        self.costo_cargador = costo_cargador
+        self.costo_bateria = costo_bateria
+        self.incluir_operacion = incluir_operacion
+        self.jobs = jobs
+        self.duracion = duracion
+        self.tiempo_ruta = tiempo_ruta
+        self.engine = engine
+        self.evaluaciones = {}
+
+    def costo_capital(self, cargadores, baterias):
+        return self.costo_cargador * cargadores + self.costo_bateria * baterias
+
+    def costo(self, evaluacion):
+        costo = self.costo_capital(
+            evaluacion.capacidad_estacion, evaluacion.total_baterias
+        )
+        if self.incluir_operacion:
+            costo += evaluacion.costo_operacion
+        return costo
+
+    def factible(self, candidato):
+        return self.evaluaciones[candidato].espera <= self.espera_maxima
+
+    def evaluar(self, candidatos):
+        """Simula los ``(cargadores, baterías)`` que aún no se evaluaron."""
+        nuevos = [c for c in dict.fromkeys(candidatos) if c not in self.evaluaciones]
+        if not nuevos:
+            return
+        semilla = self.config.simulacion.semilla
+        iniciales = self.config.estacion.baterias_iniciales
+        puntos = [
+            {
+                "max_autobuses": self.max_autobuses,
+                "capacidad_estacion": cargadores,
+                "total_baterias": baterias,
+                "baterias_iniciales": min(iniciales, baterias),
+                "semilla": semilla + replica,
+            }
+            for cargadores, baterias in nuevos
+            for replica in range(self.replicas)
+        ]
+        from barrido import ejecutar_barrido
+
+        resumenes = ejecutar_barrido(
+            puntos,
+            jobs=self.jobs,
+            duracion=self.duracion,
+            tiempo_ruta=self.tiempo_ruta,
+            engine=self.engine,
+            config=self.config,
+        )
+        for i, (cargadores, baterias) in enumerate(nuevos):
+            grupo = resumenes[i * self.replicas:(i + 1) * self.replicas]
+            self.evaluaciones[(cargadores, baterias)] = Evaluacion(
+                cargadores, baterias, grupo, self.percentil
+            )
+
+    def primer_factible(self, candidato, bajo, alto):
+        """Menor ``x`` en ``[bajo, alto]`` con ``candidato(x)`` factible.
+
+        Supone que la factibilidad es monótona en ``x``. Cada paso prueba
+        tantos puntos interiores como procesos por tanda de réplicas.
+        Devuelve ``None`` si ``candidato(alto)`` no cumple el SLA.
+        """
+        puntos_por_paso = max(1, self.jobs // self.replicas)
+        while bajo < alto:
+            ancho = alto - bajo
+            xs = sorted(
+                {bajo + ancho * (i + 1) // (puntos_por_paso + 1)
+                 for i in range(puntos_por_paso)}
+            )
+            self.evaluar([candidato(x) for x in xs])
+            nuevo_alto = alto
+            for x in reversed(xs):
+                if self.factible(candidato(x)):
+                    nuevo_alto = x
+                else:
+                    bajo = x + 1
+                    break
+            alto = nuevo_alto
+        self.evaluar([candidato(alto)])
+        return alto if self.factible(candidato(alto)) else None
+
+
+def optimizar_estacion(
+    max_autobuses=None,
+    percentil=PERCENTIL_SLA,
+    espera_maxima=ESPERA_MAXIMA,
+    replicas=REPLICAS_POR_CANDIDATO,
+    costo_cargador=1.0,
+    costo_bateria=1.0,
+    incluir_operacion=False,
+    max_cargadores=None,
+    max_baterias=None,
+    jobs=None,
+    duracion=None,
+    tiempo_ruta=37.2,
+    engine="rapido",
+    config=None,
+):
+    """Configuración más barata que cumple el SLA de espera.
+
+    El SLA exige que en cada réplica el percentil ``percentil`` de la espera
+    de los autobuses no supere ``espera_maxima`` minutos. El costo es
+    ``costo_cargador * cargadores + costo_bateria * baterías``, más el costo
+    eléctrico medio de la simulación si ``incluir_operacion`` es verdadero.
+    Se prueban de 1 a ``max_cargadores`` cargadores (por defecto dos por
+    autobús) y de ``max_autobuses + 1`` a ``max_baterias`` baterías (por
+    defecto cuatro por autobús). Devuelve un :class:`ResultadoOptimizacion`
+    cuyo ``mejor`` es ``None`` si ni la estación más grande cumple el SLA.
+    """
+    config = config or modelo.configuracion_actual(verbose=False)
+    if max_autobuses is None:
+        max_autobuses = config.simulacion.max_autobuses
+    if not 0 < percentil <= 1:
+        raise ValueError("El percentil debe estar entre 0 y 1")
+    if replicas < 1:
+        raise ValueError("Se necesita al menos una réplica por candidato")
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    max_cargadores = max_cargadores or 2 * max_autobuses
+    max_baterias = max_baterias or 4 * max_autobuses
+    min_baterias = max_autobuses + 1
+    if max_baterias < min_baterias:
+        raise ValueError("Se necesita al menos una batería más que autobuses")
+    tamano_grilla = max_cargadores * (max_baterias - min_baterias + 1)
+
+    optimizador = _Optimizador(
+        config,
+        max_autobuses,
+        percentil,
+        espera_maxima,
+        replicas,
+        costo_cargador,
+        costo_bateria,
+        incluir_operacion,
+        jobs,
+        duracion,
+        tiempo_ruta,
+        engine,
+    )
+
+    # Límites de la escalera: menos cargadores con todas las baterías y
+    # menos baterías con todos los cargadores.
+    min_cargadores = optimizador.primer_factible(
+        lambda x: (x, max_baterias), 1, max_cargadores
+    )
+    if min_cargadores is None:
+        return ResultadoOptimizacion(optimizador, None, tamano_grilla)
+    min_baterias = (
+        optimizador.primer_factible(
+            lambda x: (max_cargadores, x), min_baterias, max_baterias
+        )
+        or min_baterias
+    )
+
+    mejor = None
+    tope = max_baterias
+    for cargadores in range(min_cargadores, max_cargadores + 1):
+        if mejor is not None and optimizador.costo_capital(
+            cargadores, min_baterias
+        ) >= optimizador.costo(mejor):
+            break
+        baterias = optimizador.primer_factible(
+            lambda x: (cargadores, x), min_baterias, tope
+        )
+        if baterias is None:
+            continue
+        tope = baterias
+        evaluacion = optimizador.evaluaciones[(cargadores, baterias)]
+        if mejor is None or optimizador.costo(evaluacion) < optimizador.costo(mejor):
+            mejor = evaluacion
+    return ResultadoOptimizacion(optimizador, mejor, tamano_grilla)
+
+
+def formatear_optimizacion(resultado):
+    """Devuelve una lista con los textos del resultado de la optimización."""
+    sla = (
+        f"percentil {resultado.percentil:.0%} de la espera "
+        f"≤ {resultado.espera_maxima:g} min"
+    )
+    lines = []
+    mejor = resultado.mejor
+    if mejor is None:
+        lines.append(f"Ninguna configuración probada cumple el SLA ({sla}).")
+    else:
+        lines.append(f"Configuración más barata que cumple el SLA ({sla}):")
+        lines.append(f"Cargadores: {mejor.capacidad_estacion}")
+        lines.append(f"Baterías: {mejor.total_baterias}")
+        lines.append(f"Espera en el percentil: {mejor.espera:.2f} min")
+        lines.append(f"Costo eléctrico medio: {mejor.costo_operacion:.2f} S/.")
+        lines.append(f"Costo del objetivo: {resultado.costo:.2f}")
+    lines.append(
+        f"Configuraciones evaluadas: {len(resultado.evaluaciones)} de "
+        f"{resultado.tamano_grilla} ({resultado.simulaciones} simulaciones)"
+    )
+    return lines
@@ -3,6 +3,7 @@ from .estacion import ParametrosEstacion
 from .operacion_bus import ParametrosOperacionBus
 from .economicos import ParametrosEconomicos
 from .simulacion import ParametrosSimulacion
+from .configuracion import RunConfig
 
 __all__ = [
     "ParametrosBateria",
@@ -10,4 +11,5 @@ __all__ = [
     "ParametrosOperacionBus",
     "ParametrosEconomicos",
     "ParametrosSimulacion",
+    "RunConfig",
 ]
@@ -1,3 +1,7 @@
+import bisect
+import math
+
+
 class ParametrosBateria:
     """Parámetros relacionados a la batería y curva de carga."""
 
@@ -11,6 +15,7 @@ class ParametrosBateria:
         # - 0 a 20 %  : 50 kW → 150 kW
         # - 20 a 55 % : 150 kW → 140 kW
         # - 55 a 80 % : 140 kW → 50 kW
+        # Por encima del último punto la potencia se mantiene constante.
         self.puntos_curva = [
             (0, 50),
             (20, 150),
@@ -18,6 +23,95 @@ class ParametrosBateria:
             (80, 50),
         ]
 
+    @property
+    def soc_objetivo(self):
+        """SoC en % hasta el que se cargan las baterías."""
+        return self._soc_objetivo
+
+    @soc_objetivo.setter
+    def soc_objetivo(self, soc_objetivo):
+        self._soc_objetivo = soc_objetivo
+        self._preparar_objetivo()
+
+    def _preparar_objetivo(self):
+        """Guarda la integral hasta el objetivo que usa :meth:`tiempo_carga`."""
+        if not hasattr(self, "_acumulado"):
+            # La curva aún no se definió (``__init__``)
+            return
+        self._objetivo = min(self._soc_objetivo, 100)
+        self._integral_objetivo = self._integral(self._objetivo)
+
+    @property
+    def puntos_curva(self):
+        """Puntos (SoC, potencia) de la curva de carga."""
+        return self._puntos_curva
+
+    @puntos_curva.setter
+    def puntos_curva(self, puntos):
+        puntos = tuple(sorted((float(soc), float(pot)) for soc, pot in puntos))
+        if not puntos:
+            raise ValueError("La curva de carga necesita al menos un punto")
+        if any(pot <= 0 for _, pot in puntos):
+            raise ValueError("La potencia de carga debe ser positiva")
+        self._puntos_curva = puntos
+        self._construir_tabla()
+
+    def _construir_tabla(self):
+        """Precalcula el tiempo acumulado de carga en cada punto de la curva.
+
+        La tabla guarda la integral de ``1 / potencia`` respecto al SoC
+        desde 0 %, de modo que el tiempo entre dos SoC se obtiene restando dos
+        valores y multiplicando por la energía de cada punto porcentual.
+        """
+        puntos = list(self._puntos_curva)
+        if puntos[0][0] > 0:
+            puntos.insert(0, (0.0, puntos[0][1]))
+        if puntos[-1][0] < 100:
+            puntos.append((100.0, puntos[-1][1]))
+        self._socs = [soc for soc, _ in puntos]
+        self._potencias = [pot for _, pot in puntos]
+        # Pendiente de la potencia en cada tramo (kW por punto de SoC)
+        self._pendientes = []
+        for i in range(len(puntos) - 1):
+            ancho = self._socs[i + 1] - self._socs[i]
+            if ancho == 0:
+                self._pendientes.append(0.0)
+            else:
+                self._pendientes.append(
+                    (self._potencias[i + 1] - self._potencias[i]) / ancho
+                )
+        self._acumulado = [0.0]
+        for i in range(len(self._pendientes)):
+            self._acumulado.append(
+                self._acumulado[-1] + self._integral_tramo(i, self._socs[i + 1])
+            )
+        self._preparar_objetivo()
+
+    def _integral_tramo(self, i, soc):
+        """Integral exacta de ``1 / potencia`` desde el inicio del tramo ``i``."""
+        pendiente = self._pendientes[i]
+        base = self._potencias[i]
+        delta = soc - self._socs[i]
+        if pendiente == 0:
+            return delta / base
+        return math.log((base + pendiente * delta) / base) / pendiente
+
+    def _integral(self, soc):
+        """Integral de ``1 / potencia`` entre 0 % y ``soc``."""
+        i = bisect.bisect_right(self._socs, soc) - 1
+        if i < 0:
+            i = 0
+        elif i >= len(self._pendientes):
+            i = len(self._pendientes) - 1
+        # Mismo cálculo que ``_integral_tramo``, sin la llamada adicional
+        pendiente = self._pendientes[i]
+        base = self._potencias[i]
+        delta = soc - self._socs[i]
+        if pendiente == 0:
+            return self._acumulado[i] + delta / base
+        tramo = math.log((base + pendiente * delta) / base) / pendiente
+        return self._acumulado[i] + tramo
+
     def actualizar(self, potencia=None, capacidad=None, soc_objetivo=None):
         """Actualiza los valores de la batería según se necesite."""
         if potencia is not None:
@@ -32,28 +126,79 @@ class ParametrosBateria:
         """Devuelve la potencia de carga en kW para el SoC dado."""
 
         soc = max(0, min(soc, 100))
-        if soc < 20:
-            # De 50 a 150 kW
-            return 50 + (soc / 20) * 100
-        if soc < 55:
-            # De 150 a 140 kW
-            return 150 - (soc - 20) * (10 / 35)
-        if soc < 80:
-            # De 140 a 50 kW
-            return 140 - (soc - 55) * (90 / 25)
-        return 50
+        i = bisect.bisect_right(self._socs, soc) - 1
+        i = max(0, min(i, len(self._pendientes) - 1))
+        return self._potencias[i] + self._pendientes[i] * (soc - self._socs[i])
 
     def tiempo_carga(self, soc_inicial, soc_objetivo=None):
-        """Tiempo necesario para cargar desde ``soc_inicial`` hasta el objetivo."""
-        objetivo = self.soc_objetivo if soc_objetivo is None else soc_objetivo
-        objetivo = min(objetivo, 100)
+        """Tiempo necesario para cargar desde ``soc_inicial`` hasta el objetivo.
+
+        La curva es lineal por tramos, por lo que el tiempo se integra de forma
+        exacta con la tabla precalculada en lugar de sumar pasos de 1 %.
+        """
+        if soc_objetivo is None:
+            objetivo = self._objetivo
+            integral_objetivo = self._integral_objetivo
+        else:
+            objetivo = min(soc_objetivo, 100)
+            integral_objetivo = self._integral(objetivo)
         soc = max(0, soc_inicial)
-        energia_por_pct = self.capacidad / 100
-        tiempo = 0.0
-        while soc < objetivo:
-            sig = min(soc + 1, objetivo)
-            potencia = self.potencia_carga(soc)
-            energia = (sig - soc) * energia_por_pct
-            tiempo += energia / potencia
-            soc = sig
-        return tiempo
+        if soc >= objetivo:
+            return 0.0
+        return self.capacidad / 100 * (integral_objetivo - self._integral(soc))
+
+    def soc_tras_carga(self, soc_inicial, horas):
+        """SoC alcanzado tras cargar ``horas`` desde ``soc_inicial``.
+
+        Es la inversa de :meth:`tiempo_carga`: se busca el tramo de la tabla
+        acumulada que contiene la integral objetivo y se despeja en él.
+        """
+        soc = max(0, min(soc_inicial, 100))
+        objetivo = self._integral(soc) + horas * 100 / self.capacidad
+        if objetivo >= self._acumulado[-1]:
+            return 100.0
+        i = bisect.bisect_right(self._acumulado, objetivo) - 1
+        i = max(0, min(i, len(self._pendientes) - 1))
+        resto = objetivo - self._acumulado[i]
+        pendiente = self._pendientes[i]
+        base = self._potencias[i]
+        if pendiente == 0:
+            return self._socs[i] + resto * base
+        return self._socs[i] + base * (math.exp(pendiente * resto) - 1) / pendiente
+
+    def tiempos_carga(self, socs_iniciales, soc_objetivo=None):
+        """Versión vectorizada de :meth:`tiempo_carga` para arreglos NumPy.
+
+        ``socs_iniciales`` puede ser cualquier secuencia de SoC y
+        ``soc_objetivo`` un escalar o un arreglo del mismo tamaño.
+        """
+        import numpy as np
+
+        soc = np.maximum(np.asarray(socs_iniciales, dtype=float), 0)
+        if soc_objetivo is None:
+            # Con el objetivo configurado su integral ya está calculada
+            soc = np.minimum(soc, self._objetivo)
+            integral_objetivo = self._integral_objetivo
+        else:
+            objetivo = np.minimum(np.asarray(soc_objetivo, dtype=float), 100)
+            soc = np.minimum(soc, objetivo)
+            integral_objetivo = self._integral_np(objetivo)
+        return self.capacidad / 100 * (integral_objetivo - self._integral_np(soc))
+
+    def _integral_np(self, soc):
+        import numpy as np
+
+        socs = np.asarray(self._socs)
+        i = np.searchsorted(socs, soc, side="right") - 1
+        i = np.minimum(np.maximum(i, 0), len(self._pendientes) - 1)
+        pendiente = np.asarray(self._pendientes)[i]
+        base = np.asarray(self._potencias)[i]
+        delta = soc - socs[i]
+        plana = pendiente == 0
+        divisor = np.where(plana, 1.0, pendiente)
+        parcial = np.where(
+            plana,
+            delta / base,
+            np.log((base + pendiente * delta) / base) / divisor,
+        )
+        return np.asarray(self._acumulado)[i] + parcial
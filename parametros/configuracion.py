@@ -0,0 +1,44 @@
+import copy
+from dataclasses import dataclass, field, replace
+
+from .bateria import ParametrosBateria
+from .economicos import ParametrosEconomicos
+from .estacion import ParametrosEstacion
+from .operacion_bus import ParametrosOperacionBus
+from .simulacion import ParametrosSimulacion
+
+# Campos de ``RunConfig`` que contienen objetos de parámetros
+CAMPOS_PARAMETROS = ("bateria", "estacion", "operacion", "economicos", "simulacion")
+
+
+@dataclass(frozen=True, eq=False)
+class RunConfig:
+    """Configuración completa e inmutable de una corrida de la simulación.
+
+    Guarda copias propias de los cinco objetos de parámetros, de modo que
+    cambiar los originales después de crearla no altera la corrida. Los
+    objetos internos no deben modificarse; para variar un valor se crea una
+    configuración nueva con :meth:`con`. Al no depender de estado global,
+    varias corridas pueden ejecutarse a la vez en hilos o enviarse a otros
+    procesos.
+
+    ``guardar_muestras`` conserva además cada tiempo de espera individual en
+    las estadísticas de la estación (ver :mod:`estadisticas`) y cada fila
+    del registro de intercambios (ver :mod:`registro_intercambios`).
+    """
+
+    bateria: ParametrosBateria = field(default_factory=ParametrosBateria)
+    estacion: ParametrosEstacion = field(default_factory=ParametrosEstacion)
+    operacion: ParametrosOperacionBus = field(default_factory=ParametrosOperacionBus)
+    economicos: ParametrosEconomicos = field(default_factory=ParametrosEconomicos)
+    simulacion: ParametrosSimulacion = field(default_factory=ParametrosSimulacion)
+    verbose: bool = False
+    guardar_muestras: bool = False
+
+    def __post_init__(self):
+        for campo in CAMPOS_PARAMETROS:
+            object.__setattr__(self, campo, copy.deepcopy(getattr(self, campo)))
+
+    def con(self, **cambios):
+        """Devuelve una copia con los campos indicados reemplazados."""
+        return replace(self, **cambios)
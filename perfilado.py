@@ -0,0 +1,257 @@
+"""Instrumentación opcional para saber en qué se va el tiempo de una corrida.
+
+Un :class:`Perfil` se pasa a ``modelo.ejecutar_simulacion(..., perfil=...)``
+(o se activa con ``cli.py --profile``) y reemplaza el bucle de eventos por
+uno equivalente que, para cada evento procesado:
+
+* identifica su origen, el tipo de proceso al que pertenece
+  (``cargar_bateria``, ``proceso_autobus``, ``llegada_autobuses``, ``sondas``
+  o el nombre de un proceso extra);
+* cuenta el evento y suma su tiempo de pared a ese origen;
+* cada ``cada_eventos`` eventos, anota el tamaño de la cola de eventos.
+
+Con ``cprofile=True`` el bucle corre además bajo :mod:`cProfile` y el
+resultado puede guardarse con :meth:`Perfil.guardar_pstats` para leerlo con
+``python -m pstats``. Las métricas de la simulación no cambian: el bucle
+procesa los mismos eventos en el mismo orden que ``env.run`` o
+``EstacionRapida.ejecutar``.
+
+En SimPy la corrida usa el entorno de :meth:`Perfil.entorno_simpy`, que
+lleva su propia copia ordenada de los eventos pendientes para saber cuál
+procesará ``step`` sin leer la cola interna del entorno, y anota el
+generador de cada proceso al registrarlo con ``env.process``. El origen de
+un evento es el proceso que reanuda; en el motor rápido cada función del
+calendario se agrupa con el proceso de SimPy que cumple su papel
+(:data:`ORIGENES_RAPIDO`), de modo que ambas tablas se pueden comparar.
+"""
+
+import cProfile
+import heapq
+import itertools
+import time
+import weakref
+from array import array
+
+# Función del calendario del motor rápido -> proceso equivalente de SimPy
+ORIGENES_RAPIDO = {
+    "EstacionRapida._revisar_cargador": "cargar_bateria",
+    "EstacionRapida._fin_carga": "cargar_bateria",
+    "EstacionRapida._salida_autobus": "llegada_autobuses",
+    "EstacionRapida._iniciar_autobus": "llegada_autobuses",
+    "EstacionRapida._con_bateria": "proceso_autobus",
+    "EstacionRapida._en_bahia": "proceso_autobus",
+    "EstacionRapida._fin_intercambio": "proceso_autobus",
+    "EstacionRapida._fin_ruta": "proceso_autobus",
+    "Sondas._muestreo_rapido": "sondas",
+}
+
+# Generador de SimPy -> origen
+ORIGENES_SIMPY = {
+    "EstacionIntercambio.cargar_bateria": "cargar_bateria",
+    "proceso_autobus": "proceso_autobus",
+    "llegada_autobuses": "llegada_autobuses",
+    "Sondas._proceso": "sondas",
+}
+
+# Origen de los eventos que no reanudan ningún proceso
+SIN_PROCESO = "(sin proceso)"
+
+
+def _origen_simpy(evento, origenes):
+    """Origen del proceso que reanuda ``evento`` según ``origenes``."""
+    for callback in evento.callbacks or ():
+        objeto = getattr(callback, "__self__", None)
+        if objeto is None:
+            continue
+        try:
+            origen = origenes.get(objeto)
+        except TypeError:
+            # Objetos sin referencias débiles: no son procesos
+            continue
+        if origen is not None:
+            return origen
+    return SIN_PROCESO
+
+
+_Entorno = None
+
+
+def _clase_entorno():
+    """Subclase de ``simpy.Environment`` usada por el perfil (se crea al usarla)."""
+    global _Entorno
+    if _Entorno is not None:
+        return _Entorno
+    import simpy
+
+    class EntornoPerfilado(simpy.Environment):
+        """Entorno que anota cada evento que programa.
+
+        ``pendientes`` es un montículo ``(hora, prioridad, orden, evento)``
+        con el mismo orden que la cola de SimPy; ``step`` retira su primer
+        elemento, que es el evento que procesa. ``origenes`` asocia cada
+        proceso creado con ``process`` al origen de su generador.
+        """
+
+        def __init__(self, *args, **kwargs):
+            self.pendientes = []
+            self.origenes = weakref.WeakKeyDictionary()
+            self._orden = itertools.count()
+            super().__init__(*args, **kwargs)
+
+        def process(self, generator):
+            proceso = super().process(generator)
+            nombre = generator.__qualname__
+            self.origenes[proceso] = ORIGENES_SIMPY.get(nombre, nombre)
+            return proceso
+
+        def schedule(self, event, priority=simpy.core.NORMAL, delay=0):
+            super().schedule(event, priority, delay)
+            heapq.heappush(
+                self.pendientes, (self.now + delay, priority, next(self._orden), event)
+            )
+
+        def step(self):
+            if self.pendientes:
+                heapq.heappop(self.pendientes)
+            super().step()
+
+    _Entorno = EntornoPerfilado
+    return _Entorno
+
+
+def _origen_rapido(funcion):
+    nombre = getattr(funcion, "__func__", funcion).__qualname__
+    return ORIGENES_RAPIDO.get(nombre, nombre)
+
+
+class Perfil:
+    """Contadores de eventos y tiempos por origen de una corrida."""
+
+    def __init__(self, cada_eventos=100, cprofile=False):
+        if cada_eventos < 1:
+            raise ValueError("cada_eventos debe ser al menos 1")
+        self.cada_eventos = cada_eventos
+        self.eventos = {}
+        self.tiempos = {}
+        # Tamaño de la cola de eventos muestreado durante la corrida
+        self.tiempos_cola = array("d")
+        self.tamanos_cola = array("l")
+        self.tiempo_total = 0.0
+        self.perfilador = cProfile.Profile() if cprofile else None
+
+    def _anotar(self, origen, duracion):
+        self.eventos[origen] = self.eventos.get(origen, 0) + 1
+        self.tiempos[origen] = self.tiempos.get(origen, 0.0) + duracion
+
+    def _medir(self, bucle, *args):
+        inicio = time.perf_counter()
+        if self.perfilador is None:
+            bucle(*args)
+        else:
+            self.perfilador.runcall(bucle, *args)
+        self.tiempo_total += time.perf_counter() - inicio
+
+    @staticmethod
+    def entorno_simpy():
+        """Entorno de SimPy para :meth:`ejecutar_simpy`."""
+        return _clase_entorno()()
+
+    def ejecutar_simpy(self, env, hasta):
+        """Equivalente instrumentado de ``env.run(until=hasta)``.
+
+        ``env`` debe haberse creado con :meth:`entorno_simpy`.
+        """
+        if not hasattr(env, "pendientes"):
+            raise TypeError("El entorno debe crearse con Perfil.entorno_simpy()")
+        self._medir(self._bucle_simpy, env, hasta)
+        if env.now < hasta:
+            # No quedan eventos antes de ``hasta``: sólo avanza el reloj
+            env.run(until=hasta)
+
+    def _bucle_simpy(self, env, hasta):
+        cola = env.pendientes
+        origenes = env.origenes
+        reloj = time.perf_counter
+        cada = self.cada_eventos
+        procesados = 0
+        while cola and cola[0][0] < hasta:
+            if procesados % cada == 0:
+                self.tiempos_cola.append(cola[0][0])
+                self.tamanos_cola.append(len(cola))
+            origen = _origen_simpy(cola[0][3], origenes)
+            inicio = reloj()
+            env.step()
+            self._anotar(origen, reloj() - inicio)
+            procesados += 1
+
+    def ejecutar_rapido(self, estacion, hasta):
+        """Equivalente instrumentado de ``EstacionRapida.ejecutar(hasta)``."""
+        self._medir(self._bucle_rapido, estacion, hasta)
+        estacion.now = hasta
+
+    def _bucle_rapido(self, estacion, hasta):
+        calendario = estacion._calendario
+        pop = heapq.heappop
+        reloj = time.perf_counter
+        cada = self.cada_eventos
+        procesados = 0
+        while calendario and calendario[0][0] < hasta:
+            if procesados % cada == 0:
+                self.tiempos_cola.append(calendario[0][0])
+                self.tamanos_cola.append(len(calendario))
+            estacion.now, _, funcion, args = pop(calendario)
+            origen = _origen_rapido(funcion)
+            inicio = reloj()
+            funcion(*args)
+            self._anotar(origen, reloj() - inicio)
+            procesados += 1
+        estacion.eventos_procesados += procesados
+
+    @property
+    def total_eventos(self):
+        return sum(self.eventos.values())
+
+    def serie_cola(self):
+        """Arreglos ``(tiempos, tamaños)`` de la cola de eventos."""
+        return self.tiempos_cola, self.tamanos_cola
+
+    def guardar_pstats(self, ruta):
+        """Escribe el perfil de :mod:`cProfile` en ``ruta``."""
+        if self.perfilador is None:
+            raise ValueError("El perfil se creó sin cprofile=True")
+        self.perfilador.dump_stats(ruta)
+
+
+def formatear_perfil(perfil):
+    """Devuelve una lista con la tabla de eventos y tiempos por origen."""
+    total_eventos = perfil.total_eventos or 1
+    total_tiempo = sum(perfil.tiempos.values()) or 1.0
+    ancho = max([len("Origen"), *map(len, perfil.tiempos)]) + 2
+    lines = [
+        f"{'Origen':<{ancho}}{'Eventos':>10}{'%':>7}{'Tiempo (ms)':>13}{'%':>7}"
+        f"{'µs/evento':>11}"
+    ]
+    for origen in sorted(perfil.tiempos, key=perfil.tiempos.get, reverse=True):
+        eventos = perfil.eventos[origen]
+        tiempo = perfil.tiempos[origen]
+        lines.append(
+            f"{origen:<{ancho}}{eventos:>10}{eventos / total_eventos:>7.1%}"
+            f"{tiempo * 1e3:>13.1f}{tiempo / total_tiempo:>7.1%}"
+            f"{tiempo / eventos * 1e6:>11.2f}"
+        )
+    lines.append(
+        f"{'Total':<{ancho}}{perfil.total_eventos:>10}{'':>7}"
+        f"{sum(perfil.tiempos.values()) * 1e3:>13.1f}"
+    )
+    lines.append(
+        f"Tiempo del bucle: {perfil.tiempo_total * 1e3:.1f} ms "
+        "(incluye la medición)"
+    )
+    if perfil.tamanos_cola:
+        tamanos = perfil.tamanos_cola
+        lines.append(
+            f"Cola de eventos: máximo {max(tamanos)}, "
+            f"media {sum(tamanos) / len(tamanos):.1f} "
+            f"({len(tamanos)} muestras)"
+        )
+    return lines
@@ -0,0 +1,403 @@
+"""Red de estaciones de intercambio con traslados de baterías.
+
+Una :class:`Red` agrupa varios :class:`Deposito`, cada uno con sus propios
+cargadores, inventario y tarifas (su :class:`parametros.RunConfig`) y las
+:class:`Ruta` que atiende; los autobuses de cada ruta recorren su distancia
+y cambian batería sólo en su depósito. Opcionalmente, camiones de
+:class:`Rebalanceo` llevan baterías cargadas de los depósitos con reserva de
+sobra a los que tienen menos de la que les corresponde.
+
+Los depósitos sólo se comunican en los puntos de rebalanceo, de modo que
+:func:`ejecutar_red` los reparte entre ``jobs`` procesos que los simulan por
+separado con el motor rápido y se sincronizan únicamente en esos instantes:
+cada proceso avanza sus estaciones hasta el siguiente punto, informa la
+reserva de cada una, despacha los traslados decididos y recibe los que
+llegan. Sin rebalanceo cada proceso corre de principio a fin sin esperar a
+los demás. El resultado no depende de ``jobs``.
+
+Ejemplo::
+
+    red = red_uniforme(depositos=10, autobuses=2000, rebalanceo=Rebalanceo())
+    resultado = ejecutar_red(red, jobs=4)
+    for line in formatear_red(resultado):
+        print(line)
+"""
+
+import copy
+import math
+import multiprocessing
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+import modelo
+from barrido import ResumenSimulacion
+from motor_rapido import EstacionRapida
+from parametros import RunConfig
+
+
+@dataclass(frozen=True)
+class Ruta:
+    """Corredor con ``autobuses`` que recorren ``distancia_km`` por vuelta."""
+
+    nombre: str
+    distancia_km: float
+    autobuses: int
+
+
+@dataclass(frozen=True)
+class Deposito:
+    """Estación de intercambio con su configuración y las rutas que atiende.
+
+    De ``config`` se usan la estación, la batería, la operación, las tarifas
+    y la semilla; la cantidad de autobuses sale de las rutas.
+    """
+
+    nombre: str
+    rutas: tuple
+    config: RunConfig
+
+    @property
+    def autobuses(self):
+        return sum(ruta.autobuses for ruta in self.rutas)
+
+
+@dataclass(frozen=True)
+class Rebalanceo:
+    """Camiones que reparten baterías cargadas entre depósitos.
+
+    Cada ``intervalo`` horas cada uno de los ``camiones`` hace a lo sumo un
+    viaje con hasta ``capacidad_camion`` baterías, que llegan a destino
+    ``tiempo_viaje`` horas después. Un depósito sólo envía o recibe si su
+    reserva se aparta de la que le corresponde en más de ``tolerancia``
+    (fracción de esa reserva), para no mover baterías de ida y vuelta por
+    fluctuaciones normales.
+    """
+
+    intervalo: float = 24.0
+    tiempo_viaje: float = 1.0
+    capacidad_camion: int = 10
+    camiones: int = 1
+    tolerancia: float = 0.2
+
+
+@dataclass(frozen=True)
+class Red:
+    """Depósitos de la red y, si los hay, sus camiones de rebalanceo."""
+
+    depositos: tuple
+    rebalanceo: Optional[Rebalanceo] = None
+
+
+def red_uniforme(
+    depositos=10,
+    autobuses=2000,
+    distancias=(37.2,),
+    rebalanceo=None,
+    config=None,
+):
+    """Red de ``depositos`` iguales que se reparten ``autobuses``.
+
+    Cada depósito atiende una ruta; sus distancias se toman en orden de
+    ``distancias``. Cargadores y baterías se escalan desde ``config`` (por
+    defecto los parámetros globales) en proporción a la flota de cada
+    depósito, y cada uno usa la semilla de ``config`` más su índice.
+    """
+    base = config or modelo.configuracion_actual(verbose=False)
+    flota_base = base.simulacion.max_autobuses
+    lista = []
+    for i in range(depositos):
+        flota = autobuses // depositos + (i < autobuses % depositos)
+        escala = flota / flota_base
+        estacion = copy.copy(base.estacion)
+        estacion.actualizar(
+            capacidad=math.ceil(base.estacion.capacidad_estacion * escala),
+            total=math.ceil(base.estacion.total_baterias * escala),
+            iniciales=math.ceil(base.estacion.baterias_iniciales * escala),
+        )
+        simulacion = copy.copy(base.simulacion)
+        simulacion.actualizar(semilla=base.simulacion.semilla + i)
+        ruta = Ruta(f"R{i + 1}", distancias[i % len(distancias)], flota)
+        lista.append(
+            Deposito(
+                f"D{i + 1}",
+                (ruta,),
+                base.con(estacion=estacion, simulacion=simulacion, verbose=False),
+            )
+        )
+    return Red(tuple(lista), rebalanceo)
+
+
+def planificar_traslados(estados, rebalanceo):
+    """Traslados ``(origen, destino, cantidad)`` para un punto de rebalanceo.
+
+    ``estados`` tiene, por depósito, su reserva de baterías cargadas y sus
+    autobuses. A cada depósito le corresponde una parte de la reserva total
+    proporcional a su flota; cada camión lleva baterías del depósito con
+    más sobrante al que tiene mayor faltante.
+    """
+    total_reserva = sum(e["reserva"] for e in estados)
+    total_autobuses = sum(e["autobuses"] for e in estados) or 1
+    sobrante = []
+    margen = []
+    for estado in estados:
+        objetivo = total_reserva * estado["autobuses"] / total_autobuses
+        sobrante.append(estado["reserva"] - objetivo)
+        margen.append(rebalanceo.tolerancia * objetivo)
+    indices = range(len(estados))
+    traslados = []
+    for _ in range(rebalanceo.camiones):
+        origen = max(indices, key=lambda i: (sobrante[i] - margen[i], -i))
+        destino = min(indices, key=lambda i: (sobrante[i] + margen[i], i))
+        cantidad = min(
+            math.floor(sobrante[origen] - margen[origen]),
+            math.floor(-sobrante[destino] - margen[destino]),
+            rebalanceo.capacidad_camion,
+        )
+        if cantidad < 1:
+            break
+        sobrante[origen] -= cantidad
+        sobrante[destino] += cantidad
+        traslados.append((origen, destino, cantidad))
+    return traslados
+
+
+class _Particion:
+    """Estaciones de los depósitos asignados a un mismo proceso."""
+
+    def __init__(self, depositos):
+        self.estaciones = {}
+        for indice, deposito in depositos:
+            simulacion = copy.copy(deposito.config.simulacion)
+            simulacion.actualizar(max_autobuses=deposito.autobuses)
+            config = deposito.config.con(simulacion=simulacion, verbose=False)
+            rutas = [(ruta.distancia_km, ruta.autobuses) for ruta in deposito.rutas]
+            self.estaciones[indice] = (
+                deposito.nombre,
+                EstacionRapida(
+                    deposito.autobuses, rutas[0][0], config, rutas=rutas
+                ),
+            )
+
+    def avanzar(self, hasta, llegadas):
+        """Recibe ``llegadas`` y simula cada estación hasta ``hasta``."""
+        for indice, socs, hora in llegadas:
+            self.estaciones[indice][1].recibir_baterias(socs, hora)
+        estados = {}
+        for indice, (_, estacion) in self.estaciones.items():
+            estacion.ejecutar(hasta)
+            estados[indice] = {
+                "reserva": len(estacion.registro.reserva),
+                "autobuses": estacion.max_autobuses,
+            }
+        return estados
+
+    def enviar(self, envios):
+        """Saca las baterías de cada ``(indice, cantidad)`` y devuelve sus SoC."""
+        return [
+            (indice, self.estaciones[indice][1].enviar_baterias(cantidad))
+            for indice, cantidad in envios
+        ]
+
+    def resultados(self):
+        resumenes = {}
+        for indice, (nombre, estacion) in self.estaciones.items():
+            resumen = ResumenSimulacion(estacion, {"deposito": nombre})
+            resumen.baterias_enviadas = estacion.baterias_enviadas
+            resumen.baterias_recibidas = estacion.baterias_recibidas
+            resumenes[indice] = resumen
+        return resumenes
+
+
+def _trabajador(conexion, depositos):
+    """Bucle de un proceso de la red: atiende las órdenes del coordinador."""
+    try:
+        particion = _Particion(depositos)
+        conexion.send(None)
+        while True:
+            orden = conexion.recv()
+            if orden is None:
+                break
+            metodo, argumentos = orden
+            conexion.send(getattr(particion, metodo)(*argumentos))
+    except Exception as error:  # El coordinador vuelve a lanzarlo
+        conexion.send(error)
+    finally:
+        conexion.close()
+
+
+class _ParticionRemota:
+    """Partición en otro proceso; ``pedir`` y ``respuesta`` van por separado
+    para que todos los procesos trabajen a la vez."""
+
+    def __init__(self, depositos):
+        self.conexion, otra = multiprocessing.Pipe()
+        self.proceso = multiprocessing.Process(
+            target=_trabajador, args=(otra, depositos), daemon=True
+        )
+        self.proceso.start()
+        otra.close()
+        self.respuesta()
+
+    def pedir(self, metodo, *argumentos):
+        self.conexion.send((metodo, argumentos))
+
+    def respuesta(self):
+        respuesta = self.conexion.recv()
+        if isinstance(respuesta, Exception):
+            raise respuesta
+        return respuesta
+
+    def cerrar(self):
+        try:
+            self.conexion.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.proceso.join()
+        self.conexion.close()
+
+
+class _ParticionLocal:
+    """Misma interfaz que :class:`_ParticionRemota` en el proceso actual."""
+
+    def __init__(self, depositos):
+        self.particion = _Particion(depositos)
+        self._respuesta = None
+
+    def pedir(self, metodo, *argumentos):
+        self._respuesta = getattr(self.particion, metodo)(*argumentos)
+
+    def respuesta(self):
+        return self._respuesta
+
+    def cerrar(self):
+        pass
+
+
+def particionar(depositos, jobs):
+    """Reparte los índices de ``depositos`` en ``jobs`` grupos de flota similar."""
+    grupos = [[] for _ in range(min(jobs, len(depositos)))]
+    cargas = [0] * len(grupos)
+    orden = sorted(range(len(depositos)), key=lambda i: -depositos[i].autobuses)
+    for indice in orden:
+        grupo = cargas.index(min(cargas))
+        grupos[grupo].append(indice)
+        cargas[grupo] += depositos[indice].autobuses
+    return [sorted(grupo) for grupo in grupos if grupo]
+
+
+class ResultadoRed:
+    """Resúmenes de cada depósito y traslados realizados."""
+
+    def __init__(self, duracion, resumenes, traslados):
+        self.duracion = duracion
+        self.depositos = resumenes
+        # Lista de ``(hora, origen, destino, cantidad)``
+        self.traslados = traslados
+
+    def total(self, metrica):
+        """Suma de ``metrica`` sobre todos los depósitos."""
+        return sum(getattr(r, metrica) for r in self.depositos.values())
+
+
+def ejecutar_red(red, duracion=None, jobs=None):
+    """Simula la red y devuelve un :class:`ResultadoRed`.
+
+    ``duracion`` (horas) es por defecto la del primer depósito. ``jobs`` es
+    la cantidad de procesos; por defecto uno por núcleo, sin superar la
+    cantidad de depósitos.
+    """
+    depositos = red.depositos
+    if not depositos:
+        raise ValueError("La red necesita al menos un depósito")
+    if duracion is None:
+        duracion = depositos[0].config.simulacion.duracion
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    grupos = particionar(depositos, jobs)
+    tipo = _ParticionLocal if len(grupos) == 1 else _ParticionRemota
+    particiones = []
+    traslados = []
+    try:
+        for grupo in grupos:
+            particiones.append(tipo([(i, depositos[i]) for i in grupo]))
+        particion_de = {i: p for p, grupo in zip(particiones, grupos) for i in grupo}
+
+        puntos = []
+        rebalanceo = red.rebalanceo
+        if rebalanceo is not None:
+            if rebalanceo.intervalo <= 0:
+                raise ValueError("El intervalo de rebalanceo debe ser positivo")
+            puntos = [
+                k * rebalanceo.intervalo
+                for k in range(1, math.ceil(duracion / rebalanceo.intervalo))
+            ]
+        puntos.append(duracion)
+
+        llegadas = {}
+        for hasta in puntos:
+            estados = {}
+            for particion in particiones:
+                particion.pedir("avanzar", hasta, llegadas.pop(particion, []))
+            for particion in particiones:
+                estados.update(particion.respuesta())
+            if hasta >= duracion:
+                break
+
+            plan = planificar_traslados(
+                [estados[i] for i in range(len(depositos))], rebalanceo
+            )
+            envios = {}
+            for origen, _, cantidad in plan:
+                envios.setdefault(particion_de[origen], []).append((origen, cantidad))
+            for particion, lista in envios.items():
+                particion.pedir("enviar", lista)
+            socs_por_origen = {}
+            for particion in envios:
+                for origen, socs in particion.respuesta():
+                    socs_por_origen.setdefault(origen, []).append(socs)
+            llegada = hasta + rebalanceo.tiempo_viaje
+            for origen, destino, _ in plan:
+                socs = socs_por_origen[origen].pop(0)
+                if socs:
+                    llegadas.setdefault(particion_de[destino], []).append(
+                        (destino, socs, llegada)
+                    )
+                    traslados.append(
+                        (hasta, depositos[origen].nombre, depositos[destino].nombre,
+                         len(socs))
+                    )
+
+        resumenes = {}
+        for particion in particiones:
+            particion.pedir("resultados")
+        for particion in particiones:
+            resumenes.update(particion.respuesta())
+    finally:
+        for particion in particiones:
+            particion.cerrar()
+    return ResultadoRed(
+        duracion,
+        {depositos[i].nombre: resumenes[i] for i in range(len(depositos))},
+        traslados,
+    )
+
+
+def formatear_red(resultado):
+    """Devuelve una lista con los textos de los resultados de la red."""
+    lines = [f"Resultados de la red para {resultado.duracion / 24:.1f} días"]
+    for nombre, resumen in resultado.depositos.items():
+        lines.append(
+            f"{nombre}: {resumen.intercambios_realizados} intercambios, "
+            f"espera {resumen.tiempo_espera_total:.1f} h, "
+            f"S/. {resumen.costo_total_electrico:.2f}, "
+            f"baterías enviadas/recibidas {resumen.baterias_enviadas}/"
+            f"{resumen.baterias_recibidas}"
+        )
+    lines.append(
+        f"Total: {resultado.total('intercambios_realizados')} intercambios, "
+        f"S/. {resultado.total('costo_total_electrico'):.2f}, "
+        f"{sum(t[3] for t in resultado.traslados)} baterías trasladadas "
+        f"en {len(resultado.traslados)} viajes"
+    )
+    return lines
@@ -0,0 +1,78 @@
+"""Registro de baterías con identificadores estables.
+
+Cada batería de la estación se identifica con un entero entre ``0`` y
+``total - 1``. Su estado de carga, ubicación, hora de ingreso a esa
+ubicación (reserva, cola de carga o cargador) y número de ciclos se guardan
+en arreglos compactos preasignados, mientras que las colas de baterías
+cargadas y descargadas son ``deque`` de identificadores para que tomar la
+primera batería no dependa del tamaño del inventario.
+"""
+
+from array import array
+from collections import deque
+
+# Ubicación de cada batería
+EN_RESERVA = 0
+DESCARGADA = 1
+EN_CARGA = 2
+EN_AUTOBUS = 3
+# Enviada a otra estación (ver ``red.py``)
+TRASLADADA = 4
+
+
+class RegistroBaterias:
+    """Estado de todas las baterías de la estación."""
+
+    def __init__(self, total, iniciales, soc_inicial=100, soc_descargada=30):
+        self.total = total
+        self.soc = array("d", [0.0]) * total
+        self.estado = array("b", [EN_AUTOBUS]) * total
+        self.ingreso = array("d", [0.0]) * total
+        self.ciclos = array("l", [0]) * total
+        # Colas FIFO de identificadores
+        self.reserva = deque()
+        self.descargadas = deque()
+        # Identificadores de las baterías :data:`EN_CARGA`, para recorrer
+        # sólo esas sin mirar todo el inventario
+        self.cargando = set()
+
+        iniciales = min(iniciales, total)
+        for bateria in range(total):
+            if bateria < iniciales:
+                self.soc[bateria] = soc_inicial
+                self.estado[bateria] = EN_RESERVA
+                self.reserva.append(bateria)
+            else:
+                self.soc[bateria] = soc_descargada
+                self.estado[bateria] = DESCARGADA
+                self.descargadas.append(bateria)
+
+    def agregar_cargadas(self, cantidad, soc=100):
+        """Suma ``cantidad`` baterías cargadas al final de la reserva.
+
+        Devuelve el rango de identificadores nuevos.
+        """
+        nuevas = range(self.total, self.total + cantidad)
+        self.soc.extend([soc] * cantidad)
+        self.estado.extend([EN_RESERVA] * cantidad)
+        self.ingreso.extend([0.0] * cantidad)
+        self.ciclos.extend([0] * cantidad)
+        self.total += cantidad
+        self.reserva.extend(nuevas)
+        return nuevas
+
+    def trasladar(self, cantidad):
+        """Saca de la reserva las ``cantidad`` baterías cargadas más recientes.
+
+        Quedan marcadas como :data:`TRASLADADA`; devuelve la lista de sus SoC.
+        """
+        socs = []
+        for _ in range(min(cantidad, len(self.reserva))):
+            bateria = self.reserva.pop()
+            self.estado[bateria] = TRASLADADA
+            socs.append(self.soc[bateria])
+        return socs
+
+    def contar(self, estado):
+        """Cantidad de baterías en el estado indicado."""
+        return self.estado.count(estado)
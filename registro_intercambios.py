@@ -0,0 +1,131 @@
+"""Registro columnar de los intercambios de batería.
+
+Cada intercambio se guarda como una fila numérica repartida en arreglos
+``array`` (hora de término, autobús, SoC de la batería entregada, energía a
+reponer y franja tarifaria), sin construir textos. Al agregar cada fila se
+actualizan los totales por día, por hora del día y por franja tarifaria, de
+modo que los gráficos los leen directamente sin recorrer el registro.
+
+Las filas sólo se conservan con ``guardar_filas=True``; si no, el registro
+guarda únicamente los agregados y su memoria crece con los días simulados,
+no con la cantidad de intercambios.
+"""
+
+from array import array
+
+# Franjas tarifarias
+TARIFA_NORMAL = 0
+TARIFA_PUNTA = 1
+
+COLUMNAS = ("tiempo", "autobus", "soc_entrada", "energia", "tarifa")
+
+
+class RegistroIntercambios:
+    """Historial de intercambios con agregados incrementales.
+
+    ``horas_punta`` es el par ``(inicio, fin)`` de la hora punta eléctrica;
+    la franja de cada intercambio se decide con la hora en que termina.
+    Con ``guardar_filas=False`` las columnas de :data:`COLUMNAS` son
+    ``None`` y sólo se mantienen los agregados.
+    """
+
+    def __init__(self, horas_punta, guardar_filas=True):
+        self.horas_punta = tuple(horas_punta)
+        self.total = 0
+        if guardar_filas:
+            self.tiempo = array("d")
+            self.autobus = array("l")
+            self.soc_entrada = array("d")
+            self.energia = array("d")
+            self.tarifa = array("b")
+        else:
+            self.tiempo = self.autobus = self.soc_entrada = None
+            self.energia = self.tarifa = None
+
+        # Agregados por día (crecen según haga falta)
+        self.intercambios_dia = array("l")
+        self.energia_dia = array("d")
+        # Energía de cada día separada por franja: ``energia_dia_tarifa[f][d]``
+        self.energia_dia_tarifa = (array("d"), array("d"))
+        # Agregados por hora del día
+        self.intercambios_hora = array("l", [0]) * 24
+        self.energia_hora = array("d", [0.0]) * 24
+        # Energía total por franja
+        self.energia_tarifa = array("d", [0.0, 0.0])
+
+    def __len__(self):
+        return self.total
+
+    @property
+    def guarda_filas(self):
+        return self.tiempo is not None
+
+    def __eq__(self, otro):
+        if not isinstance(otro, RegistroIntercambios):
+            return NotImplemented
+        if self.guarda_filas and otro.guarda_filas:
+            return all(getattr(self, c) == getattr(otro, c) for c in COLUMNAS)
+        return all(
+            getattr(self, a) == getattr(otro, a)
+            for a in (
+                "total",
+                "intercambios_dia",
+                "energia_dia",
+                "energia_dia_tarifa",
+                "intercambios_hora",
+                "energia_hora",
+                "energia_tarifa",
+            )
+        )
+
+    __hash__ = None
+
+    def agregar(self, tiempo, autobus, soc_entrada, energia):
+        """Registra un intercambio que termina en ``tiempo``."""
+        hora = int(tiempo % 24)
+        dia = int(tiempo // 24)
+        inicio_punta, fin_punta = self.horas_punta
+        tarifa = TARIFA_PUNTA if inicio_punta <= hora < fin_punta else TARIFA_NORMAL
+        self.total += 1
+        if self.tiempo is not None:
+            self.tiempo.append(tiempo)
+            self.autobus.append(autobus)
+            self.soc_entrada.append(soc_entrada)
+            self.energia.append(energia)
+            self.tarifa.append(tarifa)
+
+        intercambios_dia = self.intercambios_dia
+        if dia >= len(intercambios_dia):
+            faltan = dia + 1 - len(intercambios_dia)
+            intercambios_dia.extend([0] * faltan)
+            self.energia_dia.extend([0.0] * faltan)
+            for columna in self.energia_dia_tarifa:
+                columna.extend([0.0] * faltan)
+        intercambios_dia[dia] += 1
+        self.energia_dia[dia] += energia
+        self.energia_dia_tarifa[tarifa][dia] += energia
+        self.intercambios_hora[hora] += 1
+        self.energia_hora[hora] += energia
+        self.energia_tarifa[tarifa] += energia
+
+    def serie_diaria(self, columna, dias):
+        """Primeros ``dias`` valores de un agregado diario, con ceros al final."""
+        valores = list(columna[:dias])
+        return valores + [0] * (dias - len(valores))
+
+    def costo_diario(self, dias, costo_normal, costo_punta):
+        """Costo de la energía repuesta cada día según su franja tarifaria."""
+        normal = self.serie_diaria(self.energia_dia_tarifa[TARIFA_NORMAL], dias)
+        punta = self.serie_diaria(self.energia_dia_tarifa[TARIFA_PUNTA], dias)
+        return [n * costo_normal + p * costo_punta for n, p in zip(normal, punta)]
+
+    def como_numpy(self):
+        """Copia de las columnas como arreglos NumPy."""
+        if not self.guarda_filas:
+            raise ValueError("El registro se creó sin guardar_filas=True")
+        import numpy as np
+
+        return {
+            c: np.frombuffer(getattr(self, c), dtype=getattr(self, c).typecode).copy()
+            for c in COLUMNAS
+        }
@@ -0,0 +1,203 @@
+"""Réplicas independientes con intervalos de confianza.
+
+Una sola corrida de ``modelo.ejecutar_simulacion`` es una muestra con
+varianza desconocida. :func:`ejecutar_replicas` simula la misma
+configuración con semillas consecutivas, repartidas entre procesos mediante
+:func:`barrido.ejecutar_barrido`, e informa la media y el intervalo de
+confianza t de Student de cada métrica. Con ``precision`` se detiene en
+cuanto todos los semianchos relativos quedan por debajo de ese valor.
+"""
+
+import math
+import os
+from dataclasses import dataclass
+from statistics import NormalDist
+
+import modelo
+from barrido import ejecutar_barrido
+from estadisticas import EstadisticaEnLinea
+
+
+def _ahorro_co2(resumen, config):
+    economicos = config.economicos
+    return (
+        resumen.energia_total_gas * economicos.factor_co2_gas
+        - resumen.energia_total_cargada * economicos.factor_co2_elec
+    )
+
+
+# Métricas por réplica: nombre -> (descripción, unidad, función)
+METRICAS = {
+    "costo_total_electrico": (
+        "Costo total de operación (eléctrico)",
+        "S/.",
+        lambda resumen, config: resumen.costo_total_electrico,
+    ),
+    "tiempo_espera_total": (
+        "Tiempo total de espera",
+        "h",
+        lambda resumen, config: resumen.tiempo_espera_total,
+    ),
+    "energia_punta_electrica": (
+        "Energía en hora punta de electricidad",
+        "kWh",
+        lambda resumen, config: resumen.energia_punta_electrica,
+    ),
+    "ahorro_co2": ("Ahorro de CO2", "kg", _ahorro_co2),
+}
+
+
+def cuantil_t(p, grados):
+    """Cuantil ``p`` de la t de Student con ``grados`` grados de libertad.
+
+    Exacto para uno y dos grados; desde tres se usa la expansión de
+    Cornish-Fisher, con error relativo menor a 1 % para ``p <= 0.995``.
+    """
+    if grados < 1:
+        raise ValueError("Se necesita al menos un grado de libertad")
+    if grados == 1:
+        return math.tan(math.pi * (p - 0.5))
+    if grados == 2:
+        return (2 * p - 1) / math.sqrt(2 * p * (1 - p))
+    z = NormalDist().inv_cdf(p)
+    v = grados
+    return (
+        z
+        + (z**3 + z) / (4 * v)
+        + (5 * z**5 + 16 * z**3 + 3 * z) / (96 * v**2)
+        + (3 * z**7 + 19 * z**5 + 17 * z**3 - 15 * z) / (384 * v**3)
+        + (79 * z**9 + 776 * z**7 + 1482 * z**5 - 1920 * z**3 - 945 * z)
+        / (92160 * v**4)
+    )
+
+
+@dataclass(frozen=True)
+class IntervaloConfianza:
+    """Media de ``n`` réplicas con el semiancho de su intervalo."""
+
+    media: float
+    semiancho: float
+    n: int
+
+    @property
+    def relativo(self):
+        """Semiancho relativo a la media (``inf`` si la media es cero)."""
+        if self.semiancho == 0:
+            return 0.0
+        if self.media == 0:
+            return math.inf
+        return self.semiancho / abs(self.media)
+
+
+def intervalo(estadistica, confianza=0.95):
+    """:class:`IntervaloConfianza` de una :class:`EstadisticaEnLinea`."""
+    n = estadistica.n
+    if n < 2:
+        return IntervaloConfianza(estadistica.media, math.inf, n)
+    t = cuantil_t((1 + confianza) / 2, n - 1)
+    return IntervaloConfianza(
+        estadistica.media, t * estadistica.desviacion / math.sqrt(n), n
+    )
+
+
+class ResultadoReplicas:
+    """Réplicas simuladas y los intervalos de cada métrica."""
+
+    def __init__(self, config, confianza, precision):
+        self.config = config
+        self.confianza = confianza
+        self.precision = precision
+        self.replicas = []
+        self._estadisticas = {nombre: EstadisticaEnLinea() for nombre in METRICAS}
+
+    def agregar(self, resumen):
+        self.replicas.append(resumen)
+        for nombre, (_, _, valor) in METRICAS.items():
+            self._estadisticas[nombre].agregar(valor(resumen, self.config))
+
+    @property
+    def intervalos(self):
+        return {
+            nombre: intervalo(estadistica, self.confianza)
+            for nombre, estadistica in self._estadisticas.items()
+        }
+
+    @property
+    def convergio(self):
+        """``True`` si todas las métricas alcanzaron la precisión pedida."""
+        if self.precision is None:
+            return False
+        return all(i.relativo <= self.precision for i in self.intervalos.values())
+
+
+def ejecutar_replicas(
+    replicas=10,
+    precision=None,
+    confianza=0.95,
+    minimo_replicas=5,
+    jobs=None,
+    duracion=None,
+    tiempo_ruta=37.2,
+    engine="simpy",
+    config=None,
+):
+    """Simula réplicas independientes y devuelve un :class:`ResultadoReplicas`.
+
+    La réplica ``i`` usa la semilla ``config.simulacion.semilla + i``.
+    ``replicas`` es la cantidad máxima; con ``precision`` (semiancho relativo,
+    p. ej. ``0.01`` para ±1 %) las réplicas se lanzan en tandas de ``jobs``
+    y se detiene apenas, con al menos ``minimo_replicas``, todos los
+    intervalos son lo bastante angostos.
+    """
+    config = config or modelo.configuracion_actual(verbose=False)
+    if replicas < 1:
+        raise ValueError("Se necesita al menos una réplica")
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    semilla = config.simulacion.semilla
+    resultado = ResultadoReplicas(config, confianza, precision)
+
+    while len(resultado.replicas) < replicas:
+        hechas = len(resultado.replicas)
+        if precision is None:
+            tanda = replicas - hechas
+        else:
+            tanda = max(jobs, minimo_replicas - hechas)
+        tanda = min(tanda, replicas - hechas)
+        puntos = [{"semilla": semilla + i} for i in range(hechas, hechas + tanda)]
+        for resumen in ejecutar_barrido(
+            puntos,
+            jobs=jobs,
+            duracion=duracion,
+            tiempo_ruta=tiempo_ruta,
+            engine=engine,
+            config=config,
+        ):
+            resultado.agregar(resumen)
+        if len(resultado.replicas) >= minimo_replicas and resultado.convergio:
+            break
+    return resultado
+
+
+def formatear_replicas(resultado):
+    """Devuelve una lista con los textos de las medias e intervalos."""
+    n = len(resultado.replicas)
+    lines = [
+        f"Resultados de {n} réplicas "
+        f"(intervalos de confianza al {resultado.confianza:.0%})"
+    ]
+    for nombre, ic in resultado.intervalos.items():
+        descripcion, unidad, _ = METRICAS[nombre]
+        lines.append(
+            f"{descripcion}: {ic.media:.2f} ± {ic.semiancho:.2f} {unidad} "
+            f"(±{ic.relativo:.2%})"
+        )
+    if resultado.precision is not None:
+        if resultado.convergio:
+            lines.append(f"Precisión de ±{resultado.precision:.2%} alcanzada.")
+        else:
+            lines.append(
+                f"No se alcanzó la precisión de ±{resultado.precision:.2%} "
+                f"con {n} réplicas."
+            )
+    return lines
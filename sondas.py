@@ -0,0 +1,171 @@
+"""Series de tiempo muestreadas durante la simulación.
+
+Una :class:`Sondas` agrupa medidores con nombre que se leen a intervalos
+regulares mientras corre ``modelo.ejecutar_simulacion(..., sondas=...)``,
+con cualquiera de los dos motores. Cada medidor es una función
+``medidor(estacion, ahora)``; los de :data:`MEDIDORES` cubren el inventario,
+los cargadores, la cola y la potencia de la estación. Las muestras se
+escriben en arreglos NumPy preasignados según el horizonte de la corrida, de
+modo que muestrear no crea listas ni objetos por paso.
+
+Si en el instante de una muestra ocurren otros eventos (por ejemplo, los
+cargadores que reanudan al terminar la hora punta), la muestra puede reflejar
+el estado anterior o posterior a ellos según el motor.
+
+Ejemplo::
+
+    sondas = Sondas()
+    sondas.agregar("reserva")
+    sondas.agregar("potencia_kw", intervalo=1 / 60)
+    modelo.ejecutar_simulacion(config=config, sondas=sondas)
+    horas, potencia = sondas.serie("potencia_kw")
+"""
+
+import math
+
+
+def potencia_estacion(estacion, ahora):
+    """Potencia total en kW de las baterías que se están cargando.
+
+    Recorre sólo el conjunto ``registro.cargando``, en orden de identificador
+    para que la suma no dependa del orden del conjunto.
+    """
+    if not estacion.baterias_cargando:
+        return 0.0
+    bateria = estacion.config.bateria
+    registro = estacion.registro
+    total = 0.0
+    for indice in sorted(registro.cargando):
+        soc = bateria.soc_tras_carga(
+            registro.soc[indice], ahora - registro.ingreso[indice]
+        )
+        total += bateria.potencia_carga(soc)
+    return total
+
+
+MEDIDORES = {
+    # Baterías cargadas disponibles para los autobuses
+    "reserva": lambda estacion, ahora: len(estacion.baterias_reserva.items),
+    # Baterías descargadas esperando un cargador
+    "descargadas": lambda estacion, ahora: len(estacion.baterias_descargadas.items),
+    # Cargadores ocupados
+    "cargadores_ocupados": lambda estacion, ahora: estacion.baterias_cargando,
+    # Autobuses esperando batería o punto de intercambio
+    "cola": lambda estacion, ahora: estacion.autobuses_en_cola(),
+    # Horas de espera acumuladas de los autobuses
+    "espera_acumulada": lambda estacion, ahora: estacion.tiempo_espera_total,
+    # Potencia demandada por los cargadores (kW)
+    "potencia_kw": potencia_estacion,
+}
+
+
+class _Grupo:
+    """Medidores que comparten intervalo y sus búferes."""
+
+    def __init__(self, intervalo):
+        self.intervalo = intervalo
+        self.nombres = []
+        self.medidores = []
+        self.tiempos = None
+        self.valores = []
+        self.cuenta = 0
+
+    def preparar(self, horizonte):
+        import numpy as np
+
+        # Una muestra en 0 y otra por cada intervalo completo del horizonte
+        capacidad = math.floor(horizonte / self.intervalo + 1e-9) + 1
+        self.tiempos = np.full(capacidad, np.nan)
+        self.valores = [np.full(capacidad, np.nan) for _ in self.nombres]
+        self.cuenta = 0
+
+    @property
+    def capacidad(self):
+        return len(self.tiempos)
+
+    def muestrear(self, estacion, ahora):
+        k = self.cuenta
+        self.tiempos[k] = ahora
+        for valores, medidor in zip(self.valores, self.medidores):
+            valores[k] = medidor(estacion, ahora)
+        self.cuenta = k + 1
+
+
+class Sondas:
+    """Conjunto de series de tiempo de una corrida."""
+
+    def __init__(self):
+        self._grupos = {}
+        self._ubicacion = {}
+
+    def agregar(self, nombre, medidor=None, intervalo=1.0):
+        """Registra la serie ``nombre`` muestreada cada ``intervalo`` horas.
+
+        Sin ``medidor`` se usa el de :data:`MEDIDORES` con ese nombre.
+        """
+        if nombre in self._ubicacion:
+            raise ValueError(f"La sonda {nombre!r} ya existe")
+        if medidor is None:
+            try:
+                medidor = MEDIDORES[nombre]
+            except KeyError:
+                raise ValueError(f"Medidor desconocido: {nombre!r}") from None
+        if intervalo <= 0:
+            raise ValueError("El intervalo debe ser positivo")
+        grupo = self._grupos.setdefault(intervalo, _Grupo(intervalo))
+        self._ubicacion[nombre] = (grupo, len(grupo.nombres))
+        grupo.nombres.append(nombre)
+        grupo.medidores.append(medidor)
+        return self
+
+    @property
+    def nombres(self):
+        return list(self._ubicacion)
+
+    def instalar(self, estacion, horizonte):
+        """Prepara los búferes y programa el muestreo en ``estacion``.
+
+        Lo llama ``modelo.ejecutar_simulacion``; ``estacion`` puede ser una
+        ``EstacionIntercambio`` de SimPy o una ``EstacionRapida``.
+        """
+        for grupo in self._grupos.values():
+            grupo.preparar(horizonte)
+            if hasattr(estacion, "env"):
+                estacion.env.process(self._proceso(grupo, estacion))
+            else:
+                estacion.programar_en(0.0, self._muestreo_rapido, grupo, estacion)
+
+    @staticmethod
+    def _proceso(grupo, estacion):
+        env = estacion.env
+        for k in range(grupo.capacidad):
+            retraso = k * grupo.intervalo - env.now
+            if retraso > 0:
+                yield env.timeout(retraso)
+            grupo.muestrear(estacion, env.now)
+
+    @classmethod
+    def _muestreo_rapido(cls, grupo, estacion):
+        grupo.muestrear(estacion, estacion.now)
+        if grupo.cuenta < grupo.capacidad:
+            estacion.programar_en(
+                grupo.cuenta * grupo.intervalo, cls._muestreo_rapido, grupo, estacion
+            )
+
+    def serie(self, nombre):
+        """Arreglos ``(tiempos, valores)`` con las muestras tomadas."""
+        grupo, indice = self._ubicacion[nombre]
+        if grupo.tiempos is None:
+            raise ValueError("Las sondas todavía no se usaron en una simulación")
+        n = grupo.cuenta
+        return grupo.tiempos[:n], grupo.valores[indice][:n]
+
+    def __getitem__(self, nombre):
+        return self.serie(nombre)[1]
+
+    def como_dict(self):
+        """Diccionario ``nombre -> (tiempos, valores)`` con copias de las series."""
+        return {
+            nombre: tuple(arreglo.copy() for arreglo in self.serie(nombre))
+            for nombre in self._ubicacion
+        }
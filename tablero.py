@@ -0,0 +1,369 @@
+"""Panel de gráficos sobre una figura persistente que se actualiza por partes.
+
+:class:`Tablero` dibuja todas las vistas de :data:`VISTAS` en una sola
+:class:`matplotlib.figure.Figure`, que se crea una vez junto con su lienzo.
+Cada vista crea sus líneas o barras la primera vez que se muestra. Después
+sólo se actualizan con ``set_data``, ``set_height`` o ``set_color`` y, al
+cambiar de vista,
+se ocultan unas y se muestran otras, así que ni la figura ni sus artistas se
+vuelven a crear y la memoria no crece con los redibujos.
+
+La vista :data:`EN_CURSO` sigue una corrida mientras avanza. Cada llamada a
+:meth:`Tablero.agregar` recibe las métricas parciales de
+:mod:`avance`. Sus líneas son animadas: cuando el lienzo admite blitting se
+restaura el fondo guardado en el último dibujo completo y sólo se redibujan
+esas líneas. Si los datos superan el límite vertical, el límite se duplica y
+se redibuja todo una vez.
+
+La figura no usa pyplot, de modo que no abre ventanas: la interfaz la
+inserta con ``FigureCanvasQTAgg`` y las pruebas con ``FigureCanvasAgg``.
+"""
+
+import numpy as np
+from matplotlib import ticker
+
+import avance
+
+EN_CURSO = "en_curso"
+
+
+class Vista:
+    """Descripción de una vista del tablero.
+
+    ``lineas`` son tuplas ``(clave_x, clave_y, etiqueta, marcador, eje)``
+    con claves del diccionario de datos; con ``clave_x=None`` los puntos se
+    numeran y con ``eje=1`` se usa el eje vertical derecho. ``barras`` son
+    pares ``(clave, etiqueta)`` de valores escalares. ``serie_barras`` es un
+    par ``(clave, clave_marca)``: una barra por cada valor de la lista
+    ``clave``, con el segundo color donde ``clave_marca`` es verdadero.
+
+    ``grafico`` es el nombre en ``GraficosModelo.GRAFICOS`` cuyos datos
+    muestra la vista, si no coincide con el de la vista.
+    """
+
+    def __init__(
+        self,
+        titulo,
+        etiqueta_x="",
+        etiqueta_y="",
+        lineas=(),
+        barras=(),
+        serie_barras=None,
+        etiqueta_y2=None,
+        escalones=False,
+        animada=False,
+        grafico=None,
+    ):
+        self.titulo = titulo
+        self.etiqueta_x = etiqueta_x
+        self.etiqueta_y = etiqueta_y
+        self.lineas = lineas
+        self.barras = barras
+        self.serie_barras = serie_barras
+        self.etiqueta_y2 = etiqueta_y2
+        self.escalones = escalones
+        self.animada = animada
+        self.grafico = grafico
+
+
+# Vistas con las claves de ``GraficosModelo.GRAFICOS`` y la de la corrida en curso
+VISTAS = {
+    "carga": Vista(
+        "Curva de carga de la batería",
+        "Estado de carga (%)",
+        "Potencia de carga (kW)",
+        lineas=(("soc", "potencia", "", "o", 0),),
+    ),
+    "costos": Vista(
+        "Comparación de costos de operación",
+        "Número de autobuses",
+        "Costo mensual (S/.)",
+        lineas=(
+            ("autobuses", "costo_electrico", "Electricidad", "o", 0),
+            ("autobuses", "costo_gas", "Gas natural", "s", 0),
+        ),
+    ),
+    "costos_hora": Vista(
+        "Costo promedio por hora de operación",
+        etiqueta_y="Costo (S/./h)",
+        barras=(
+            ("costo_hora_electrico", "Electricidad/hora"),
+            ("costo_hora_gas", "Gas natural/hora"),
+        ),
+        grafico="costos",
+    ),
+    "costos_punta": Vista(
+        "Consumo en hora punta y fuera de punta",
+        "Número de autobuses",
+        "Consumo eléctrico (kWh)",
+        lineas=(
+            ("autobuses", "energia_punta", "Hora punta", "o", 0),
+            ("autobuses", "energia_fuera", "Fuera de punta", "s", 0),
+        ),
+        grafico="costos",
+    ),
+    "diarios": Vista(
+        "Intercambios y energía diarios",
+        "Día de operación",
+        "Intercambios de batería",
+        lineas=(
+            ("dias", "intercambios", "Intercambios", "o", 0),
+            ("dias", "energia", "Energía cargada", "s", 1),
+        ),
+        etiqueta_y2="Energía cargada (kWh)",
+    ),
+    "emisiones": Vista(
+        "Emisiones de CO2 durante la simulación",
+        etiqueta_y="Toneladas de CO2",
+        barras=(
+            ("electricidad", "Electricidad"),
+            ("gas", "Gas natural"),
+            ("ahorro", "Ahorro de CO2"),
+        ),
+    ),
+    "inventario": Vista(
+        "Inventario de baterías",
+        "Día de simulación",
+        "Número de baterías",
+        lineas=(
+            ("dias", "cargadas", "Cargadas", "", 0),
+            ("dias", "descargadas", "Descargadas", "", 0),
+        ),
+    ),
+    "cola": Vista(
+        "Evolución de la cola de autobuses",
+        "Día de simulación",
+        "Minutos de espera nuevos",
+        lineas=(("dias", "espera", "", "o", 0),),
+    ),
+    "costosdia": Vista(
+        "Costo eléctrico por día",
+        "Día de operación",
+        "Costo diario (S/.)",
+        serie_barras=("costos", "fin_de_semana"),
+    ),
+    "cargadores": Vista(
+        "Utilización de cargadores",
+        "Día de simulación",
+        "Uso de cargadores (%)",
+        lineas=(("dias", "uso", "", "o", 0),),
+    ),
+    "trafico": Vista(
+        "Perfil de tráfico para Lima",
+        "Hora del día",
+        "Factor de tráfico",
+        lineas=(("horas", "factores", "", "o", 0),),
+    ),
+    "intercambio": Vista(
+        "Tiempo promedio de intercambio por número de autobuses",
+        "Número de autobuses",
+        "Tiempo promedio de intercambio (minutos)",
+        lineas=(("autobuses", "tiempos", "", "o", 0),),
+    ),
+    "espera_baterias": Vista(
+        "Espera promedio de baterías cargadas",
+        "Número de autobuses",
+        "Tiempo en reserva (minutos)",
+        lineas=(("autobuses", "tiempos", "", "o", 0),),
+    ),
+    EN_CURSO: Vista(
+        "Simulación en curso",
+        "Día de simulación",
+        "Intercambios realizados",
+        lineas=(
+            ("dias", "intercambios_realizados", "Intercambios", "", 0),
+            ("dias", "tiempo_espera_total", "Espera acumulada", "", 1),
+        ),
+        etiqueta_y2="Espera acumulada (h)",
+        animada=True,
+    ),
+}
+
+
+def grafico_de(nombre):
+    """Nombre en ``GraficosModelo.GRAFICOS`` de los datos de la vista ``nombre``."""
+    return VISTAS[nombre].grafico or nombre
+
+
+class Tablero:
+    """Vistas de :data:`VISTAS` sobre la figura de ``lienzo``."""
+
+    # Filas del búfer de la corrida en curso
+    _FILAS = ("dias",) + avance.METRICAS_PARCIALES
+
+    def __init__(self, lienzo):
+        self.lienzo = lienzo
+        self.figura = lienzo.figure
+        self.ejes = self.figura.add_subplot()
+        self._ejes2 = None
+        self._artistas = {}
+        self.vista = None
+        self._fondo = None
+        # Búfer que crece por duplicación; las líneas reciben vistas de él
+        self._flujo = np.empty((len(self._FILAS), 256))
+        self._n = 0
+        lienzo.mpl_connect("draw_event", self._al_dibujar)
+
+    def _eje(self, indice):
+        if indice == 0:
+            return self.ejes
+        if self._ejes2 is None:
+            self._ejes2 = self.ejes.twinx()
+        return self._ejes2
+
+    def _crear(self, nombre):
+        vista = VISTAS[nombre]
+        lineas = []
+        for i, (_, _, etiqueta, marcador, eje) in enumerate(vista.lineas):
+            (linea,) = self._eje(eje).plot(
+                [],
+                [],
+                marker=marcador or None,
+                label=etiqueta or "_" + nombre,
+                color=f"C{i}",
+                drawstyle="steps-mid" if vista.escalones else "default",
+                animated=vista.animada,
+            )
+            lineas.append(linea)
+        barras = []
+        if vista.barras:
+            cantidad = len(vista.barras)
+            barras = list(
+                self.ejes.bar(
+                    range(cantidad),
+                    [0] * cantidad,
+                    color=[f"C{i}" for i in range(cantidad)],
+                ).patches
+            )
+        return lineas, barras
+
+    def _activar(self, nombre):
+        if nombre == self.vista:
+            return
+        for grupo in self._artistas.get(self.vista, ()):
+            for artista in grupo:
+                artista.set_visible(False)
+        if nombre not in self._artistas:
+            self._artistas[nombre] = self._crear(nombre)
+        lineas, barras = self._artistas[nombre]
+        for artista in lineas + barras:
+            artista.set_visible(True)
+
+        vista = VISTAS[nombre]
+        self.ejes.set_title(vista.titulo)
+        self.ejes.set_xlabel(vista.etiqueta_x)
+        self.ejes.set_ylabel(vista.etiqueta_y)
+        if vista.barras:
+            self.ejes.set_xticks(range(len(barras)))
+            self.ejes.set_xticklabels([etiqueta for _, etiqueta in vista.barras])
+        else:
+            self.ejes.xaxis.set_major_locator(ticker.AutoLocator())
+            self.ejes.xaxis.set_major_formatter(ticker.ScalarFormatter())
+        self.ejes.grid(not vista.barras)
+        if self._ejes2 is not None:
+            self._ejes2.set_visible(vista.etiqueta_y2 is not None)
+            self._ejes2.set_ylabel(vista.etiqueta_y2 or "")
+        leyenda = self.ejes.get_legend()
+        if leyenda is not None:
+            leyenda.remove()
+        if len(lineas) > 1:
+            self.ejes.legend(handles=lineas, loc="upper left")
+        self.vista = nombre
+        self._fondo = None
+
+    def _ejes_visibles(self):
+        ejes = [self.ejes]
+        if self._ejes2 is not None and self._ejes2.get_visible():
+            ejes.append(self._ejes2)
+        return ejes
+
+    def mostrar(self, nombre, datos):
+        """Muestra la vista ``nombre`` con los datos de ``calcular_datos``."""
+        self._activar(nombre)
+        vista = VISTAS[nombre]
+        lineas, barras = self._artistas[nombre]
+        for (clave_x, clave_y, *_), linea in zip(vista.lineas, lineas):
+            y = datos[clave_y]
+            linea.set_data(range(len(y)) if clave_x is None else datos[clave_x], y)
+        for (clave, _), barra in zip(vista.barras, barras):
+            barra.set_height(datos[clave])
+        if vista.serie_barras is not None:
+            self._mostrar_serie(vista.serie_barras, barras, datos)
+        for ejes in self._ejes_visibles():
+            ejes.relim(visible_only=True)
+            ejes.autoscale_view()
+        self.lienzo.draw_idle()
+
+    def _mostrar_serie(self, serie_barras, barras, datos):
+        # Las barras se crean sólo cuando hay más valores que antes; las que
+        # sobran se ocultan
+        clave, clave_marca = serie_barras
+        valores = datos[clave]
+        marcas = datos[clave_marca]
+        if len(valores) > len(barras):
+            nuevas = range(len(barras), len(valores))
+            barras.extend(self.ejes.bar(nuevas, [0] * len(nuevas)).patches)
+        for i, barra in enumerate(barras):
+            visible = i < len(valores)
+            barra.set_visible(visible)
+            if visible:
+                barra.set_height(valores[i])
+                barra.set_color("C1" if marcas[i] else "C0")
+
+    def iniciar_corrida(self, duracion):
+        """Prepara la vista :data:`EN_CURSO` para una corrida de ``duracion`` h."""
+        self._n = 0
+        self._activar(EN_CURSO)
+        self._actualizar_lineas()
+        self.ejes.set_xlim(0, duracion / 24)
+        for ejes in self._ejes_visibles():
+            ejes.set_ylim(0, 1)
+        self.lienzo.draw_idle()
+
+    def _actualizar_lineas(self):
+        lineas, _ = self._artistas[EN_CURSO]
+        dias = self._flujo[0, : self._n]
+        for (_, clave_y, *_), linea in zip(VISTAS[EN_CURSO].lineas, lineas):
+            linea.set_data(dias, self._flujo[self._FILAS.index(clave_y), : self._n])
+        return lineas
+
+    def agregar(self, metricas):
+        """Agrega un punto de :func:`avance.metricas_parciales` a la corrida."""
+        if self._n == self._flujo.shape[1]:
+            flujo = np.empty((len(self._FILAS), 2 * self._n))
+            flujo[:, : self._n] = self._flujo
+            self._flujo = flujo
+        self._flujo[0, self._n] = metricas["tiempo"] / 24
+        for fila, clave in enumerate(avance.METRICAS_PARCIALES, start=1):
+            self._flujo[fila, self._n] = metricas[clave]
+        self._n += 1
+        if self.vista != EN_CURSO:
+            return
+
+        lineas = self._actualizar_lineas()
+        redibujar = self._fondo is None or not getattr(
+            self.lienzo, "supports_blit", False
+        )
+        for linea in lineas:
+            ejes = linea.axes
+            maximo = linea.get_ydata()[-1]
+            if maximo > ejes.get_ylim()[1]:
+                ejes.set_ylim(0, 2 * maximo)
+                redibujar = True
+        if redibujar:
+            self.lienzo.draw_idle()
+            return
+        self.lienzo.restore_region(self._fondo)
+        for linea in lineas:
+            self.figura.draw_artist(linea)
+        self.lienzo.blit(self.figura.bbox)
+
+    def _al_dibujar(self, evento):
+        # Las líneas animadas no entran en el dibujo completo: guardar el
+        # fondo sin ellas y dibujarlas encima.
+        if self.vista is None or not VISTAS[self.vista].animada:
+            return
+        if getattr(self.lienzo, "supports_blit", False):
+            self._fondo = self.lienzo.copy_from_bbox(self.figura.bbox)
+        for linea in self._artistas[self.vista][0]:
+            self.figura.draw_artist(linea)
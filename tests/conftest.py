@@ -0,0 +1,11 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def cache_en_memoria(monkeypatch):
+    """Evita que las pruebas lean o escriban la caché en disco del usuario."""
+    import cache_resultados
+
+    cache = cache_resultados.CacheResultados()
+    monkeypatch.setattr(cache_resultados, "cache", cache)
+    return cache
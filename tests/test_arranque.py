@@ -0,0 +1,42 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PESADOS = ("simpy", "numpy", "matplotlib", "PyQt5")
+
+
+def _cargados(programa):
+    """Módulos de ``PESADOS`` cargados tras ejecutar ``programa`` desde cero."""
+    programa += (
+        "\nimport json, sys\n"
+        f"print(json.dumps([m for m in {PESADOS!r} if m in sys.modules]))\n"
+    )
+    salida = subprocess.run(
+        [sys.executable, "-c", programa],
+        cwd=RAIZ,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(salida.splitlines()[-1])
+
+
+@pytest.mark.parametrize(
+    "modulo", ["cli", "modelo", "motor_rapido", "barrido", "optimizador", "GraficosModelo"]
+)
+def test_importar_no_carga_modulos_pesados(modulo):
+    assert _cargados(f"import {modulo}") == []
+
+
+def test_corrida_rapida_no_carga_simpy():
+    pytest.importorskip("numpy")
+    programa = (
+        "import sys, cli\n"
+        "sys.argv = ['cli', '--dias', '1', '--engine', 'rapido']\n"
+        "cli.main()"
+    )
+    assert "simpy" not in _cargados(programa)
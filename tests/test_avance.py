@@ -0,0 +1,92 @@
+import pytest
+
+simpy = pytest.importorskip("simpy")
+
+import avance
+import modelo
+from barrido import ResumenSimulacion
+
+DURACION = 96
+
+
+def _estacion(engine, config):
+    if engine == "rapido":
+        import motor_rapido
+
+        return motor_rapido.EstacionRapida(config.simulacion.max_autobuses, config=config)
+    env = simpy.Environment()
+    estacion = modelo.EstacionIntercambio(
+        env, config.estacion.capacidad_estacion, config=config
+    )
+    env.process(
+        modelo.llegada_autobuses(
+            env, estacion, max_autobuses=config.simulacion.max_autobuses
+        )
+    )
+    return estacion
+
+
+class _Reloj:
+    """Reloj falso que avanza ``paso`` segundos en cada lectura."""
+
+    def __init__(self, paso):
+        self.paso = paso
+        self.ahora = 0.0
+
+    def __call__(self):
+        self.ahora += self.paso
+        return self.ahora
+
+
+@pytest.mark.parametrize("engine", modelo.MOTORES)
+def test_tramos_no_alteran_la_simulacion(engine):
+    config = modelo.configuracion_actual(verbose=False)
+    directa = modelo.ejecutar_simulacion(duracion=DURACION, engine=engine, config=config)
+    estacion = _estacion(engine, config)
+    parciales = []
+    ejecucion = avance.EjecucionPorTramos(estacion, DURACION, presupuesto=1e-3)
+
+    assert ejecucion.ejecutar(parcial=parciales.append)
+
+    for metrica in ResumenSimulacion.METRICAS:
+        assert getattr(estacion, metrica) == getattr(directa, metrica)
+    assert ejecucion.tramos > 1
+    assert parciales[-1]["tiempo"] == DURACION
+    assert parciales[-1]["intercambios_realizados"] == directa.intercambios_realizados
+    tiempos = [p["tiempo"] for p in parciales]
+    assert tiempos == sorted(tiempos)
+
+
+def test_progreso_limitado_por_segundo():
+    config = modelo.configuracion_actual(verbose=False)
+    # Cada lectura del reloj avanza 10 ms: con 5 avisos por segundo se
+    # informa como mucho uno cada diez tramos.
+    ejecucion = avance.EjecucionPorTramos(
+        _estacion("rapido", config),
+        DURACION,
+        presupuesto=0.01,
+        avisos_por_segundo=5,
+        tramo_inicial=0.5,
+        reloj=_Reloj(0.01),
+    )
+    avisos = []
+    ejecucion.ejecutar(progreso=avisos.append)
+
+    assert avisos[-1] == 100
+    assert avisos == sorted(set(avisos))
+    assert len(avisos) <= ejecucion.tramos // 10 + 2
+
+
+def test_cancelacion_entre_tramos():
+    config = modelo.configuracion_actual(verbose=False)
+    estacion = _estacion("simpy", config)
+    ejecucion = avance.EjecucionPorTramos(estacion, DURACION, tramo_inicial=2.0)
+    revisiones = []
+
+    def cancelado():
+        revisiones.append(estacion.env.now)
+        return len(revisiones) > 3
+
+    assert not ejecucion.ejecutar(cancelado=cancelado)
+    assert ejecucion.tramos == 3
+    assert estacion.env.now == ejecucion.ahora < DURACION
@@ -0,0 +1,139 @@
+import importlib
+
+import pytest
+
+simpy = pytest.importorskip("simpy")
+
+
+@pytest.fixture
+def modelo(monkeypatch):
+    import modelo
+    modelo = importlib.reload(modelo)
+    monkeypatch.setattr(modelo, "VERBOSE", False)
+    return modelo
+
+
+def test_barrido_en_paralelo_respeta_el_orden(modelo, monkeypatch):
+    import barrido
+
+    puntos = [
+        {"max_autobuses": 12},
+        {"max_autobuses": 4, "capacidad_estacion": 3},
+        {"max_autobuses": 8, "semilla": 7},
+    ]
+    paralelo = barrido.ejecutar_barrido(puntos, jobs=2, duracion=48)
+    serie = barrido.ejecutar_barrido(puntos, jobs=1, duracion=48, usar_cache=False)
+    assert [r.punto for r in paralelo] == puntos
+
+    for punto, resumen, esperado in zip(puntos, paralelo, serie):
+        for metrica in barrido.ResumenSimulacion.METRICAS:
+            assert getattr(resumen, metrica) == getattr(esperado, metrica)
+
+    monkeypatch.setattr(modelo.param_estacion, "capacidad_estacion", 3)
+    directo = modelo.ejecutar_simulacion(4, 48)
+    assert paralelo[1].intercambios_realizados == directo.intercambios_realizados
+    assert (
+        paralelo[1].espera_baterias.resumen() == directo.espera_baterias.resumen()
+    )
+
+
+def test_barrido_no_modifica_los_parametros_globales(modelo):
+    import barrido
+
+    estacion = modelo.param_estacion
+    antes = (
+        estacion.capacidad_estacion,
+        estacion.total_baterias,
+        modelo.param_simulacion.max_autobuses,
+    )
+    barrido.ejecutar_barrido(
+        [{"max_autobuses": 3, "capacidad_estacion": 2, "total_baterias": 5}],
+        duracion=24,
+    )
+    assert modelo.param_estacion is estacion
+    assert (
+        estacion.capacidad_estacion,
+        estacion.total_baterias,
+        modelo.param_simulacion.max_autobuses,
+    ) == antes
+    assert modelo.VERBOSE is False
+
+    with pytest.raises(ValueError):
+        barrido.ejecutar_barrido([{"autobuses": 3}])
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_barrido_informa_el_progreso(modelo, jobs):
+    import barrido
+
+    puntos = [{"max_autobuses": n} for n in (2, 3, 4, 5)]
+    barrido.ejecutar_barrido(puntos[:1], jobs=1, duracion=24)
+    avisos = []
+    barrido.ejecutar_barrido(
+        puntos, jobs=jobs, duracion=24, progreso=lambda *a: avisos.append(a)
+    )
+    # El punto que ya estaba en caché cuenta como hecho
+    assert avisos == [(2, 4), (3, 4), (4, 4)]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_barrido_cancelado(modelo, cache_en_memoria, jobs):
+    import barrido
+
+    puntos = [{"max_autobuses": n} for n in (2, 3, 4, 5)]
+    with pytest.raises(barrido.BarridoCancelado):
+        barrido.ejecutar_barrido(puntos, jobs=jobs, duracion=24, cancelado=lambda: True)
+
+    avisos = []
+    with pytest.raises(barrido.BarridoCancelado):
+        barrido.ejecutar_barrido(
+            puntos,
+            jobs=1,
+            duracion=24,
+            progreso=lambda *a: avisos.append(a),
+            cancelado=lambda: len(avisos) == 2,
+        )
+    # Los puntos simulados antes de cancelar quedan en la caché
+    fallos = cache_en_memoria.estadisticas()["fallos"]
+    barrido.ejecutar_barrido(puntos[:2], jobs=1, duracion=24)
+    assert cache_en_memoria.estadisticas()["fallos"] == fallos
+
+
+def test_cancelar_no_espera_los_puntos_en_curso(modelo, cache_en_memoria):
+    import time
+
+    import barrido
+
+    # Puntos que tardan bastante más que la ventana de cancelación
+    puntos = [
+        {"max_autobuses": 100, "capacidad_estacion": 40, "total_baterias": 200,
+         "baterias_iniciales": 100, "semilla": s}
+        for s in range(4)
+    ]
+    inicio = time.perf_counter()
+    pedido = []
+
+    def cancelado():
+        if time.perf_counter() - inicio > 0.3:
+            pedido.append(time.perf_counter())
+        return bool(pedido)
+
+    with pytest.raises(barrido.BarridoCancelado):
+        barrido.ejecutar_barrido(puntos, jobs=2, duracion=30 * 24, cancelado=cancelado)
+    assert time.perf_counter() - pedido[0] < 2 * barrido.INTERVALO_CANCELACION + 0.3
+
+
+def test_resultados_de_la_cache_son_independientes(modelo, cache_en_memoria):
+    import barrido
+
+    punto = {"max_autobuses": 3}
+    primero = barrido.simular(punto, duracion=24)
+    resumen = primero.espera_baterias.resumen()
+    primero.espera_baterias.agregar(1000.0)
+    primero.intercambios_realizados = -1
+
+    segundo = barrido.simular(punto, duracion=24)
+    assert segundo.intercambios_realizados >= 0
+    assert segundo.espera_baterias.resumen() == resumen
+    segundo.espera_baterias.agregar(1000.0)
+    assert barrido.simular(punto, duracion=24).espera_baterias.resumen() == resumen
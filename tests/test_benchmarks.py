@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from benchmarks import suite
+
+
+def test_medir_escenario_y_micro():
+    medicion = suite.medir_escenario("estres", "rapido", repeticiones=1)
+    assert medicion["eventos"] > 0
+    assert medicion["eventos_por_s"] == pytest.approx(
+        medicion["eventos"] / medicion["tiempo_s"]
+    )
+    assert medicion["memoria_pico_mb"] > 0
+    for nombre in suite.MICRO:
+        assert suite.medir_micro(nombre, repeticiones=1, numero=2)["ns_por_llamada"] > 0
+
+
+def test_comparar_con_la_linea_base():
+    base = {
+        "escenarios": {"base/rapido": {"tiempo_s": 1.0, "memoria_pico_mb": 10.0}},
+        "micro": {"formato_hora": {"ns_por_llamada": 100.0}},
+    }
+    actual = {
+        "escenarios": {
+            "base/rapido": {"tiempo_s": 1.2, "memoria_pico_mb": 12.0},
+            "anual/rapido": {"tiempo_s": 50.0, "memoria_pico_mb": 90.0},
+        },
+        "micro": {"formato_hora": {"ns_por_llamada": 200.0}},
+    }
+    regresiones = suite.comparar(actual, base, umbral_tiempo=0.25, umbral_memoria=0.1)
+    assert [r[0] for r in regresiones] == [
+        "escenarios/base/rapido/memoria_pico_mb",
+        "micro/formato_hora/ns_por_llamada",
+    ]
+    assert suite.comparar(actual, base, umbral_tiempo=1.5, umbral_memoria=0.5) == []
+
+
+def test_main_guarda_json(tmp_path, capsys):
+    salida = tmp_path / "resultados.json"
+    linea_base = tmp_path / "base.json"
+    argumentos = [
+        "--niveles", "estres", "--engine", "rapido", "--repeticiones", "1",
+        "--sin-micro", "--sin-arranque", "--linea-base", str(linea_base),
+    ]
+    assert suite.main(argumentos + ["--guardar-linea-base"]) == 0
+    assert suite.main(argumentos + ["--salida", str(salida), "--umbral-tiempo", "100",
+                                    "--umbral-memoria", "100"]) == 0
+    resultados = json.loads(salida.read_text())
+    assert list(resultados["escenarios"]) == ["estres/rapido"]
+    assert "estres/rapido" in capsys.readouterr().out
+
+
+def test_arranque_sin_modulos_pesados():
+    medicion = suite.medir_arranque("modelo", repeticiones=1)
+    assert medicion["tiempo_s"] > 0
+    assert medicion["modulos_pesados"] == []
+    resultados = {
+        "arranque": {
+            "cli": {"tiempo_s": 0.1, "modulos_pesados": ["simpy"]},
+            "modelo": medicion,
+        }
+    }
+    assert suite.pesados_en_arranque(resultados) == [("cli", ["simpy"])]
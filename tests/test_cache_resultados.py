@@ -0,0 +1,89 @@
+import importlib
+import os
+
+import pytest
+
+import cache_resultados
+from cache_resultados import CacheResultados, clave_simulacion
+
+
+def _parametros(**cambios):
+    from parametros import RunConfig
+
+    return RunConfig(**cambios)
+
+
+def test_clave_depende_de_todos_los_parametros():
+    base = clave_simulacion(_parametros(), 20, 504, 37.2, "simpy")
+    assert base == clave_simulacion(_parametros(verbose=True), 20, 504, 37.2, "simpy")
+
+    from parametros import ParametrosBateria, ParametrosSimulacion
+
+    otra_semilla = _parametros(simulacion=ParametrosSimulacion(semilla=7))
+    otra_curva = ParametrosBateria()
+    otra_curva.puntos_curva = [(0, 60), (80, 40)]
+    otra_curva = _parametros(bateria=otra_curva)
+    claves = {
+        clave_simulacion(otra_semilla, 20, 504, 37.2, "simpy"),
+        clave_simulacion(otra_curva, 20, 504, 37.2, "simpy"),
+        clave_simulacion(_parametros(), 20, 504, 40.0, "simpy"),
+        clave_simulacion(_parametros(), 20, 504, 37.2, "rapido"),
+    }
+    assert base not in claves
+    assert len(claves) == 4
+
+
+def test_lru_en_memoria():
+    cache = CacheResultados(capacidad=2)
+    cache.guardar("a", 1)
+    cache.guardar("b", 2)
+    assert cache.obtener("a") == 1
+    cache.guardar("c", 3)  # "b" es el menos usado
+    assert cache.obtener("b") is None
+    assert cache.obtener("c") == 3
+    assert cache.estadisticas() == {
+        "aciertos_memoria": 2, "aciertos_disco": 0, "fallos": 1, "en_memoria": 2,
+    }
+
+
+def test_nivel_en_disco_con_limite_de_tamano(tmp_path):
+    cache = CacheResultados(directorio=str(tmp_path), limite_disco=10_000)
+    cache.guardar("uno", b"x" * 4_000)
+    nueva = CacheResultados(directorio=str(tmp_path), limite_disco=10_000)
+    assert nueva.obtener("uno") == b"x" * 4_000
+    assert nueva.aciertos_disco == 1
+
+    # El archivo leído recién es el último en eliminarse
+    cache.guardar("dos", b"y" * 4_000)
+    os.utime(tmp_path / "uno.pkl", (1, 1))
+    os.utime(tmp_path / "dos.pkl", (2, 2))
+    CacheResultados(directorio=str(tmp_path)).obtener("uno")
+    cache.guardar("tres", b"z" * 4_000)
+    guardados = sorted(p.stem for p in tmp_path.glob("*.pkl"))
+    assert guardados == ["tres", "uno"]
+
+
+def test_graficos_repetidos_no_vuelven_a_simular(monkeypatch, cache_en_memoria):
+    pytest.importorskip("simpy")
+    import modelo
+    modelo = importlib.reload(modelo)
+    import barrido
+
+    llamadas = []
+    original = modelo.ejecutar_simulacion
+
+    def contar(*args, **kwargs):
+        llamadas.append(kwargs)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(modelo, "ejecutar_simulacion", contar)
+    primero = barrido.simular(duracion=24)
+    segundo = barrido.simular({"max_autobuses": modelo.param_simulacion.max_autobuses}, duracion=24)
+    assert len(llamadas) == 1
+    assert segundo.costo_total_electrico == primero.costo_total_electrico
+    assert segundo.punto == {"max_autobuses": modelo.param_simulacion.max_autobuses}
+    assert cache_resultados.cache.estadisticas()["aciertos_memoria"] == 1
+
+    monkeypatch.setattr(modelo.param_simulacion, "semilla", 3)
+    barrido.simular(duracion=24)
+    assert len(llamadas) == 2
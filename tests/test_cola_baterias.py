@@ -0,0 +1,48 @@
+import pytest
+
+simpy = pytest.importorskip("simpy")
+
+from cola_baterias import ColaBaterias
+from registro_baterias import EN_RESERVA, RegistroBaterias
+
+
+def _historial(crear_cola):
+    """Quién recibe qué batería y cuándo, con pedidos y depósitos cruzados."""
+    env = simpy.Environment()
+    cola = crear_cola(env)
+    historial = []
+
+    def cliente(nombre, demora):
+        yield env.timeout(demora)
+        pedido = cola.get()
+        historial.append((env.now, nombre, "pide", pedido.triggered))
+        bateria = yield pedido
+        historial.append((env.now, nombre, bateria))
+
+    def cargador(baterias, demora):
+        for bateria in baterias:
+            yield env.timeout(demora)
+            yield cola.put(bateria)
+            historial.append((env.now, "cargador", bateria))
+
+    for i, demora in enumerate((0, 0, 0.5, 1, 1, 3)):
+        env.process(cliente(i, demora))
+    env.process(cargador([3, 4, 5], 1))
+    env.process(cargador([6], 2))
+    env.run()
+    return historial, list(cola.items)
+
+
+def test_atiende_como_un_store_de_simpy():
+    def store(env):
+        cola = simpy.Store(env)
+        cola.items.extend([0, 1])
+        return cola
+
+    registro = RegistroBaterias(total=7, iniciales=2)
+    esperado = _historial(store)
+    obtenido = _historial(
+        lambda env: ColaBaterias(env, registro, registro.reserva, EN_RESERVA)
+    )
+    assert obtenido == esperado
+    assert registro.estado[6] == EN_RESERVA and registro.ingreso[6] == 2
@@ -0,0 +1,56 @@
+import dataclasses
+import importlib
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from parametros import ParametrosEstacion, RunConfig
+
+simpy = pytest.importorskip("simpy")
+
+
+@pytest.fixture
+def modelo():
+    import modelo
+    return importlib.reload(modelo)
+
+
+def test_run_config_es_una_instantanea_inmutable():
+    estacion = ParametrosEstacion(capacidad_estacion=5)
+    config = RunConfig(estacion=estacion)
+    estacion.actualizar(capacidad=9)
+    assert config.estacion.capacidad_estacion == 5
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        config.verbose = True
+    otra = config.con(verbose=True)
+    assert otra.verbose and not config.verbose
+    assert otra.estacion is not config.estacion
+
+
+def test_valores_por_defecto_se_leen_al_llamar(modelo, monkeypatch):
+    monkeypatch.setattr(modelo, "VERBOSE", False)
+    monkeypatch.setattr(modelo.param_simulacion, "max_autobuses", 3)
+    monkeypatch.setattr(modelo.param_simulacion, "dias", 1)
+    implicito = modelo.ejecutar_simulacion()
+    explicito = modelo.ejecutar_simulacion(3, 24)
+    assert implicito.intercambios_realizados == explicito.intercambios_realizados
+    assert implicito.costo_total_gas == explicito.costo_total_gas
+
+
+def test_simulaciones_concurrentes_en_hilos(modelo):
+    configs = [
+        RunConfig(estacion=ParametrosEstacion(capacidad_estacion=c, total_baterias=t))
+        for c, t in [(21, 41), (4, 30), (8, 25), (2, 12)]
+    ]
+
+    def correr(config):
+        estacion = modelo.ejecutar_simulacion(10, 72, config=config)
+        return estacion.intercambios_realizados, estacion.tiempo_espera_total
+
+    en_serie = [correr(config) for config in configs]
+    with ThreadPoolExecutor(max_workers=4) as ejecutor:
+        en_hilos = list(ejecutor.map(correr, configs))
+    assert en_hilos == en_serie
+    # Los parámetros globales no se tocan
+    assert modelo.param_estacion.capacidad_estacion == 21
@@ -0,0 +1,49 @@
+import importlib
+
+import pytest
+
+simpy = pytest.importorskip("simpy")
+
+
+def _modelo_real(monkeypatch):
+    import modelo
+    # Otros módulos de prueba recargan ``modelo`` con un stub de simpy
+    modelo = importlib.reload(modelo)
+    monkeypatch.setattr(modelo, "VERBOSE", False)
+    monkeypatch.setattr(modelo.param_estacion, "capacidad_estacion", 2)
+    monkeypatch.setattr(modelo.param_estacion, "total_baterias", 2)
+    monkeypatch.setattr(modelo.param_estacion, "baterias_iniciales", 2)
+    return modelo
+
+
+def test_cargador_inactivo_despierta_en_su_siguiente_revision(monkeypatch):
+    modelo = _modelo_real(monkeypatch)
+    env = simpy.Environment()
+    estacion = modelo.EstacionIntercambio(env, 2)
+    # Un autobús se lleva una batería y la devuelve usada
+    bateria = estacion.baterias_reserva.items.pop()
+
+    def depositar(env):
+        yield env.timeout(0.5)
+        yield estacion.depositar_descargada(bateria, 40)
+
+    env.process(depositar(env))
+    env.run(until=31 / 60 - 1e-9)
+    assert estacion.baterias_cargando == 0
+    assert len(estacion._cargadores_inactivos) == 1
+    env.run(until=31 / 60 + 1e-9)
+    assert estacion.baterias_cargando == 1
+    assert not estacion.baterias_descargadas.items
+
+
+def test_cargadores_sin_trabajo_no_generan_eventos(monkeypatch):
+    modelo = _modelo_real(monkeypatch)
+    env = simpy.Environment()
+    estacion = modelo.EstacionIntercambio(env, 2)
+    eventos = 0
+    while env.peek() < 24:
+        env.step()
+        eventos += 1
+    # Sólo se procesan los arranques de los procesos de carga
+    assert eventos == 2
+    assert len(estacion._cargadores_inactivos) == 2
@@ -1,72 +1,74 @@
 import importlib
-import types
-import sys
 
 import pytest
 
+from registro_baterias import (
+    RegistroBaterias,
+    EN_RESERVA,
+    DESCARGADA,
+    EN_CARGA,
+    EN_AUTOBUS,
+)
+
+simpy = pytest.importorskip("simpy")
+
 
 def setup_modelo(monkeypatch):
-    class DummyEnv:
-        def __init__(self):
-            self.now = 0
-        def timeout(self, dur):
-            self.now += dur
-            return None
-        def process(self, gen):
-            return gen
-    class DummyResource:
-        def __init__(self, env, capacity=1):
-            pass
-        def request(self):
-            class Req:
-                def __enter__(self_inner):
-                    pass
-                def __exit__(self_inner, exc_type, exc, tb):
-                    pass
-            return Req()
-    class DummyStore:
-        def __init__(self, env, capacity=0):
-            self.items = []
-        def put(self, item):
-            self.items.append(item)
-        def get(self):
-            return self.items.pop(0)
-    simpy_stub = types.SimpleNamespace(
-        Environment=DummyEnv, Resource=DummyResource, Store=DummyStore
-    )
-    monkeypatch.setitem(sys.modules, "simpy", simpy_stub)
     import modelo
-    importlib.reload(modelo)
-    return modelo, DummyEnv
+    modelo = importlib.reload(modelo)
+    monkeypatch.setattr(modelo, "VERBOSE", False)
+    return modelo
+
+
+def test_registro_inicial():
+    registro = RegistroBaterias(total=5, iniciales=2)
+    assert list(registro.reserva) == [0, 1]
+    assert list(registro.descargadas) == [2, 3, 4]
+    assert registro.contar(EN_RESERVA) == 2
+    assert registro.contar(DESCARGADA) == 3
+    assert registro.soc[0] == 100
+    assert registro.soc[4] == 30
 
 
 def test_tiempos_espera_desde_carga(monkeypatch):
-    modelo, DummyEnv = setup_modelo(monkeypatch)
+    modelo = setup_modelo(monkeypatch)
     # Reducir inventario para controlar el orden
     monkeypatch.setattr(modelo.param_estacion, "baterias_iniciales", 1, raising=False)
     monkeypatch.setattr(modelo.param_estacion, "total_baterias", 1, raising=False)
     monkeypatch.setattr(modelo.param_estacion, "capacidad_estacion", 1, raising=False)
 
-    env = DummyEnv()
-    estacion = modelo.EstacionIntercambio(env, 1)
-
-    # Primera extracción
-    env.now = 1
-    estacion.baterias_reserva.get()
-    ingreso = estacion._ingreso_reserva.pop(0)
-    estacion.tiempos_espera_baterias.append(env.now - ingreso)
-
-    # Batería cargada nuevamente
-    env.now = 5
-    estacion.baterias_reserva.put(100)
-    estacion._ingreso_reserva.append(env.now)
+    env = simpy.Environment()
+    config = modelo.configuracion_actual().con(guardar_muestras=True)
+    estacion = modelo.EstacionIntercambio(env, 1, config=config)
+    usos = []
+    fin_carga = []
 
-    # Siguiente uso
-    env.now = 8
-    estacion.baterias_reserva.get()
-    ingreso = estacion._ingreso_reserva.pop(0)
-    estacion.tiempos_espera_baterias.append(env.now - ingreso)
+    def autobus(env):
+        # Primera extracción
+        yield env.timeout(1)
+        bateria = yield estacion.baterias_reserva.get()
+        estacion.retirar_de_reserva(bateria)
+        usos.append(bateria)
+        assert estacion.registro.estado[bateria] == EN_AUTOBUS
+        # Devolverla descargada para que el cargador la recargue
+        yield estacion.depositar_descargada(bateria, 50)
+        # Siguiente uso, varias horas después de terminar la carga
+        yield env.timeout(5)
+        fin_carga.append(estacion.registro.ingreso[0])
+        bateria = yield estacion.baterias_reserva.get()
+        estacion.retirar_de_reserva(bateria)
+        usos.append(bateria)
 
-    assert estacion.tiempos_espera_baterias == [1.0, 3]
-    assert estacion._ingreso_reserva == []
+    env.process(autobus(env))
+    env.run(until=10)
 
+    assert usos == [0, 0]
+    assert 1 < fin_carga[0] < 6
+    assert list(estacion.espera_baterias.muestras) == [
+        1.0,
+        pytest.approx(6 - fin_carga[0]),
+    ]
+    assert estacion.espera_baterias.maximo == max(estacion.espera_baterias.muestras)
+    assert estacion.registro.ciclos[0] == 1
+    assert not estacion.registro.reserva
+    assert estacion.registro.contar(EN_CARGA) == 0
@@ -0,0 +1,57 @@
+import bisect
+import math
+import random
+import statistics
+
+import pytest
+
+from estadisticas import DigestoCuantiles, EstadisticaEnLinea
+
+
+def test_momentos_coinciden_con_statistics():
+    aleatorio = random.Random(3)
+    datos = [aleatorio.gauss(10, 3) for _ in range(2000)]
+    estadistica = EstadisticaEnLinea()
+    for x in datos:
+        estadistica.agregar(x)
+
+    assert len(estadistica) == 2000
+    assert estadistica.media == pytest.approx(statistics.fmean(datos))
+    assert estadistica.varianza == pytest.approx(statistics.variance(datos))
+    assert estadistica.minimo == min(datos)
+    assert estadistica.maximo == max(datos)
+    assert estadistica.muestras is None
+
+
+@pytest.mark.parametrize("ordenar", [False, True])
+def test_cuantiles_aproximan_los_exactos_con_memoria_acotada(ordenar):
+    aleatorio = random.Random(5)
+    datos = [aleatorio.expovariate(1.0) for _ in range(20_000)]
+    if ordenar:
+        # Datos con tendencia, como la rampa inicial de las esperas
+        datos.sort()
+    digesto = DigestoCuantiles(compresion=100)
+    for x in datos:
+        digesto.agregar(x)
+
+    ordenados = sorted(datos)
+    for p in (0.01, 0.5, 0.9, 0.99):
+        # Error medido en rango: fracción de datos bajo la estimación
+        rango = bisect.bisect(ordenados, digesto.cuantil(p)) / len(ordenados)
+        assert rango == pytest.approx(p, abs=0.005)
+    assert digesto.cuantil(0) == ordenados[0]
+    assert digesto.cuantil(1) == ordenados[-1]
+    assert len(digesto) <= 100
+
+
+def test_pocos_datos_y_muestras_opcionales():
+    estadistica = EstadisticaEnLinea(guardar_muestras=True)
+    resumen = estadistica.resumen()
+    assert resumen["n"] == 0 and math.isnan(resumen["media"])
+    for x in (3.0, 1.0, 2.0):
+        estadistica.agregar(x)
+    assert list(estadistica.muestras) == [3.0, 1.0, 2.0]
+    assert estadistica.cuantil(0.5) == 2.0
+    assert estadistica.resumen()["p50"] == 2.0
+    with pytest.raises(ValueError):
+        estadistica.cuantil(1.5)
@@ -0,0 +1,70 @@
+import queue
+
+import pytest
+
+pytest.importorskip("simpy")
+
+import exploracion
+import modelo
+from barrido import ResumenSimulacion
+from parametros import ParametrosSimulacion
+
+ESPERA = 60
+
+
+@pytest.fixture
+def explorador():
+    resultados = queue.Queue()
+    with exploracion.ExploradorEnVivo(resultados.put, jobs=2) as explorador:
+        explorador.resultados = resultados
+        yield explorador
+
+
+def _config(dias=5, max_autobuses=12):
+    return modelo.configuracion_actual(verbose=False).con(
+        simulacion=ParametrosSimulacion(dias=dias, max_autobuses=max_autobuses)
+    )
+
+
+def test_estimacion_y_luego_resultado_completo(explorador):
+    config = _config()
+    generacion = explorador.enviar(config, tiempo_ruta=30.0)
+
+    primero = explorador.resultados.get(timeout=ESPERA)
+    if not primero.completa:
+        completo = explorador.resultados.get(timeout=ESPERA)
+        assert primero.etapa == exploracion.ESTIMACION
+        assert primero.config.simulacion.duracion == exploracion.HORIZONTE_ESTIMACION
+    else:
+        completo = primero
+    assert completo.completa and completo.generacion == generacion
+
+    directa = modelo.ejecutar_simulacion(tiempo_ruta=30.0, engine="rapido", config=config)
+    for metrica in ResumenSimulacion.METRICAS:
+        assert getattr(completo.resumen, metrica) == getattr(directa, metrica)
+    assert completo.lineas() == modelo.formatear_resultados(directa)
+
+    # Los mismos parámetros se responden desde la caché dentro de ``enviar``
+    explorador.enviar(config, tiempo_ruta=30.0)
+    repetido = explorador.resultados.get_nowait()
+    assert repetido.completa and repetido.resumen is completo.resumen
+
+
+def test_solo_entrega_la_generacion_vigente(explorador):
+    for max_autobuses in (8, 10, 12, 14):
+        ultima = explorador.enviar(_config(dias=10, max_autobuses=max_autobuses))
+
+    entregados = []
+    while not entregados or not entregados[-1].completa:
+        entregados.append(explorador.resultados.get(timeout=ESPERA))
+    assert all(r.generacion == ultima for r in entregados)
+    assert entregados[-1].config.simulacion.max_autobuses == 14
+    assert explorador.resultados.empty()
+
+
+def test_cancelar_descarta_el_trabajo(explorador):
+    explorador.enviar(_config(dias=30))
+    explorador.cancelar()
+    explorador.enviar(_config(dias=2))
+    resultado = explorador.resultados.get(timeout=ESPERA)
+    assert resultado.completa and resultado.config.simulacion.dias == 2
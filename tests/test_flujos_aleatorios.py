@@ -0,0 +1,59 @@
+import copy
+import pickle
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import flujos_aleatorios
+from flujos_aleatorios import FlujoUniforme, FlujosAleatorios
+
+
+def test_bloques_y_pickle_no_cambian_la_secuencia():
+    completo = FlujoUniforme(42, flujos_aleatorios.CONSUMO, 3, 0.9, 1.3, bloque=1000)
+    chico = FlujoUniforme(42, flujos_aleatorios.CONSUMO, 3, 0.9, 1.3, bloque=7)
+    valores = [completo() for _ in range(20)]
+    assert [chico() for _ in range(20)] == valores
+    assert all(0.9 <= v < 1.3 for v in valores)
+
+    copia = pickle.loads(pickle.dumps(chico))
+    assert [copia() for _ in range(30)] == [chico() for _ in range(30)]
+
+
+def test_flujos_independientes_por_autobus():
+    pytest.importorskip("simpy")
+    import modelo
+
+    config = modelo.configuracion_actual(verbose=False)
+    flujos = FlujosAleatorios(config)
+    otro_orden = FlujosAleatorios(config)
+    # Sacar valores de un autobús no altera los de otro
+    primero = [flujos.consumo(1)() for _ in range(5)]
+    segundo = [flujos.consumo(2)() for _ in range(5)]
+    assert [otro_orden.consumo(2)() for _ in range(5)] == segundo
+    assert [otro_orden.consumo(1)() for _ in range(5)] == primero
+    assert primero != segundo
+
+    simulacion = copy.copy(config.simulacion)
+    simulacion.actualizar(semilla=7)
+    otra_semilla = FlujosAleatorios(config.con(simulacion=simulacion))
+    assert [otra_semilla.consumo(1)() for _ in range(5)] != primero
+
+
+def test_agregar_un_autobus_no_altera_a_los_demas():
+    pytest.importorskip("simpy")
+    import modelo
+    import trazas
+
+    config = modelo.configuracion_actual(verbose=False)
+
+    def llegadas(autobuses):
+        anillo = trazas.SumideroAnillo()
+        modelo.ejecutar_simulacion(autobuses, 72, config=config, traza=anillo)
+        return [
+            evento
+            for evento in anillo.eventos()
+            if evento[0] == trazas.LLEGADA and evento[2] <= 8
+        ]
+
+    assert llegadas(8) == llegadas(9)
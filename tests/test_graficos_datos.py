@@ -0,0 +1,64 @@
+import pytest
+
+simpy = pytest.importorskip("simpy")
+pytest.importorskip("numpy")
+
+import avance
+import barrido
+import cache_resultados
+import GraficosModelo
+import modelo
+from parametros import ParametrosSimulacion
+
+
+@pytest.fixture
+def config():
+    return modelo.configuracion_actual(verbose=False).con(
+        simulacion=ParametrosSimulacion(dias=2, max_autobuses=4)
+    )
+
+
+@pytest.mark.parametrize("nombre", sorted(GraficosModelo.GRAFICOS))
+def test_datos_sin_matplotlib(nombre, config):
+    avisos = []
+    datos = GraficosModelo.calcular_datos(
+        nombre, config=config, jobs=1, progreso=lambda *a: avisos.append(a)
+    )
+    assert isinstance(datos, dict) and datos
+    if nombre in ("costos", "intercambio", "espera_baterias"):
+        assert len(datos["autobuses"]) == 4
+        assert avisos[-1] == (4, 4)
+
+
+def test_graficos_reutilizan_la_corrida_de_la_interfaz(config, cache_en_memoria):
+    # Lo mismo que hace ``gui.SimulacionWorker`` al terminar una corrida
+    simulacion = config.simulacion
+    env = simpy.Environment()
+    estacion = modelo.EstacionIntercambio(
+        env, config.estacion.capacidad_estacion, config=config
+    )
+    env.process(
+        modelo.llegada_autobuses(
+            env, estacion, max_autobuses=simulacion.max_autobuses, tiempo_ruta=30.0
+        )
+    )
+    avance.EjecucionPorTramos(estacion, simulacion.duracion).ejecutar()
+    clave = cache_resultados.clave_simulacion(
+        config, simulacion.max_autobuses, simulacion.duracion, 30.0, "simpy"
+    )
+    cache_en_memoria.guardar(clave, barrido.ResumenSimulacion(estacion, {}))
+
+    fallos = cache_en_memoria.estadisticas()["fallos"]
+    for nombre in ("diarios", "emisiones", "costosdia"):
+        GraficosModelo.calcular_datos(nombre, config=config, tiempo_ruta=30.0)
+    assert cache_en_memoria.estadisticas()["fallos"] == fallos
+
+    emisiones = GraficosModelo.calcular_datos("emisiones", config=config, tiempo_ruta=30.0)
+    assert emisiones["electricidad"] == pytest.approx(
+        estacion.energia_total_cargada * config.economicos.factor_co2_elec / 1000
+    )
+
+
+def test_cancelar_un_barrido_de_graficos(config):
+    with pytest.raises(barrido.BarridoCancelado):
+        GraficosModelo.calcular_datos("costos", config=config, jobs=1, cancelado=lambda: True)
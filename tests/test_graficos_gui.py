@@ -23,6 +23,17 @@ def _stub_pyplot(monkeypatch, calls):
     monkeypatch.setitem(sys.modules, 'matplotlib.pyplot', plt)
 
 
+def _barrido_falso(puntos, jobs=None, **opciones):
+    return [
+        types.SimpleNamespace(
+            intercambios_realizados=p['max_autobuses'],
+            tiempo_espera_total=0,
+            espera_baterias=types.SimpleNamespace(n=1, media=1),
+        )
+        for p in puntos
+    ]
+
+
 def test_graficar_trafico_calls_show(monkeypatch):
     calls = {}
     _stub_pyplot(monkeypatch, calls)
@@ -33,7 +44,7 @@ def test_graficar_trafico_calls_show(monkeypatch):
 def test_graficar_tiempos_intercambio_calls_show(monkeypatch):
     calls = {}
     _stub_pyplot(monkeypatch, calls)
-    monkeypatch.setattr(tiempos_intercambio, 'tiempo_promedio_para_autobuses', lambda n: n)
+    monkeypatch.setattr(tiempos_intercambio, 'ejecutar_barrido', _barrido_falso)
     monkeypatch.setattr(tiempos_intercambio.param_simulacion, 'max_autobuses', 3, raising=False)
     tiempos_intercambio.graficar_tiempos_intercambio(block=False)
     assert calls['block'] is False
@@ -42,7 +53,7 @@ def test_graficar_tiempos_intercambio_calls_show(monkeypatch):
 def test_graficar_espera_baterias_calls_show(monkeypatch):
     calls = {}
     _stub_pyplot(monkeypatch, calls)
-    monkeypatch.setattr(tiempos_intercambio, 'tiempo_promedio_espera_baterias', lambda n: n)
+    monkeypatch.setattr(tiempos_intercambio, 'ejecutar_barrido', _barrido_falso)
     monkeypatch.setattr(tiempos_intercambio.param_simulacion, 'max_autobuses', 2, raising=False)
     tiempos_intercambio.graficar_espera_baterias(block=False)
     assert calls['block'] is False
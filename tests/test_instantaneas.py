@@ -0,0 +1,117 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+import modelo
+import motor_rapido
+from barrido import ResumenSimulacion
+from instantaneas import Instantanea, calentar, ejecutar_ramas
+from parametros import ParametrosEconomicos, ParametrosEstacion
+
+HORIZONTE = 7 * 24
+
+
+def _config():
+    return modelo.configuracion_actual(verbose=False)
+
+
+def _metricas(estacion):
+    return {m: getattr(estacion, m) for m in ResumenSimulacion.METRICAS}
+
+
+def test_continuar_instantanea_equivale_a_corrida_directa():
+    config = _config()
+    directa = motor_rapido.ejecutar_simulacion(20, HORIZONTE, config=config)
+
+    estacion = calentar(48, config=config).restaurar()
+    estacion.ejecutar(HORIZONTE)
+
+    assert _metricas(estacion) == _metricas(directa)
+    assert estacion.espera_baterias.resumen() == directa.espera_baterias.resumen()
+    assert estacion.registro_intercambios == directa.registro_intercambios
+
+
+def test_guardar_y_cargar(tmp_path):
+    instantanea = calentar(24, config=_config())
+    ruta = tmp_path / "base.inst"
+    instantanea.guardar(ruta)
+    cargada = Instantanea.cargar(ruta)
+    assert cargada.tiempo == 24
+
+    a = instantanea.restaurar()
+    b = cargada.restaurar()
+    a.ejecutar(48)
+    b.ejecutar(48)
+    assert _metricas(a) == _metricas(b)
+
+
+def test_solo_motor_rapido():
+    with pytest.raises(TypeError):
+        Instantanea(object())
+
+
+@pytest.mark.parametrize(
+    "estacion, rama",
+    [
+        # Pocos cargadores: faltan baterías cargadas
+        (ParametrosEstacion(4, 40, 20), {"capacidad_estacion": 8}),
+        # Pocas baterías en total
+        (ParametrosEstacion(6, 24, 8), {"total_baterias": 40}),
+    ],
+)
+def test_rama_con_mas_recursos_reduce_la_espera(estacion, rama):
+    config = _config().con(estacion=estacion)
+    instantanea = calentar(24, max_autobuses=20, config=config)
+
+    base, ampliada = ejecutar_ramas(instantanea, [{}, rama], hasta=96, jobs=1)
+    assert ampliada.tiempo_espera_total < base.tiempo_espera_total / 2
+    assert ampliada.punto == rama
+
+
+def test_no_se_quitan_recursos():
+    instantanea = calentar(24, config=_config())
+    with pytest.raises(ValueError):
+        instantanea.ramificar(capacidad_estacion=3)
+    with pytest.raises(ValueError):
+        instantanea.ramificar(total_baterias=10)
+
+
+def test_rama_de_tarifas_y_reinicio_de_metricas():
+    instantanea = calentar(48, config=_config())
+    cara = ParametrosEconomicos(costo_punta=0.5, costo_normal=0.4)
+
+    base, tarifa = ejecutar_ramas(
+        instantanea, [{}, {"economicos": cara}], hasta=96, jobs=1
+    )
+    assert base.intercambios_realizados == tarifa.intercambios_realizados
+    assert tarifa.costo_total_electrico > base.costo_total_electrico
+
+    acumulada = ejecutar_ramas(
+        instantanea, [{}], hasta=96, jobs=1, reiniciar_metricas=False
+    )[0]
+    assert base.intercambios_realizados < acumulada.intercambios_realizados
+    assert len(base.registro_intercambios) == base.intercambios_realizados
+
+
+def test_ramas_en_paralelo_coinciden():
+    instantanea = calentar(24, config=_config())
+    ramas = [{}, {"capacidad_estacion": 25}]
+    serie = ejecutar_ramas(instantanea, ramas, hasta=72, jobs=1)
+    paralelo = ejecutar_ramas(instantanea, ramas, hasta=72, jobs=2)
+    assert [_metricas(r) for r in serie] == [_metricas(r) for r in paralelo]
+
+
+def test_reinicio_cuenta_las_esperas_en_curso_desde_el_reinicio():
+    # Pocos cargadores: al final del calentamiento hay autobuses en cola
+    config = _config().con(estacion=ParametrosEstacion(2, 40, 20))
+    instantanea = calentar(24, max_autobuses=20, config=config)
+    estacion = instantanea.ramificar(reiniciar_metricas=True)
+    assert estacion.autobuses_en_cola() > 0
+    assert all(
+        autobus.llegada == 24 for autobus in estacion._autobuses_en_estacion()
+    )
+
+    estacion.ejecutar(30)
+    assert estacion.espera_autobuses.n > 0
+    assert estacion.espera_autobuses.maximo <= 30 - 24
+    assert estacion.espera_baterias.maximo <= 30 - 24
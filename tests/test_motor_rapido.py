@@ -0,0 +1,80 @@
+import importlib
+
+import pytest
+
+simpy = pytest.importorskip("simpy")
+
+METRICAS = [
+    "intercambios_realizados",
+    "tiempo_espera_total",
+    "energia_total_cargada",
+    "costo_total_electrico",
+    "costo_total_gas",
+    "energia_total_gas",
+    "energia_punta_autobuses",
+    "energia_fuera_punta_autobuses",
+    "energia_punta_electrica",
+]
+
+
+@pytest.fixture
+def modelo(monkeypatch):
+    import modelo
+    modelo = importlib.reload(modelo)
+    monkeypatch.setattr(modelo, "VERBOSE", False)
+    return modelo
+
+
+@pytest.mark.parametrize(
+    "autobuses, cargadores, total, iniciales, dias",
+    [
+        (20, 21, 41, 20, 7),
+        # Pocas baterías y cargadores: los autobuses hacen cola
+        (30, 6, 40, 10, 5),
+    ],
+)
+def test_motores_coinciden_con_la_misma_semilla(
+    modelo, monkeypatch, autobuses, cargadores, total, iniciales, dias
+):
+    monkeypatch.setattr(modelo.param_estacion, "capacidad_estacion", cargadores)
+    monkeypatch.setattr(modelo.param_estacion, "total_baterias", total)
+    monkeypatch.setattr(modelo.param_estacion, "baterias_iniciales", iniciales)
+
+    config = modelo.configuracion_actual().con(guardar_muestras=True)
+    con_simpy = modelo.ejecutar_simulacion(autobuses, dias * 24, config=config)
+    rapido = modelo.ejecutar_simulacion(
+        autobuses, dias * 24, engine="rapido", config=config
+    )
+
+    for metrica in METRICAS:
+        assert getattr(rapido, metrica) == getattr(con_simpy, metrica), metrica
+    for nombre in ("espera_baterias", "espera_autobuses"):
+        assert getattr(rapido, nombre).muestras == getattr(
+            con_simpy, nombre
+        ).muestras, nombre
+    assert rapido.registro_intercambios == con_simpy.registro_intercambios
+    assert modelo.formatear_resultados(rapido) == modelo.formatear_resultados(
+        con_simpy
+    )
+
+
+def test_motor_desconocido(modelo):
+    with pytest.raises(ValueError):
+        modelo.ejecutar_simulacion(engine="otro")
+
+
+def test_vueltas_agrupadas_cuentan_el_gas_en_cualquier_corte(modelo):
+    # Las vueltas seguidas de un autobús son un solo evento, pero las que
+    # terminan antes del corte deben contarse igual que con SimPy.
+    import motor_rapido
+
+    config = modelo.configuracion_actual(verbose=False)
+    rapida = motor_rapido.EstacionRapida(20, config=config)
+    for hasta in (10.3, 33.7, 50.05, 96):
+        con_simpy = modelo.ejecutar_simulacion(20, hasta, config=config)
+        rapida.ejecutar(hasta)
+        for metrica in ("energia_total_gas", "costo_total_gas"):
+            assert getattr(rapida, metrica) == getattr(con_simpy, metrica), (
+                hasta,
+                metrica,
+            )
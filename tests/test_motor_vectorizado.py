@@ -0,0 +1,65 @@
+import importlib
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("simpy")
+
+
+@pytest.fixture
+def modelo(monkeypatch):
+    import modelo
+    modelo = importlib.reload(modelo)
+    monkeypatch.setattr(modelo, "VERBOSE", False)
+    return modelo
+
+
+def test_replicas_se_aproximan_al_motor_por_eventos(modelo, monkeypatch):
+    import motor_vectorizado
+
+    escenarios = [
+        {"max_autobuses": 20},
+        {"max_autobuses": 30, "capacidad_estacion": 6,
+         "total_baterias": 40, "baterias_iniciales": 10},
+    ]
+    resumenes = motor_vectorizado.simular_replicas(escenarios, duracion=5 * 24)
+    assert [r.escenario["max_autobuses"] for r in resumenes] == [20, 30]
+
+    for escenario, resumen in zip(escenarios, resumenes):
+        for clave, defecto in (
+            ("capacidad_estacion", 21),
+            ("total_baterias", 41),
+            ("baterias_iniciales", 20),
+        ):
+            monkeypatch.setattr(
+                modelo.param_estacion, clave, escenario.get(clave, defecto)
+            )
+        exacto = modelo.ejecutar_simulacion(
+            escenario["max_autobuses"], 5 * 24, engine="rapido"
+        )
+        assert resumen.intercambios_realizados == pytest.approx(
+            exacto.intercambios_realizados, rel=0.02
+        )
+        for metrica in ("energia_total_cargada", "costo_total_gas"):
+            assert getattr(resumen, metrica) == pytest.approx(
+                getattr(exacto, metrica), rel=0.02
+            ), metrica
+        assert resumen.tiempo_espera_total == pytest.approx(
+            exacto.tiempo_espera_total, rel=0.05, abs=0.5
+        )
+        assert modelo.formatear_resultados(resumen)
+
+
+def test_replicas_independientes_del_lote(modelo):
+    import motor_vectorizado
+    from barrido import ResumenSimulacion
+
+    solo = motor_vectorizado.simular_replicas([{"semilla": 7}], duracion=48)
+    lote = motor_vectorizado.simular_replicas(
+        [{"semilla": 8, "max_autobuses": 30}, {"semilla": 7}, {"semilla": 9}],
+        duracion=48,
+    )
+    assert lote[1].intercambios_realizados > 0
+    assert lote[0].escenario["semilla"] == 8
+    for metrica in ResumenSimulacion.METRICAS:
+        assert getattr(solo[0], metrica) == getattr(lote[1], metrica), metrica
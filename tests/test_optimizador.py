@@ -0,0 +1,69 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+import modelo
+import optimizador
+
+FLOTA = 8
+OPCIONES = dict(
+    max_autobuses=FLOTA,
+    replicas=2,
+    max_cargadores=6,
+    max_baterias=20,
+    duracion=96,
+    jobs=1,
+)
+
+
+def _grilla_completa(costo_cargador):
+    """Evalúa todas las configuraciones y devuelve la factible más barata."""
+    evaluador = optimizador._Optimizador(
+        modelo.configuracion_actual(verbose=False),
+        FLOTA,
+        optimizador.PERCENTIL_SLA,
+        optimizador.ESPERA_MAXIMA,
+        OPCIONES["replicas"],
+        costo_cargador,
+        1.0,
+        False,
+        1,
+        OPCIONES["duracion"],
+        37.2,
+        "rapido",
+    )
+    candidatos = [
+        (c, b)
+        for c in range(1, OPCIONES["max_cargadores"] + 1)
+        for b in range(FLOTA + 1, OPCIONES["max_baterias"] + 1)
+    ]
+    evaluador.evaluar(candidatos)
+    factibles = [evaluador.evaluaciones[c] for c in candidatos if evaluador.factible(c)]
+    return min(evaluador.costo(e) for e in factibles), len(candidatos)
+
+
+@pytest.mark.parametrize("costo_cargador", [1.0, 4.0])
+def test_coincide_con_la_grilla_completa(costo_cargador):
+    resultado = optimizador.optimizar_estacion(
+        costo_cargador=costo_cargador, **OPCIONES
+    )
+    costo, tamano = _grilla_completa(costo_cargador)
+
+    assert resultado.tamano_grilla == tamano
+    assert resultado.costo == costo
+    assert resultado.mejor.espera <= optimizador.ESPERA_MAXIMA
+    assert len(resultado.evaluaciones) < tamano / 4
+
+
+def test_sin_configuracion_factible():
+    opciones = dict(OPCIONES, max_cargadores=1, max_baterias=FLOTA + 1)
+    resultado = optimizador.optimizar_estacion(espera_maxima=0.5, **opciones)
+    assert resultado.mejor is None
+    assert "Ninguna" in optimizador.formatear_optimizacion(resultado)[0]
+
+
+def test_reutiliza_la_cache(cache_en_memoria):
+    optimizador.optimizar_estacion(**OPCIONES)
+    fallos = cache_en_memoria.estadisticas()["fallos"]
+    optimizador.optimizar_estacion(costo_cargador=2.0, **OPCIONES)
+    assert cache_en_memoria.estadisticas()["fallos"] == fallos
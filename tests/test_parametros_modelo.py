@@ -1,3 +1,4 @@
+import math
 import types
 import sys
 import pytest
@@ -24,12 +25,34 @@ def test_tiempo_carga_default_section():
 def test_tiempo_carga_custom_range():
     bateria = ParametrosBateria(capacidad=100)
     tiempo = bateria.tiempo_carga(0, 20)
-    expected = 0.0
-    for soc in range(0, 20):
-        expected += 1 / bateria.potencia_carga(soc)
+    # La potencia sube linealmente de 50 a 150 kW: integral de 1 / (50 + 5 s)
+    expected = math.log(3) / 5
     assert tiempo == pytest.approx(expected)
 
 
+def test_tiempo_carga_soc_fraccionario_y_aditivo():
+    bateria = ParametrosBateria()
+    total = bateria.tiempo_carga(10.5)
+    partes = bateria.tiempo_carga(10.5, 37.25) + bateria.tiempo_carga(37.25)
+    assert total == pytest.approx(partes)
+    assert bateria.tiempo_carga(95) == 0
+
+
+def test_tiempos_carga_vectorizado_coincide_con_escalar():
+    np = pytest.importorskip("numpy")
+    bateria = ParametrosBateria()
+    socs = np.array([0, 12.3, 20, 54.9, 80, 89.5, 95])
+    esperado = [bateria.tiempo_carga(s) for s in socs]
+    assert bateria.tiempos_carga(socs) == pytest.approx(esperado)
+
+
+def test_cambiar_curva_reconstruye_tabla():
+    bateria = ParametrosBateria(capacidad=100)
+    bateria.puntos_curva = [(0, 100)]
+    assert bateria.potencia_carga(60) == 100
+    assert bateria.tiempo_carga(0, 50) == pytest.approx(0.5)
+
+
 def test_ejecutar_simulacion_basic_flow(monkeypatch):
     events = {}
 
@@ -44,7 +67,7 @@ def test_ejecutar_simulacion_basic_flow(monkeypatch):
     monkeypatch.setattr(modelo, 'simpy', types.SimpleNamespace(Environment=DummyEnv))
 
     class DummyEstacion:
-        def __init__(self, env, capacidad):
+        def __init__(self, env, capacidad, **opciones):
             self.env = env
             self.capacidad = capacidad
 
@@ -0,0 +1,78 @@
+import pstats
+
+import pytest
+
+pytest.importorskip("simpy")
+
+import modelo
+import perfilado
+from barrido import ResumenSimulacion
+from sondas import Sondas
+
+
+@pytest.mark.parametrize("engine", modelo.MOTORES)
+def test_perfil_no_altera_la_simulacion(engine):
+    config = modelo.configuracion_actual(verbose=False)
+    directa = modelo.ejecutar_simulacion(duracion=72, engine=engine, config=config)
+    perfil = perfilado.Perfil(cada_eventos=10)
+    perfilada = modelo.ejecutar_simulacion(
+        duracion=72,
+        engine=engine,
+        config=config,
+        sondas=Sondas().agregar("reserva"),
+        perfil=perfil,
+    )
+
+    for metrica in ResumenSimulacion.METRICAS:
+        assert getattr(perfilada, metrica) == getattr(directa, metrica)
+    assert perfilada.registro_intercambios == directa.registro_intercambios
+
+    assert {"cargar_bateria", "proceso_autobus", "llegada_autobuses"} <= set(
+        perfil.eventos
+    )
+    assert perfil.eventos["sondas"] == 72
+    assert set(perfil.tiempos) == set(perfil.eventos)
+    if engine == "rapido":
+        assert perfil.total_eventos == perfilada.eventos_procesados
+        assert perfilada.now == 72
+    else:
+        assert perfilada.env.now == 72
+        # La copia de los eventos pendientes sigue a la cola de SimPy
+        assert len(perfilada.env.pendientes) > 0
+        assert perfilada.env.pendientes[0][0] == perfilada.env.peek()
+        with pytest.raises(TypeError):
+            perfil.ejecutar_simpy(modelo._simpy().Environment(), 1)
+    tiempos, tamanos = perfil.serie_cola()
+    assert len(tiempos) == len(tamanos) == -(-perfil.total_eventos // 10)
+    assert list(tiempos) == sorted(tiempos)
+
+
+def test_procesos_extra_y_pstats(tmp_path):
+    def vigilante(env, estacion):
+        while True:
+            yield env.timeout(0.5)
+
+    perfil = perfilado.Perfil(cprofile=True)
+    modelo.ejecutar_simulacion(
+        duracion=24,
+        procesos_extra=[vigilante],
+        config=modelo.configuracion_actual(verbose=False),
+        perfil=perfil,
+    )
+    assert perfil.eventos[
+        "test_procesos_extra_y_pstats.<locals>.vigilante"
+    ] == 48
+
+    ruta = tmp_path / "corrida.pstats"
+    perfil.guardar_pstats(ruta)
+    funciones = {nombre for _, _, nombre in pstats.Stats(str(ruta)).stats}
+    assert "proceso_autobus" in funciones
+
+    tabla = perfilado.formatear_perfil(perfil)
+    assert tabla[0].startswith("Origen")
+    assert any(line.startswith("Total") for line in tabla)
+
+
+def test_pstats_requiere_cprofile():
+    with pytest.raises(ValueError):
+        perfilado.Perfil().guardar_pstats("no.pstats")
@@ -0,0 +1,126 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+import modelo
+import motor_rapido
+import red
+from barrido import ResumenSimulacion
+from parametros import ParametrosEstacion
+from registro_baterias import TRASLADADA
+
+DURACION = 7 * 24
+
+
+def _config():
+    return modelo.configuracion_actual(verbose=False)
+
+
+def _metricas(resumen):
+    return {m: getattr(resumen, m) for m in ResumenSimulacion.METRICAS}
+
+
+def test_un_deposito_equivale_a_la_estacion_sola():
+    config = _config()
+    resultado = red.ejecutar_red(red.red_uniforme(1, 20, config=config), DURACION)
+    directa = motor_rapido.ejecutar_simulacion(20, DURACION, config=config)
+    assert _metricas(resultado.depositos["D1"]) == _metricas(directa)
+
+
+def test_rutas_de_distinto_largo():
+    config = _config()
+    una = motor_rapido.ejecutar_simulacion(20, DURACION, config=config)
+    partida = motor_rapido.EstacionRapida(20, config=config, rutas=[(37.2, 20)])
+    partida.ejecutar(DURACION)
+    assert _metricas(partida) == _metricas(una)
+
+    mixta = motor_rapido.EstacionRapida(
+        20, config=config, rutas=[(20.0, 10), (60.0, 10)]
+    )
+    mixta.ejecutar(DURACION)
+    assert mixta.costo_total_gas != una.costo_total_gas
+    with pytest.raises(ValueError):
+        motor_rapido.EstacionRapida(20, config=config, rutas=[(37.2, 10)])
+
+
+def test_enviar_y_recibir_baterias():
+    config = _config()
+    origen = motor_rapido.EstacionRapida(20, config=config)
+    destino = motor_rapido.EstacionRapida(20, config=config)
+    origen.ejecutar(24)
+    destino.ejecutar(24)
+    reserva = len(origen.registro.reserva)
+    total = destino.registro.total
+
+    socs = origen.enviar_baterias(3)
+    assert len(socs) == 3
+    assert len(origen.registro.reserva) == reserva - 3
+    assert origen.registro.contar(TRASLADADA) == 3
+
+    destino.recibir_baterias(socs, 25)
+    destino.ejecutar(25.5)
+    assert destino.registro.total == total + 3
+    assert destino.baterias_recibidas == 3
+
+
+def test_planificar_traslados():
+    estados = [
+        {"reserva": 30, "autobuses": 20},
+        {"reserva": 10, "autobuses": 20},
+        {"reserva": 20, "autobuses": 20},
+    ]
+    rebalanceo = red.Rebalanceo(capacidad_camion=4, camiones=3, tolerancia=0.0)
+    assert red.planificar_traslados(estados, rebalanceo) == [
+        (0, 1, 4),
+        (0, 1, 4),
+        (0, 1, 2),
+    ]
+    tolerante = red.Rebalanceo(capacidad_camion=20, tolerancia=0.6)
+    assert red.planificar_traslados(estados, tolerante) == []
+
+
+def _red_desbalanceada(rebalanceo):
+    depositos = red.red_uniforme(3, 60, config=_config()).depositos
+    pobre = red.Deposito(
+        "P",
+        depositos[2].rutas,
+        depositos[2].config.con(estacion=ParametrosEstacion(21, 28, 10)),
+    )
+    return red.Red((depositos[0], depositos[1], pobre), rebalanceo)
+
+
+def test_rebalanceo_reduce_la_espera_del_deposito_escaso():
+    sin = red.ejecutar_red(_red_desbalanceada(None), DURACION, jobs=1)
+    con = red.ejecutar_red(
+        _red_desbalanceada(red.Rebalanceo(intervalo=6, camiones=2)), DURACION, jobs=1
+    )
+    assert con.traslados
+    assert con.depositos["P"].baterias_recibidas > 0
+    assert (
+        con.depositos["P"].tiempo_espera_total
+        < sin.depositos["P"].tiempo_espera_total / 2
+    )
+    enviadas = sum(r.baterias_enviadas for r in con.depositos.values())
+    assert enviadas == sum(t[3] for t in con.traslados)
+
+
+def test_resultado_no_depende_de_jobs():
+    red_prueba = red.red_uniforme(
+        4,
+        80,
+        distancias=(30.0, 45.0),
+        rebalanceo=red.Rebalanceo(intervalo=12, camiones=2, tolerancia=0.05),
+        config=_config(),
+    )
+    serie = red.ejecutar_red(red_prueba, DURACION, jobs=1)
+    paralelo = red.ejecutar_red(red_prueba, DURACION, jobs=3)
+    assert serie.traslados == paralelo.traslados
+    for nombre, resumen in serie.depositos.items():
+        assert _metricas(resumen) == _metricas(paralelo.depositos[nombre])
+
+
+def test_particionar_equilibra_la_flota():
+    depositos = red.red_uniforme(5, 100, config=_config()).depositos
+    grupos = red.particionar(depositos, 2)
+    assert sorted(i for grupo in grupos for i in grupo) == list(range(5))
+    assert len(red.particionar(depositos, 10)) == 5
@@ -0,0 +1,61 @@
+import pytest
+
+from registro_intercambios import (
+    RegistroIntercambios,
+    TARIFA_NORMAL,
+    TARIFA_PUNTA,
+)
+
+
+def _registro():
+    registro = RegistroIntercambios(horas_punta=(18, 23))
+    registro.agregar(6.5, 1, 30.0, 100.0)  # Día 0, 06:30
+    registro.agregar(18.2, 2, 25.0, 50.0)  # Día 0, 18:12 (punta)
+    registro.agregar(2 * 24 + 19.0, 1, 40.0, 20.0)  # Día 2, 19:00 (punta)
+    return registro
+
+
+def test_agregados_incrementales():
+    registro = _registro()
+    assert len(registro) == 3
+    assert list(registro.tarifa) == [TARIFA_NORMAL, TARIFA_PUNTA, TARIFA_PUNTA]
+    assert list(registro.intercambios_dia) == [2, 0, 1]
+    assert list(registro.energia_dia) == [150.0, 0.0, 20.0]
+    assert registro.intercambios_hora[18] == 1
+    assert registro.energia_hora[6] == 100.0
+    assert list(registro.energia_tarifa) == [100.0, 70.0]
+
+
+def test_series_diarias_y_costos():
+    registro = _registro()
+    assert registro.serie_diaria(registro.intercambios_dia, 5) == [2, 0, 1, 0, 0]
+    assert registro.serie_diaria(registro.energia_dia, 2) == [150.0, 0.0]
+    costos = registro.costo_diario(3, costo_normal=0.2, costo_punta=0.5)
+    assert costos == pytest.approx([100 * 0.2 + 50 * 0.5, 0.0, 20 * 0.5])
+
+
+def test_igualdad_y_numpy():
+    assert _registro() == _registro()
+    otro = _registro()
+    otro.agregar(30.0, 3, 10.0, 1.0)
+    assert otro != _registro()
+
+    np = pytest.importorskip("numpy")
+    columnas = _registro().como_numpy()
+    assert columnas["energia"].dtype == np.float64
+    np.testing.assert_array_equal(columnas["autobus"], [1, 2, 1])
+
+
+def test_sin_filas_solo_agregados():
+    registro = RegistroIntercambios(horas_punta=(18, 23), guardar_filas=False)
+    completo = _registro()
+    for t, autobus, soc, energia in (
+        (6.5, 1, 30.0, 100.0), (18.2, 2, 25.0, 50.0), (2 * 24 + 19.0, 1, 40.0, 20.0)
+    ):
+        registro.agregar(t, autobus, soc, energia)
+    assert registro.tiempo is None and len(registro) == 3
+    assert list(registro.intercambios_dia) == [2, 0, 1]
+    assert list(registro.energia_tarifa) == [100.0, 70.0]
+    assert registro == completo
+    with pytest.raises(ValueError):
+        registro.como_numpy()
@@ -0,0 +1,68 @@
+import types
+
+import pytest
+
+import replicas
+
+
+@pytest.mark.parametrize(
+    "grados, esperado", [(1, 12.706), (2, 4.303), (4, 2.776), (9, 2.262), (29, 2.045)]
+)
+def test_cuantil_t(grados, esperado):
+    assert replicas.cuantil_t(0.975, grados) == pytest.approx(esperado, abs=2e-3)
+
+
+def _barrido_falso(valores, llamadas):
+    def ejecutar_barrido(puntos, **opciones):
+        llamadas.append([p["semilla"] for p in puntos])
+        return [
+            types.SimpleNamespace(
+                costo_total_electrico=valores(p["semilla"]),
+                tiempo_espera_total=0.0,
+                energia_punta_electrica=10.0,
+                energia_total_gas=0.0,
+                energia_total_cargada=0.0,
+            )
+            for p in puntos
+        ]
+
+    return ejecutar_barrido
+
+
+def test_se_detiene_al_alcanzar_la_precision(monkeypatch):
+    llamadas = []
+    valores = lambda semilla: 100.0 + (semilla % 2)  # noqa: E731
+    monkeypatch.setattr(replicas, "ejecutar_barrido", _barrido_falso(valores, llamadas))
+    config = replicas.modelo.configuracion_actual(verbose=False)
+    semilla = config.simulacion.semilla
+
+    resultado = replicas.ejecutar_replicas(
+        replicas=100, precision=0.002, jobs=2, config=config
+    )
+    assert resultado.convergio
+    assert llamadas[0] == [semilla + i for i in range(5)]
+    assert len(llamadas) > 1
+    assert all(len(tanda) == 2 for tanda in llamadas[1:])
+    assert len(resultado.replicas) < 100
+    costo = resultado.intervalos["costo_total_electrico"]
+    assert costo.media == pytest.approx(100.5, abs=0.1)
+    assert costo.relativo <= 0.002
+    assert resultado.intervalos["tiempo_espera_total"].relativo == 0
+
+    # Sin precisión se simulan todas de una vez
+    llamadas.clear()
+    resultado = replicas.ejecutar_replicas(replicas=7, jobs=2, config=config)
+    assert llamadas == [[semilla + i for i in range(7)]]
+    assert not resultado.convergio
+    assert "7 réplicas" in replicas.formatear_replicas(resultado)[0]
+
+
+def test_replicas_reales_con_el_motor_rapido():
+    pytest.importorskip("simpy")
+    resultado = replicas.ejecutar_replicas(
+        replicas=3, jobs=1, duracion=48, engine="rapido"
+    )
+    semillas = {r.punto["semilla"] for r in resultado.replicas}
+    assert len(semillas) == 3
+    costo = resultado.intervalos["costo_total_electrico"]
+    assert costo.n == 3 and 0 < costo.semiancho < costo.media
@@ -0,0 +1,26 @@
+import importlib
+
+import pytest
+
+simpy = pytest.importorskip("simpy")
+
+
+def test_autobus_espera_exactamente_hasta_que_se_carga_la_bateria(monkeypatch):
+    import modelo
+    modelo = importlib.reload(modelo)
+    monkeypatch.setattr(modelo, "VERBOSE", False)
+    monkeypatch.setattr(modelo.param_estacion, "capacidad_estacion", 1)
+    monkeypatch.setattr(modelo.param_estacion, "total_baterias", 1)
+    monkeypatch.setattr(modelo.param_estacion, "baterias_iniciales", 0)
+
+    env = simpy.Environment()
+    estacion = modelo.EstacionIntercambio(env, 1)
+    env.process(modelo.proceso_autobus(env, estacion, 1, 37.2, primera_salida=True))
+    tiempo_carga = modelo.param_bateria.tiempo_carga(30)
+    env.run(until=tiempo_carga + 0.01)
+
+    assert estacion.tiempo_espera_total == pytest.approx(tiempo_carga)
+    assert estacion.intercambios_realizados == 0
+    assert estacion.espera_baterias.n == 1
+    assert estacion.espera_baterias.maximo == 0
+    assert estacion.espera_baterias.muestras is None
@@ -0,0 +1,100 @@
+import pytest
+
+pytest.importorskip("simpy")
+np = pytest.importorskip("numpy")
+
+import modelo
+import sondas
+from parametros import ParametrosBateria
+from registro_baterias import EN_CARGA
+
+
+def test_soc_tras_carga_invierte_tiempo_carga():
+    bateria = ParametrosBateria()
+    for soc in (0, 15, 30, 60, 85):
+        tiempo = bateria.tiempo_carga(soc)
+        assert bateria.soc_tras_carga(soc, tiempo) == pytest.approx(90)
+        mitad = bateria.soc_tras_carga(soc, tiempo / 2)
+        assert bateria.tiempo_carga(soc, mitad) == pytest.approx(tiempo / 2)
+    assert bateria.soc_tras_carga(50, 100) == 100
+
+
+def _sondas():
+    medidas = sondas.Sondas()
+    for nombre in sondas.MEDIDORES:
+        medidas.agregar(nombre)
+    medidas.agregar(
+        "mitad_reserva",
+        lambda estacion, ahora: len(estacion.baterias_reserva.items) / 2,
+        intervalo=0.5,
+    )
+    return medidas
+
+
+def test_series_iguales_en_ambos_motores():
+    config = modelo.configuracion_actual(verbose=False)
+    series = {}
+    for engine in modelo.MOTORES:
+        medidas = _sondas()
+        estacion = modelo.ejecutar_simulacion(
+            10, 72, engine=engine, config=config, sondas=medidas
+        )
+        series[engine] = medidas
+        registro = estacion.registro
+        assert registro.cargando == {
+            i for i, estado in enumerate(registro.estado) if estado == EN_CARGA
+        }
+        assert len(registro.cargando) == estacion.baterias_cargando
+
+    con_simpy = series["simpy"]
+    horas, reserva = con_simpy.serie("reserva")
+    # ``run(until=72)`` no procesa el instante 72
+    assert len(horas) == 72
+    np.testing.assert_array_equal(horas, np.arange(72.0))
+    medias_horas, mitad = con_simpy.serie("mitad_reserva")
+    assert len(medias_horas) == 144
+    np.testing.assert_array_equal(mitad[::2], reserva / 2)
+
+    ocupados = con_simpy["cargadores_ocupados"]
+    potencia = con_simpy["potencia_kw"]
+    assert (potencia[ocupados == 0] == 0).all()
+    assert (potencia[ocupados > 0] > 0).all()
+    assert (potencia <= ocupados * 150 + 1e-9).all()
+
+    # Los cargadores arrancan justo en t = 0 y al fin de la hora punta, por
+    # lo que sólo se comparan las series sin eventos simultáneos al muestreo.
+    for nombre in ("reserva", "descargadas", "cola", "espera_acumulada"):
+        np.testing.assert_array_equal(
+            series["rapido"][nombre], con_simpy[nombre], err_msg=nombre
+        )
+
+
+def test_validaciones():
+    medidas = sondas.Sondas().agregar("cola")
+    with pytest.raises(ValueError):
+        medidas.agregar("cola")
+    with pytest.raises(ValueError):
+        medidas.agregar("desconocida")
+    with pytest.raises(ValueError):
+        medidas.agregar("reserva", intervalo=0)
+    with pytest.raises(ValueError):
+        medidas.serie("cola")
+
+
+def test_graficos_comparten_una_corrida(monkeypatch):
+    import GraficosModelo
+
+    llamadas = []
+    original = modelo.ejecutar_simulacion
+
+    def contar(*args, **kwargs):
+        llamadas.append(kwargs)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(modelo, "ejecutar_simulacion", contar)
+    monkeypatch.setattr(modelo.param_simulacion, "dias", 2)
+    primera = GraficosModelo.series_horarias()
+    segunda = GraficosModelo.series_horarias()
+    assert len(llamadas) == 1
+    assert set(segunda) == set(GraficosModelo.SERIES_HORARIAS)
+    assert len(primera["reserva"][0]) == 48
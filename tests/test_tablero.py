@@ -0,0 +1,134 @@
+import pytest
+
+pytest.importorskip("matplotlib")
+pytest.importorskip("simpy")
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.colors import to_hex
+from matplotlib.figure import Figure
+
+import avance
+import GraficosModelo
+import modelo
+import tablero
+from parametros import ParametrosSimulacion
+
+
+class _Lienzo(FigureCanvasAgg):
+    """Lienzo Agg que cuenta los dibujos completos y los blits."""
+
+    def __init__(self, figura):
+        super().__init__(figura)
+        self.dibujos = 0
+        self.blits = 0
+
+    def draw(self):
+        self.dibujos += 1
+        super().draw()
+
+    def blit(self, bbox=None):
+        self.blits += 1
+
+
+@pytest.fixture
+def config():
+    return modelo.configuracion_actual(verbose=False).con(
+        simulacion=ParametrosSimulacion(dias=2, max_autobuses=4)
+    )
+
+
+def _artistas(panel):
+    ejes = panel.figura.axes
+    return len(ejes), sum(len(e.lines) + len(e.patches) for e in ejes)
+
+
+def test_cambiar_de_vista_reutiliza_los_artistas(config):
+    lienzo = _Lienzo(Figure())
+    panel = tablero.Tablero(lienzo)
+    datos = {
+        nombre: GraficosModelo.calcular_datos(nombre, config=config, jobs=1)
+        for nombre in GraficosModelo.GRAFICOS
+    }
+    assert set(datos) <= set(tablero.VISTAS)
+    vistas = {
+        nombre: datos[tablero.grafico_de(nombre)]
+        for nombre in tablero.VISTAS
+        if nombre != tablero.EN_CURSO
+    }
+
+    for nombre, valores in vistas.items():
+        panel.mostrar(nombre, valores)
+        lienzo.draw()
+    despues_de_una_vuelta = _artistas(panel)
+    for _ in range(2):
+        for nombre, valores in vistas.items():
+            panel.mostrar(nombre, valores)
+            lienzo.draw()
+            visibles = [
+                a for a in panel.ejes.lines + panel.ejes.patches if a.get_visible()
+            ]
+            vista = tablero.VISTAS[nombre]
+            principales = [l for l in vista.lineas if l[4] == 0]
+            serie = len(valores[vista.serie_barras[0]]) if vista.serie_barras else 0
+            assert len(visibles) == len(principales) + len(vista.barras) + serie
+    assert _artistas(panel) == despues_de_una_vuelta
+
+    panel.mostrar("emisiones", datos["emisiones"])
+    alturas = [barra.get_height() for barra in panel._artistas["emisiones"][1]]
+    assert alturas == [datos["emisiones"][k] for k in ("electricidad", "gas", "ahorro")]
+
+    panel.mostrar("costos_hora", datos["costos"])
+    alturas = [barra.get_height() for barra in panel._artistas["costos_hora"][1]]
+    assert alturas == [
+        datos["costos"]["costo_hora_electrico"], datos["costos"]["costo_hora_gas"]
+    ]
+    panel.mostrar("costos_punta", datos["costos"])
+    punta, fuera = panel._artistas["costos_punta"][0]
+    assert list(punta.get_ydata()) == datos["costos"]["energia_punta"]
+    assert list(fuera.get_ydata()) == datos["costos"]["energia_fuera"]
+
+
+def test_costos_por_dia_colorea_los_fines_de_semana():
+    panel = tablero.Tablero(_Lienzo(Figure()))
+    semana = {
+        "costos": [float(d) for d in range(7)],
+        "fin_de_semana": [False] * 5 + [True] * 2,
+    }
+    panel.mostrar("costosdia", semana)
+    barras = panel._artistas["costosdia"][1]
+    assert [b.get_height() for b in barras] == semana["costos"]
+    assert [to_hex(b.get_facecolor()) for b in barras] == [
+        to_hex("C0")
+    ] * 5 + [to_hex("C1")] * 2
+
+    # Menos días reutiliza las barras y oculta las que sobran
+    panel.mostrar("costosdia", {"costos": [1.0, 2.0], "fin_de_semana": [True, False]})
+    assert panel._artistas["costosdia"][1] is barras and len(barras) == 7
+    assert [b.get_visible() for b in barras] == [True] * 2 + [False] * 5
+    assert to_hex(barras[0].get_facecolor()) == to_hex("C1")
+
+
+def test_corrida_en_curso_usa_blitting(config):
+    lienzo = _Lienzo(Figure())
+    panel = tablero.Tablero(lienzo)
+    panel.mostrar("trafico", GraficosModelo.calcular_datos("trafico"))
+    estacion = modelo.ejecutar_simulacion(engine="rapido", config=config, duracion=0)
+
+    duracion = config.simulacion.duracion
+    panel.iniciar_corrida(duracion)
+    lienzo.draw()
+    dibujos = lienzo.dibujos
+    pasos = 480
+    for paso in range(1, pasos + 1):
+        hasta = duracion * paso / pasos
+        estacion.ejecutar(hasta)
+        panel.agregar(avance.metricas_parciales(estacion, hasta))
+    # ``draw_idle`` del lienzo Agg dibuja en el momento
+    assert lienzo.blits > 0
+    assert lienzo.dibujos - dibujos < 20
+
+    lineas, _ = panel._artistas[tablero.EN_CURSO]
+    x, y = lineas[0].get_data()
+    assert len(x) == pasos
+    assert y[-1] == estacion.intercambios_realizados
+    assert x[-1] == duracion / 24
@@ -0,0 +1,63 @@
+import importlib
+
+import pytest
+
+import trazas
+
+
+def test_anillo_conserva_los_ultimos_eventos_en_orden():
+    anillo = trazas.SumideroAnillo(capacidad=3)
+    for i in range(5):
+        anillo.registrar(trazas.LLEGADA, float(i), i, 50.0 + i)
+    assert anillo.total == 5
+    assert [e[2] for e in anillo.eventos()] == [2, 3, 4]
+    assert anillo.eventos()[0] == (trazas.LLEGADA, 2.0, 2, 52.0)
+
+
+def test_archivo_columnar_ida_y_vuelta(tmp_path):
+    ruta = tmp_path / "eventos.trz"
+    eventos = [
+        (trazas.SALIDA, 5.1, 1, 0.0),
+        (trazas.INICIO_CARGA, 6.25, 17, 30.5),
+        (trazas.CARGA_DIFERIDA, 18.0, -1, 20.0),
+    ]
+    with trazas.SumideroColumnar(str(ruta), tamano_bloque=2) as sumidero:
+        for evento in eventos:
+            sumidero.registrar(*evento)
+    columnas = trazas.leer_columnar(str(ruta))
+    assert trazas.eventos_de_columnas(columnas) == eventos
+
+    (ruta.parent / "otro.bin").write_bytes(b"no es traza")
+    with pytest.raises(ValueError):
+        trazas.leer_columnar(str(ruta.parent / "otro.bin"))
+
+
+def test_formato_legible():
+    pytest.importorskip("simpy")
+    texto = trazas.formatear_evento((trazas.LLEGADA, 30.5, 4, 42.125))
+    assert texto == "Autobús 4 regresa a la estación en Día 02 06:30 con SoC 42.12%"
+    texto = trazas.formatear_evento((trazas.CARGA_DIFERIDA, 18.5, -1, 20.0))
+    assert texto == "Retrasando carga hasta Día 01 20:00"
+
+
+def test_simulacion_con_traza_no_cambia_resultados(capsys):
+    pytest.importorskip("simpy")
+    import modelo
+    modelo = importlib.reload(modelo)
+    config = modelo.configuracion_actual(verbose=False)
+
+    sin_traza = modelo.ejecutar_simulacion(8, 72, config=config)
+    anillo = trazas.SumideroAnillo()
+    con_traza = modelo.ejecutar_simulacion(8, 72, config=config, traza=anillo)
+    assert capsys.readouterr().out == ""
+
+    assert con_traza.costo_total_electrico == sin_traza.costo_total_electrico
+    tipos = [e[0] for e in anillo.eventos()]
+    assert tipos.count(trazas.SALIDA) == 8
+    assert tipos.count(trazas.INTERCAMBIO) == con_traza.intercambios_realizados
+    assert tipos.count(trazas.FIN_CARGA) <= tipos.count(trazas.INICIO_CARGA)
+    tiempos = [e[1] for e in anillo.eventos()]
+    assert tiempos == sorted(tiempos)
+
+    with pytest.raises(ValueError):
+        modelo.ejecutar_simulacion(8, 72, engine="rapido", traza=anillo)
@@ -1,17 +1,12 @@
-import modelo
+from barrido import ejecutar_barrido
 from modelo import param_simulacion
 
 ESTILO_MEJOR = "seaborn-v0_8"
 
 TIEMPO_REEMPLAZO = 4 / 60  # Tiempo fijo del intercambio en horas
 
-def tiempo_promedio_para_autobuses(numero_autobuses):
-    """Calcula el tiempo promedio de intercambio por autobús en minutos."""
-    # Desactivar la verbosidad durante las simulaciones
-    anterior = modelo.VERBOSE
-    modelo.VERBOSE = False
-    estacion = modelo.ejecutar_simulacion(max_autobuses=numero_autobuses)
-    modelo.VERBOSE = anterior
+def _tiempo_promedio_intercambio(estacion):
+    """Tiempo promedio de intercambio en minutos de una simulación."""
     if estacion.intercambios_realizados == 0:
         return 0
     tiempo_total = (
@@ -20,15 +15,49 @@ def tiempo_promedio_para_autobuses(numero_autobuses):
     )
     return (tiempo_total / estacion.intercambios_realizados) * 60
 
-def graficar_tiempos_intercambio(block=True):
-    """Grafica el tiempo promedio de intercambio por número de autobuses.
 
-    Parameters
-    ----------
-    block : bool, optional
-        Indica si ``plt.show`` debe ser bloqueante. La interfaz pasa
-        ``False`` para no congelar la ventana principal.
-    """
+def _espera_promedio_baterias(estacion):
+    """Tiempo promedio en minutos que una batería cargada espera en reserva."""
+    if not estacion.espera_baterias.n:
+        return 0
+    return estacion.espera_baterias.media * 60
+
+
+def _barrido_autobuses(config=None, tiempo_ruta=37.2, jobs=None, progreso=None,
+                       cancelado=None):
+    """Simula flotas de 1 a ``max_autobuses`` autobuses en paralelo."""
+    simulacion = config.simulacion if config is not None else param_simulacion
+    valores = list(range(1, simulacion.max_autobuses + 1))
+    puntos = [{"max_autobuses": n} for n in valores]
+    return valores, ejecutar_barrido(
+        puntos,
+        jobs=jobs,
+        tiempo_ruta=tiempo_ruta,
+        config=config,
+        progreso=progreso,
+        cancelado=cancelado,
+    )
+
+
+def tiempo_promedio_para_autobuses(numero_autobuses):
+    """Calcula el tiempo promedio de intercambio por autobús en minutos."""
+    estacion = ejecutar_barrido([{"max_autobuses": numero_autobuses}], jobs=1)[0]
+    return _tiempo_promedio_intercambio(estacion)
+
+
+def datos_tiempos_intercambio(config=None, tiempo_ruta=37.2, jobs=None,
+                              progreso=None, cancelado=None):
+    """Tiempo promedio de intercambio en minutos por tamaño de flota."""
+    valores, resumenes = _barrido_autobuses(
+        config, tiempo_ruta, jobs, progreso, cancelado
+    )
+    return {
+        "autobuses": valores,
+        "tiempos": [_tiempo_promedio_intercambio(r) for r in resumenes],
+    }
+
+
+def dibujar_tiempos_intercambio(datos, block=True):
     # Importar matplotlib solo cuando se ejecuta directamente para evitar
     # dependencias innecesarias al utilizar este módulo durante las pruebas.
 
@@ -39,13 +68,8 @@ def graficar_tiempos_intercambio(block=True):
         return
     plt.style.use(ESTILO_MEJOR)
 
-
-    max_autos = param_simulacion.max_autobuses
-    valores = list(range(1, max_autos + 1))
-    tiempos = [tiempo_promedio_para_autobuses(n) for n in valores]
-
     plt.figure(figsize=(8, 4))
-    plt.plot(valores, tiempos, marker="o")
+    plt.plot(datos["autobuses"], datos["tiempos"], marker="o")
     plt.xlabel("Número de autobuses")
     plt.ylabel("Tiempo promedio de intercambio (minutos)")
     plt.title("Tiempo promedio de intercambio por número de autobuses")
@@ -55,19 +79,45 @@ def graficar_tiempos_intercambio(block=True):
     plt.show(block=block)
 
 
+def graficar_tiempos_intercambio(block=True, jobs=None):
+    """Grafica el tiempo promedio de intercambio por número de autobuses.
+
+    Parameters
+    ----------
+    block : bool, optional
+        Indica si ``plt.show`` debe ser bloqueante. La interfaz pasa
+        ``False`` para no congelar la ventana principal.
+    jobs : int, optional
+        Procesos utilizados para simular el barrido; por defecto uno por
+        núcleo.
+    """
+    try:
+        import matplotlib.pyplot  # noqa: F401
+    except Exception:
+        print("Falta matplotlib. Ejecuta 'pip install -r requirements.txt'")
+        return
+    dibujar_tiempos_intercambio(datos_tiempos_intercambio(jobs=jobs), block)
+
+
 def tiempo_promedio_espera_baterias(numero_autobuses):
     """Devuelve el tiempo promedio que una batería cargada espera para ser usada."""
-    anterior = modelo.VERBOSE
-    modelo.VERBOSE = False
-    estacion = modelo.ejecutar_simulacion(max_autobuses=numero_autobuses)
-    modelo.VERBOSE = anterior
-    if not estacion.tiempos_espera_baterias:
-        return 0
-    return (sum(estacion.tiempos_espera_baterias) / len(estacion.tiempos_espera_baterias)) * 60
+    estacion = ejecutar_barrido([{"max_autobuses": numero_autobuses}], jobs=1)[0]
+    return _espera_promedio_baterias(estacion)
 
 
-def graficar_espera_baterias(block=True):
-    """Grafica el tiempo promedio que las baterías esperan cargadas."""
+def datos_espera_baterias(config=None, tiempo_ruta=37.2, jobs=None,
+                          progreso=None, cancelado=None):
+    """Minutos promedio que una batería cargada espera, por tamaño de flota."""
+    valores, resumenes = _barrido_autobuses(
+        config, tiempo_ruta, jobs, progreso, cancelado
+    )
+    return {
+        "autobuses": valores,
+        "tiempos": [_espera_promedio_baterias(r) for r in resumenes],
+    }
+
+
+def dibujar_espera_baterias(datos, block=True):
     try:
         import matplotlib.pyplot as plt
     except Exception:
@@ -75,12 +125,8 @@ def graficar_espera_baterias(block=True):
         return
     plt.style.use(ESTILO_MEJOR)
 
-    max_autos = param_simulacion.max_autobuses
-    valores = list(range(1, max_autos + 1))
-    tiempos = [tiempo_promedio_espera_baterias(n) for n in valores]
-
     plt.figure(figsize=(8, 4))
-    plt.plot(valores, tiempos, marker="o")
+    plt.plot(datos["autobuses"], datos["tiempos"], marker="o")
     plt.xlabel("Número de autobuses")
     plt.ylabel("Tiempo en reserva (minutos)")
     plt.title("Espera promedio de baterías cargadas")
@@ -90,6 +136,16 @@ def graficar_espera_baterias(block=True):
     plt.show(block=block)
 
 
+def graficar_espera_baterias(block=True, jobs=None):
+    """Grafica el tiempo promedio que las baterías esperan cargadas."""
+    try:
+        import matplotlib.pyplot  # noqa: F401
+    except Exception:
+        print("Falta matplotlib. Ejecuta 'pip install -r requirements.txt'")
+        return
+    dibujar_espera_baterias(datos_espera_baterias(jobs=jobs), block)
+
+
 def main():
     graficar_tiempos_intercambio()
 
@@ -44,17 +44,13 @@ def factor_trafico(hora, factores=FACTORES_LIMA):
     hora_int = int(hora) % 24
     return factores.get(hora_int, 1.0)
 
-def graficar_trafico(factores=FACTORES_LIMA, block=True):
-    """Muestra un gráfico con la evolución diaria del tráfico.
+def datos_trafico(factores=FACTORES_LIMA):
+    """Factor de tráfico de cada hora del día."""
+    horas = list(range(24))
+    return {"horas": horas, "factores": [factores.get(h, 1.0) for h in horas]}
 
-    Parameters
-    ----------
-    factores : dict, optional
-        Mapeo hora-factor de tráfico a graficar.
-    block : bool, optional
-        Si ``True`` la ventana del gráfico es bloqueante.  Se pasa como
-        argumento desde la interfaz para evitar congelar la aplicación.
-    """
+
+def dibujar_trafico(datos, block=True):
     try:
         import matplotlib.pyplot as plt
         plt.style.use(ESTILO_MEJOR)
@@ -62,11 +58,8 @@ def graficar_trafico(factores=FACTORES_LIMA, block=True):
         print("Falta matplotlib. Ejecuta 'pip install -r requirements.txt'")
         return
 
-    horas = list(range(24))
-    valores = [factores.get(h, 1.0) for h in horas]
-
     plt.figure(figsize=(8, 4))
-    plt.plot(horas, valores, marker="o")
+    plt.plot(datos["horas"], datos["factores"], marker="o")
     plt.xlabel("Hora del día")
     plt.ylabel("Factor de tráfico")
     plt.title("Perfil de tráfico para Lima")
@@ -75,5 +68,19 @@ def graficar_trafico(factores=FACTORES_LIMA, block=True):
     plt.show(block=block)
 
 
+def graficar_trafico(factores=FACTORES_LIMA, block=True):
+    """Muestra un gráfico con la evolución diaria del tráfico.
+
+    Parameters
+    ----------
+    factores : dict, optional
+        Mapeo hora-factor de tráfico a graficar.
+    block : bool, optional
+        Si ``True`` la ventana del gráfico es bloqueante.  Se pasa como
+        argumento desde la interfaz para evitar congelar la aplicación.
+    """
+    dibujar_trafico(datos_trafico(factores), block)
+
+
 if __name__ == "__main__":  # pragma: no cover
     graficar_trafico()
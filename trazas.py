@@ -0,0 +1,230 @@
+"""Registro estructurado de eventos de la simulación.
+
+Cada evento es una tupla numérica ``(tipo, tiempo, entidad, valor)``:
+
+* ``tipo``: uno de los códigos de abajo.
+* ``tiempo``: hora de simulación.
+* ``entidad``: identificador del autobús o de la batería (``-1`` si no
+  aplica).
+* ``valor``: dato propio del tipo (SoC, espera en horas u hora de reanudación).
+
+Los procesos de :mod:`modelo` entregan los eventos a un *sumidero*
+(:class:`SumideroAnillo`, :class:`SumideroColumnar` o
+:class:`SumideroImpresion`) sin construir textos; el formato legible se
+genera aparte con :func:`formatear_evento`. Sin sumidero el costo de la
+traza es una comparación con ``None``.
+"""
+
+import struct
+import sys
+from array import array
+
+# Tipos de evento
+SALIDA = 0  # Salida inicial de un autobús (entidad: autobús)
+LLEGADA = 1  # Regreso de una ruta (entidad: autobús, valor: SoC)
+INICIO_COLA = 2  # Autobús sin batería disponible (entidad: autobús)
+INTERCAMBIO = 3  # Inicio del intercambio (entidad: autobús, valor: espera en horas)
+INICIO_CARGA = 4  # (entidad: batería, valor: SoC inicial)
+FIN_CARGA = 5  # (entidad: batería, valor: SoC final)
+CARGA_DIFERIDA = 6  # Carga postergada por hora punta (valor: hora de reanudación)
+
+NOMBRES = {
+    SALIDA: "salida",
+    LLEGADA: "llegada",
+    INICIO_COLA: "inicio_cola",
+    INTERCAMBIO: "intercambio",
+    INICIO_CARGA: "inicio_carga",
+    FIN_CARGA: "fin_carga",
+    CARGA_DIFERIDA: "carga_diferida",
+}
+
+
+class SumideroNulo:
+    """Descarta todos los eventos."""
+
+    def registrar(self, tipo, tiempo, entidad, valor=0.0):
+        pass
+
+    def cerrar(self):
+        pass
+
+
+class SumideroAnillo:
+    """Conserva en memoria los últimos ``capacidad`` eventos."""
+
+    def __init__(self, capacidad=100_000):
+        self.capacidad = capacidad
+        self._tipos = array("b", [0]) * capacidad
+        self._tiempos = array("d", [0.0]) * capacidad
+        self._entidades = array("q", [0]) * capacidad
+        self._valores = array("d", [0.0]) * capacidad
+        self.total = 0  # Eventos recibidos, incluidos los sobrescritos
+
+    def registrar(self, tipo, tiempo, entidad, valor=0.0):
+        i = self.total % self.capacidad
+        self._tipos[i] = tipo
+        self._tiempos[i] = tiempo
+        self._entidades[i] = entidad
+        self._valores[i] = valor
+        self.total += 1
+
+    def eventos(self):
+        """Eventos conservados en orden cronológico."""
+        n = min(self.total, self.capacidad)
+        inicio = self.total - n
+        return [
+            (
+                self._tipos[j],
+                self._tiempos[j],
+                self._entidades[j],
+                self._valores[j],
+            )
+            for j in (i % self.capacidad for i in range(inicio, self.total))
+        ]
+
+    def cerrar(self):
+        pass
+
+
+# Archivo columnar: cabecera ``MAGIA`` + orden de bytes (``<`` o ``>``) y
+# luego bloques con la cantidad de eventos seguida de cada columna completa.
+MAGIA = b"TRZ1"
+_COLUMNAS = (("tipo", "b"), ("tiempo", "d"), ("entidad", "q"), ("valor", "d"))
+
+
+class SumideroColumnar:
+    """Escribe los eventos en un archivo binario organizado por columnas.
+
+    Los eventos se acumulan en arreglos y se vuelcan en bloques de
+    ``tamano_bloque`` filas, por lo que escribir no depende de ``print`` ni de
+    formatear textos. El archivo se lee con :func:`leer_columnar`.
+    """
+
+    def __init__(self, ruta, tamano_bloque=65_536):
+        self.ruta = ruta
+        self.tamano_bloque = tamano_bloque
+        self._archivo = open(ruta, "wb")
+        orden = b"<" if sys.byteorder == "little" else b">"
+        self._archivo.write(MAGIA + orden)
+        self._columnas = [array(codigo) for _, codigo in _COLUMNAS]
+
+    def registrar(self, tipo, tiempo, entidad, valor=0.0):
+        tipos, tiempos, entidades, valores = self._columnas
+        tipos.append(tipo)
+        tiempos.append(tiempo)
+        entidades.append(entidad)
+        valores.append(valor)
+        if len(tipos) >= self.tamano_bloque:
+            self._volcar()
+
+    def _volcar(self):
+        n = len(self._columnas[0])
+        if n == 0:
+            return
+        self._archivo.write(struct.pack("=I", n))
+        for columna in self._columnas:
+            columna.tofile(self._archivo)
+            del columna[:]
+
+    def cerrar(self):
+        if self._archivo.closed:
+            return
+        self._volcar()
+        self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+def leer_columnar(ruta):
+    """Lee un archivo de :class:`SumideroColumnar`.
+
+    Devuelve un diccionario con los arreglos ``tipo``, ``tiempo``,
+    ``entidad`` y ``valor``.
+    """
+    columnas = {nombre: array(codigo) for nombre, codigo in _COLUMNAS}
+    with open(ruta, "rb") as archivo:
+        cabecera = archivo.read(len(MAGIA) + 1)
+        if cabecera[: len(MAGIA)] != MAGIA:
+            raise ValueError(f"{ruta} no es un archivo de trazas")
+        orden = "little" if cabecera[-1:] == b"<" else "big"
+        formato = ("<" if orden == "little" else ">") + "I"
+        while True:
+            bloque = archivo.read(4)
+            if not bloque:
+                break
+            (n,) = struct.unpack(formato, bloque)
+            for nombre, _ in _COLUMNAS:
+                columnas[nombre].fromfile(archivo, n)
+    if orden != sys.byteorder:
+        for columna in columnas.values():
+            columna.byteswap()
+    return columnas
+
+
+def eventos_de_columnas(columnas):
+    """Convierte las columnas leídas en tuplas de evento."""
+    return list(
+        zip(columnas["tipo"], columnas["tiempo"], columnas["entidad"], columnas["valor"])
+    )
+
+
+def _formato_hora(horas):
+    from modelo import formato_hora
+
+    return formato_hora(horas)
+
+
+def formatear_evento(evento):
+    """Texto legible de un evento ``(tipo, tiempo, entidad, valor)``."""
+    tipo, tiempo, entidad, valor = evento
+    hora = _formato_hora(tiempo)
+    if tipo == SALIDA:
+        return f"Autobús {entidad} sale de la estación en {hora}"
+    if tipo == LLEGADA:
+        return f"Autobús {entidad} regresa a la estación en {hora} con SoC {valor:.2f}%"
+    if tipo == INICIO_COLA:
+        return f"Autobús {entidad} espera batería desde {hora}"
+    if tipo == INTERCAMBIO:
+        return (
+            f"Autobús {entidad} entra a la estación en {hora} "
+            f"tras esperar {_formato_hora(valor)}"
+        )
+    if tipo == INICIO_CARGA:
+        return f"Batería {entidad} empieza a cargar en {hora} (SoC: {valor:.2f}%)"
+    if tipo == FIN_CARGA:
+        return f"Batería {entidad} termina de cargar en {hora} (SoC: {valor:.2f}%)"
+    if tipo == CARGA_DIFERIDA:
+        return f"Retrasando carga hasta {_formato_hora(valor)}"
+    return f"Evento {tipo} en {hora} (entidad {entidad}, valor {valor})"
+
+
+class SumideroImpresion:
+    """Imprime cada evento formateado; equivale al antiguo ``VERBOSE``."""
+
+    def __init__(self, salida=None):
+        self.salida = salida
+
+    def registrar(self, tipo, tiempo, entidad, valor=0.0):
+        print(formatear_evento((tipo, tiempo, entidad, valor)), file=self.salida)
+
+    def cerrar(self):
+        pass
+
+
+def main(argv=None):
+    """Muestra en texto un archivo de trazas columnar."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Muestra un archivo de trazas")
+    parser.add_argument("archivo", help="Archivo generado con --traza")
+    args = parser.parse_args(argv)
+    for evento in eventos_de_columnas(leer_columnar(args.archivo)):
+        print(formatear_evento(evento))
+
+
+if __name__ == "__main__":  # pragma: no cover - ejecución manual
+    main()